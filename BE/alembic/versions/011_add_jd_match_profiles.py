@@ -0,0 +1,37 @@
+"""Add jd_match_profiles table
+
+Revision ID: 011_jd_match_profiles
+Revises: d20a8afdde4d
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_jd_match_profiles'
+down_revision = 'd20a8afdde4d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS jd_match_profiles (
+            id SERIAL PRIMARY KEY,
+            source_type VARCHAR(20) NOT NULL,
+            source_id VARCHAR(100) NOT NULL,
+            skills JSON NOT NULL DEFAULT '[]',
+            min_experience_years DOUBLE PRECISION,
+            max_experience_years DOUBLE PRECISION,
+            experience_level VARCHAR(50),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            CONSTRAINT uq_jd_match_profiles_source UNIQUE (source_type, source_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_jd_match_profiles_id ON jd_match_profiles(id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS jd_match_profiles")
@@ -0,0 +1,43 @@
+"""Add candidate_requisition_matches table
+
+Revision ID: 012_candidate_requisition_matches
+Revises: 011_jd_match_profiles
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_candidate_requisition_matches'
+down_revision = '011_jd_match_profiles'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_requisition_matches (
+            id SERIAL PRIMARY KEY,
+            candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+            requisition_id VARCHAR(100) NOT NULL REFERENCES job_requisitions(requisition_id) ON DELETE CASCADE,
+            score DOUBLE PRECISION NOT NULL DEFAULT 0,
+            skill_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+            experience_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+            matched_skills JSON NOT NULL DEFAULT '[]',
+            missing_skills JSON NOT NULL DEFAULT '[]',
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            CONSTRAINT uq_candidate_requisition_match UNIQUE (candidate_id, requisition_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_candidate_requisition_matches_id ON candidate_requisition_matches(id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_candidate_requisition_matches_candidate_id ON candidate_requisition_matches(candidate_id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidate_requisition_matches_requisition_score "
+        "ON candidate_requisition_matches(requisition_id, score)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS candidate_requisition_matches")
@@ -0,0 +1,42 @@
+"""Add question_item_stats table
+
+Revision ID: 013_question_item_stats
+Revises: 012_candidate_requisition_matches
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_question_item_stats'
+down_revision = '012_candidate_requisition_matches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS question_item_stats (
+            id SERIAL PRIMARY KEY,
+            question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+            question_set_id VARCHAR(100),
+            responses INTEGER NOT NULL DEFAULT 0,
+            p_value DOUBLE PRECISION,
+            point_biserial DOUBLE PRECISION,
+            option_rates JSON NOT NULL DEFAULT '{}',
+            flags JSON NOT NULL DEFAULT '[]',
+            is_flagged BOOLEAN NOT NULL DEFAULT FALSE,
+            computed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            CONSTRAINT question_item_stats_question_id_key UNIQUE (question_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_question_item_stats_id ON question_item_stats(id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_question_item_stats_question_set_id ON question_item_stats(question_set_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_question_item_stats_is_flagged ON question_item_stats(is_flagged)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS question_item_stats")
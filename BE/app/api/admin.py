@@ -16,11 +16,15 @@ from app.db.models import (
     AssessmentApplication,
     Assessment,
     Candidate,
+    QuestionItemStatistic,
 )
 from app.db.models import ProctoringEvent
-from app.models.schemas import ProctoringEventAdminResponse, ProctoringEventResponse
+from app.models.schemas import ProctoringEventAdminResponse, ProctoringRiskResponse
 from app.db.models import JobRequisition, Notification
 from app.models.schemas import ApplicationStatusUpdate, RequisitionStatusUpdate, BulkNotificationCreate
+from app.models.schemas import AnswerKeyCorrection, ItemAnalyticsResponse, RescoreResponse
+from app.core.scoring import rescore_question_set
+from app.core.proctoring_risk import get_risk_scorer
 from app.core.dependencies import get_current_user
 from app.core.security import check_admin
 
@@ -254,54 +258,136 @@ async def admin_list_applications(status: Optional[str] = None, db: AsyncSession
 
 
 
+@router.put("/admin/questions/{question_id}/correct-answer", response_model=RescoreResponse)
+async def admin_correct_answer_key(
+    question_id: int,
+    payload: AnswerKeyCorrection,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Correct a question's answer key and re-score every scored session of its question set."""
+    await check_admin(current_user)
+    result = await db.execute(select(Question).where(Question.id == question_id))
+    question = result.scalar_one_or_none()
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    if not question.question_set_id:
+        raise HTTPException(status_code=400, detail="Only QuestionSet questions can be re-keyed")
+    if payload.correct_answer not in question.options:
+        raise HTTPException(status_code=400, detail=f"Invalid answer '{payload.correct_answer}' for question {question_id}")
+    question_set_id = question.question_set_id
+    question.correct_answer = payload.correct_answer
+    await db.commit()
+
+    rescored = await rescore_question_set(db, question_set_id)
+    await db.commit()
+    return rescored
+
+
+@router.post("/admin/question-sets/{question_set_id}/rescore", response_model=RescoreResponse)
+async def admin_rescore_question_set(
+    question_set_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Re-score every scored session of a question set against its current answer key."""
+    await check_admin(current_user)
+    rescored = await rescore_question_set(db, question_set_id)
+    await db.commit()
+    return rescored
+
+
+@router.get("/admin/item-analytics", response_model=List[ItemAnalyticsResponse])
+async def admin_item_analytics(
+    question_set_id: Optional[str] = Query(None),
+    flagged_only: bool = Query(False, description="Only items flagged for review"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Per-question analytics from the nightly job, hardest items first."""
+    await check_admin(current_user)
+    stmt = select(QuestionItemStatistic, Question.question_text, Question.correct_answer).join(
+        Question, Question.id == QuestionItemStatistic.question_id
+    )
+    if question_set_id:
+        stmt = stmt.where(QuestionItemStatistic.question_set_id == question_set_id)
+    if flagged_only:
+        stmt = stmt.where(QuestionItemStatistic.is_flagged.is_(True))
+    stmt = stmt.order_by(QuestionItemStatistic.p_value.asc().nulls_last(), QuestionItemStatistic.question_id)
+    result = await db.execute(stmt.offset(skip).limit(limit))
+    return [
+        ItemAnalyticsResponse.model_validate(stat).model_copy(
+            update={"question_text": question_text, "correct_answer": correct_answer}
+        )
+        for stat, question_text, correct_answer in result.all()
+    ]
+
+
 @router.get("/admin/proctoring/events", response_model=List[ProctoringEventAdminResponse])
 async def admin_list_proctoring_events(
+    test_session_id: Optional[str] = Query(None),
+    severity: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Admin-scoped listing of proctoring events, enriched with test session info."""
     await check_admin(current_user)
-    # Join TestSession to provide context for admins
-    from sqlalchemy import select, desc
-    from app.db.models import TestSession
-
-    stmt = select(ProctoringEvent, TestSession).outerjoin(TestSession, TestSession.session_id == ProctoringEvent.test_session_id).order_by(desc(ProctoringEvent.detected_at)).limit(200)
+    stmt = select(ProctoringEvent, TestSession).outerjoin(
+        TestSession, TestSession.session_id == ProctoringEvent.test_session_id
+    )
+    if test_session_id:
+        stmt = stmt.where(ProctoringEvent.test_session_id == test_session_id)
+    if severity:
+        stmt = stmt.where(ProctoringEvent.severity == severity)
+    stmt = stmt.order_by(desc(ProctoringEvent.detected_at)).offset(skip).limit(limit)
     result = await db.execute(stmt)
-    rows = result.all()
-    out = []
-    for evt, session in rows:
-        # Build response safely to avoid Pydantic validation errors if DB fields are unexpected
-        try:
-            base = ProctoringEventResponse.from_orm(evt).dict(by_alias=True)
-        except Exception:
-            base = {
-                "id": getattr(evt, 'id', None),
-                "event_id": getattr(evt, 'event_id', None),
-                "test_session_id": getattr(evt, 'test_session_id', None),
-                "event_type": getattr(evt, 'event_type', None),
-                "severity": getattr(evt, 'severity', None),
-                "detected_at": getattr(evt, 'detected_at', None),
-                "duration_seconds": getattr(evt, 'duration_seconds', None),
-                "question_id": getattr(evt, 'question_id', None),
-                "snapshot_url": getattr(evt, 'snapshot_url', None),
-                "metadata": getattr(evt, 'event_metadata', {}) if isinstance(getattr(evt, 'event_metadata', {}), dict) else {},
-                "reviewed": getattr(evt, 'reviewed', False),
-                "reviewed_by": getattr(evt, 'reviewed_by', None),
-                "reviewed_at": getattr(evt, 'reviewed_at', None),
-                "reviewer_notes": getattr(evt, 'reviewer_notes', None),
-                "flagged": getattr(evt, 'flagged', False),
-                "created_at": getattr(evt, 'created_at', None),
-            }
-
-        base.update({
-            "test_session_id": base.get('test_session_id') or evt.test_session_id,
-            "test_session_candidate_name": getattr(session, 'candidate_name', None) if session else None,
-            "test_session_candidate_email": getattr(session, 'candidate_email', None) if session else None,
-            "test_session_job_title": getattr(session, 'job_title', None) if session else None,
-            "test_session_score_percentage": getattr(session, 'score_percentage', None) if session else None,
+    return [
+        ProctoringEventAdminResponse.model_validate(evt).model_copy(update={
+            "test_session_candidate_name": session.candidate_name if session else None,
+            "test_session_candidate_email": session.candidate_email if session else None,
+            "test_session_score_percentage": session.score_percentage if session else None,
         })
-        out.append(base)
-    return out
+        for evt, session in result.all()
+    ]
+
+
+@router.get("/admin/proctoring/risk", response_model=List[ProctoringRiskResponse])
+async def admin_proctoring_risk(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Active test sessions with the highest rolling proctoring risk, highest first."""
+    await check_admin(current_user)
+    scorer = get_risk_scorer()
+    if scorer is None:
+        raise HTTPException(status_code=503, detail="Proctoring risk scoring is not enabled")
+    # Over-fetch: completed sessions are dropped from the ranking as they are found
+    ranked = await scorer.top(limit * 2)
+    result = await db.execute(
+        select(TestSession).where(TestSession.session_id.in_([r["test_session_id"] for r in ranked]))
+    )
+    sessions = {s.session_id: s for s in result.scalars().all()}
+    await scorer.forget([
+        r["test_session_id"] for r in ranked
+        if r["test_session_id"] not in sessions or sessions[r["test_session_id"]].is_completed
+    ])
+    out = []
+    for r in ranked:
+        session = sessions.get(r["test_session_id"])
+        if session is None or session.is_completed:
+            continue
+        out.append(ProctoringRiskResponse(
+            **r,
+            candidate_name=session.candidate_name,
+            candidate_email=session.candidate_email,
+            started_at=session.started_at,
+        ))
+    return out[:limit]
 
 
 @router.patch("/admin/applications/{application_id}/status")
@@ -1,12 +1,12 @@
 """Admin endpoints for bulk skill extraction from documents."""
 from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status, Query, Body
 from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import uuid
-from io import BytesIO
 
 from app.core.dependencies import get_db, get_current_user
 from app.core.storage import get_s3_service
@@ -24,7 +24,12 @@ from app.models.schemas import (
     TransformCVResponse,
 )
 from app.utils.cv_parser import CVParser
-from app.utils.cv_formatter import CVFormatter, format_cv_from_parsed_sections
+from app.utils.cv_formatter import iter_docx_zip, render_cv_batch, render_cv_docx
+from app.utils.cv_renderer import RENDER_FORMATS, RendererUnavailableError, get_cv_artifact_cache
+from app.vector_db.skill_matcher import SkillMatcher, load_skill_matcher
+from config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin-skill-extraction"])
 
@@ -382,14 +387,17 @@ def validate_document_pair(jd_class: Dict, cv_class: Dict, jd_text: str, cv_text
 def calculate_match_score(
     jd_skills: Dict[str, Tuple[str, str, float]],
     cv_skills: Dict[str, Tuple[str, str, float]],
+    matcher: Optional[SkillMatcher] = None,
 ) -> Tuple[float, List[MatchedSkill], List[str], List[str]]:
-    """Calculate skill match score and return matched, missing, and extra skills."""
-    jd_skill_names = set(jd_skills.keys())
-    cv_skill_names = set(cv_skills.keys())
-    
-    matched = jd_skill_names.intersection(cv_skill_names)
-    missing = jd_skill_names.difference(cv_skill_names)
-    extra = cv_skill_names.difference(jd_skill_names)
+    """Calculate skill match score and return matched, missing, and extra skills.
+
+    JD skills are paired with their most similar CV skill by the semantic
+    matcher; each match's weight is scaled by its similarity.
+    """
+    matcher = matcher or SkillMatcher()
+    jd_skill_names = list(jd_skills)
+    cv_skill_names = list(cv_skills)
+    results = matcher.match(jd_skill_names, cv_skill_names)
     
     # Calculate weighted score
     total_weight = sum(
@@ -399,28 +407,38 @@ def calculate_match_score(
     
     matched_weight = 0.0
     matched_skills_list = []
+    missing = []
+    used_cv_skills = set()
     
-    for s in matched:
+    for result in results:
+        s, cv_name = result.skill, result.matched
+        if cv_name is None:
+            missing.append(s)
+            continue
+        used_cv_skills.add(cv_name)
         jd_prof = jd_skills.get(s, ("intermediate", "technical", 0.7))[0]
-        cv_prof = cv_skills.get(s, ("intermediate", "technical", 0.7))[0]
-        cv_conf = cv_skills.get(s, (jd_prof, "technical", 0.6))[2] or 0.6
+        cv_prof = cv_skills.get(cv_name, ("intermediate", "technical", 0.7))[0]
+        cv_conf = cv_skills.get(cv_name, (jd_prof, "technical", 0.6))[2] or 0.6
         
         weight = min(
             PROFICIENCY_WEIGHTS.get(jd_prof, 1.0),
             PROFICIENCY_WEIGHTS.get(cv_prof, 1.0)
         )
-        matched_weight += weight * (cv_conf or 0.6)
+        matched_weight += weight * (cv_conf or 0.6) * result.score
         
         matched_skills_list.append(MatchedSkill(
             skill_name=s,
             jd_proficiency=jd_prof,
             cv_proficiency=cv_prof,
-            confidence=cv_conf
+            confidence=cv_conf,
+            cv_skill_name=cv_name if cv_name != s else None,
+            similarity=result.score,
         ))
     
+    extra = [s for s in cv_skill_names if s not in used_cv_skills]
     score = min((matched_weight / total_weight) * 100, 100.0)
     
-    return round(float(score), 2), matched_skills_list, list(missing), list(extra)
+    return round(float(score), 2), matched_skills_list, missing, extra
 
 
 async def save_skill_match(
@@ -819,7 +837,10 @@ async def skill_match_score(
         )
     
     # Calculate match score
-    score, matched_skills_list, missing, extra = calculate_match_score(jd_skills, cv_skills)
+    matcher = await load_skill_matcher()
+    score, matched_skills_list, missing, extra = await run_in_threadpool(
+        calculate_match_score, jd_skills, cv_skills, matcher
+    )
     
     response = SkillMatchResponse(
         success=True,
@@ -1088,6 +1109,87 @@ async def rebuild_cv(
         )
 
 
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _basic_cv_data(cv_text: str, cv_data: Optional[Dict] = None) -> Dict:
+    """CV data for /format-cv-docx: the caller's data or a summary of the text."""
+    return cv_data or {
+        'name': 'Formatted CV',
+        'email': '',
+        'summary': cv_text[:500] if cv_text else '',
+    }
+
+
+def _professional_cv_data(cv_text: str) -> Dict:
+    """Build structured CV data from parsed CV sections."""
+    parser = CVParser(cv_text)
+    parser.parse()
+    sections_summary = parser.get_summary()
+    
+    cv_data = {
+        'name': 'Professional CV',
+        'email': '',
+        'phone': '',
+        'location': '',
+        'summary': cv_text[:300] if cv_text else '',
+        'experience': [],
+        'education': [],
+        'skills': [],
+        'certifications': [],
+        'projects': [],
+    }
+    
+    # Populate from sections
+    if 'experience' in sections_summary:
+        for item in sections_summary['experience'].get('items', []):
+            cv_data['experience'].append({
+                'company': item.get('label', ''),
+                'role': item.get('role', ''),
+                'dates': item.get('dates', ''),
+                'description': ''
+            })
+    
+    if 'education' in sections_summary:
+        for item in sections_summary['education'].get('items', []):
+            cv_data['education'].append({
+                'degree': item.get('label', ''),
+                'institution': '',
+                'year': ''
+            })
+    
+    if 'skills' in sections_summary:
+        cv_data['skills'] = [
+            item.get('label', '') 
+            for item in sections_summary['skills'].get('items', [])
+        ]
+    
+    if 'certifications' in sections_summary:
+        cv_data['certifications'] = [
+            item.get('label', '') 
+            for item in sections_summary['certifications'].get('items', [])
+        ]
+    
+    if 'projects' in sections_summary:
+        for item in sections_summary['projects'].get('items', []):
+            cv_data['projects'].append({
+                'project': item.get('label', ''),
+                'description': ''
+            })
+    
+    return cv_data
+
+
+def _docx_response(content: bytes, prefix: str) -> StreamingResponse:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{prefix}_{timestamp}.docx"
+    return StreamingResponse(
+        iter([content]),
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.post("/format-cv-docx")
 async def format_cv_to_docx(
     payload: Dict = Body(...),
@@ -1106,33 +1208,9 @@ async def format_cv_to_docx(
         )
     
     try:
-        # Create formatted CV
-        formatter = CVFormatter()
-        
-        # Build CV data structure
-        formatted_data = cv_data or {
-            'name': 'Formatted CV',
-            'email': '',
-            'summary': cv_text[:500] if cv_text else '',
-        }
-        
-        # Create document
-        doc = formatter.create_cv(formatted_data)
-        
-        # Save to BytesIO
-        byte_stream = BytesIO()
-        doc.save(byte_stream)
-        byte_stream.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"CV_Formatted_{timestamp}.docx"
-        
-        return StreamingResponse(
-            iter([byte_stream.getvalue()]),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        # Render off the event loop so concurrent requests are not serialized
+        content = await run_in_threadpool(render_cv_docx, _basic_cv_data(cv_text, cv_data))
+        return _docx_response(content, "CV_Formatted")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1149,7 +1227,6 @@ async def format_cv_professionally(
     await check_admin(current_user)
     
     cv_text = payload.get('cv_text')
-    sections_config = payload.get('sections_config')
     
     if not cv_text:
         raise HTTPException(
@@ -1158,85 +1235,109 @@ async def format_cv_professionally(
         )
     
     try:
-        # Parse CV sections
-        parser = CVParser(cv_text)
-        parser.parse()
-        sections_summary = parser.get_summary()
-        
-        # Format as professional DOCX
-        formatter = CVFormatter()
-        
-        # Build structured data from parsed sections
-        cv_data = {
-            'name': 'Professional CV',
-            'email': '',
-            'phone': '',
-            'location': '',
-            'summary': cv_text[:300] if cv_text else '',
-            'experience': [],
-            'education': [],
-            'skills': [],
-            'certifications': [],
-            'projects': [],
-        }
-        
-        # Populate from sections
-        if 'experience' in sections_summary:
-            for item in sections_summary['experience'].get('items', []):
-                cv_data['experience'].append({
-                    'company': item.get('label', ''),
-                    'role': item.get('role', ''),
-                    'dates': item.get('dates', ''),
-                    'description': ''
-                })
-        
-        if 'education' in sections_summary:
-            for item in sections_summary['education'].get('items', []):
-                cv_data['education'].append({
-                    'degree': item.get('label', ''),
-                    'institution': '',
-                    'year': ''
-                })
-        
-        if 'skills' in sections_summary:
-            cv_data['skills'] = [
-                item.get('label', '') 
-                for item in sections_summary['skills'].get('items', [])
-            ]
-        
-        if 'certifications' in sections_summary:
-            cv_data['certifications'] = [
-                item.get('label', '') 
-                for item in sections_summary['certifications'].get('items', [])
-            ]
-        
-        if 'projects' in sections_summary:
-            for item in sections_summary['projects'].get('items', []):
-                cv_data['projects'].append({
-                    'project': item.get('label', ''),
-                    'description': ''
-                })
-        
-        # Create document
-        doc = formatter.create_cv(cv_data)
-        
-        # Save to BytesIO
-        byte_stream = BytesIO()
-        doc.save(byte_stream)
-        byte_stream.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"CV_Professional_{timestamp}.docx"
-        
-        return StreamingResponse(
-            iter([byte_stream.getvalue()]),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        content = await run_in_threadpool(lambda: render_cv_docx(_professional_cv_data(cv_text)))
+        return _docx_response(content, "CV_Professional")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to format CV professionally: {str(e)}"
         )
 
+
+@router.post("/format-cv-docx/batch")
+async def format_cv_docx_batch(
+    payload: Dict = Body(...),
+    current_user: User = Depends(get_current_user),
+):
+    """Render many CVs to DOCX and stream them back as one zip archive.
+    
+    Payload: {"cvs": [{"name": str, "cv_text": str, "cv_data": dict (optional)}],
+              "professional": bool}. Without cv_data, "professional" builds the
+    document from parsed sections, otherwise from a text summary.
+    """
+    await check_admin(current_user)
+    
+    cvs = payload.get('cvs') or []
+    professional = bool(payload.get('professional', True))
+    
+    if not cvs:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one CV is required"
+        )
+    if len(cvs) > settings.CV_RENDER_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.CV_RENDER_BATCH_MAX} CVs per batch"
+        )
+    
+    items = []
+    for index, cv in enumerate(cvs):
+        cv_text = cv.get('cv_text') or ''
+        cv_data = cv.get('cv_data')
+        if not cv_text and not cv_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CV {index}: cv_text or cv_data is required"
+            )
+        if not cv_data:
+            cv_data = _professional_cv_data(cv_text) if professional else _basic_cv_data(cv_text)
+        items.append((cv.get('name') or f"CV_{index + 1}", cv_data))
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        iter_docx_zip(render_cv_batch(items)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=CVs_{timestamp}.zip"}
+    )
+
+
+@router.post("/render-cv")
+async def render_cv_artifact(
+    payload: Dict = Body(...),
+    current_user: User = Depends(get_current_user),
+):
+    """Render a CV as DOCX, PDF or HTML and return a presigned download URL.
+    
+    Payload: {"cv_text": str, "cv_data": dict (optional), "format": "docx" | "pdf" | "html",
+              "professional": bool}. Artifacts are cached in S3 by content hash,
+    so repeat previews of the same CV skip rendering.
+    """
+    await check_admin(current_user)
+    
+    cv_text = payload.get('cv_text') or ''
+    cv_data = payload.get('cv_data')
+    fmt = (payload.get('format') or 'docx').lower()
+    
+    if not cv_text and not cv_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CV text or cv_data is required"
+        )
+    if fmt not in RENDER_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {fmt}. Use one of {', '.join(RENDER_FORMATS)}"
+        )
+    
+    if not cv_data:
+        cv_data = _professional_cv_data(cv_text) if payload.get('professional', True) else _basic_cv_data(cv_text)
+    
+    try:
+        artifact = await run_in_threadpool(get_cv_artifact_cache().get_or_render, cv_data, fmt)
+    except RendererUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to render CV: {str(e)}"
+        )
+    
+    return {
+        "success": True,
+        "message": "CV served from cache" if artifact["cached"] else "CV rendered",
+        **artifact,
+    }
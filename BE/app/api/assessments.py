@@ -10,12 +10,14 @@ from pydantic import BaseModel
 from app.core.dependencies import get_db, get_current_user, optional_auth, validate_assessment_token
 from app.core.security import check_admin, is_admin_user
 from app.core.email import send_email
+from app.core.question_cache import get_question_cache, start_response
+from app.core.tasks.match_scores import enqueue, refresh_candidate_matches
 from config import get_settings
 import secrets
 from datetime import timedelta
 from app.db.models import AssessmentToken
 from app.models.schemas import AssessmentInviteRequest, AssessmentInviteResponse
-from app.db.models import Assessment, AssessmentApplication, Candidate, User, JobDescription, TestSession, Question
+from app.db.models import Assessment, AssessmentApplication, Candidate, User, JobDescription, TestSession
 from app.models.schemas import (
     AssessmentCreate, AssessmentUpdate, AssessmentResponse,
     AssessmentApplicationRequest, AssessmentApplicationResponse,
@@ -299,6 +301,8 @@ async def create_assessment(
     db.add(assessment)
     await db.commit()
     await db.refresh(assessment)
+    if candidate_db is not None:
+        enqueue(refresh_candidate_matches, candidate_db.candidate_id)
     
     return AssessmentResponse(
         id=assessment.id,
@@ -604,7 +608,8 @@ async def start_assessment_session(
     cand_result = await db.execute(cand_stmt)
     candidate = cand_result.scalars().first()
 
-    if not candidate:
+    candidate_created = candidate is None
+    if candidate_created:
         candidate = Candidate(
             full_name=token_rec.candidate_email.split('@')[0].title(),
             email=token_rec.candidate_email,
@@ -652,26 +657,12 @@ async def start_assessment_session(
     # Mark token used
     token_rec.is_used = True
 
-    # If question_set_id is present, fetch questions and set total_questions
-    question_list = []
+    # If question_set_id is present, take the cached questions and set total_questions
+    payload = None
     if assessment.question_set_id:
-        # Reuse existing logic from question set flow
-        qs_stmt = select(Question).where(Question.question_set_id == assessment.question_set_id).order_by(Question.id)
-        qs_result = await db.execute(qs_stmt)
-        questions = qs_result.scalars().all()
-        test_session.total_questions = len(questions)
-        # Format questions for response (without correct answers)
-        for q in questions:
-            options = [
-                {'option_id': opt_id, 'text': opt_text}
-                for opt_id, opt_text in sorted(q.options.items())
-            ]
-            question_list.append({
-                'question_id': q.id,
-                'question_text': q.question_text,
-                'options': options,
-                'correct_answer': '',
-            })
+        # Same pre-serialized payload as the question set flow (without correct answers)
+        payload = await get_question_cache().get(db, assessment.question_set_id)
+        test_session.total_questions = payload.count if payload else 0
     else:
         # JD-based assessments handled later
         pass
@@ -682,17 +673,22 @@ async def start_assessment_session(
     await db.commit()
     await db.refresh(test_session)
     await db.refresh(application)
+    if candidate_created:
+        enqueue(refresh_candidate_matches, candidate.candidate_id)
 
     # Build response similar to StartQuestionSetTestResponse
     # Note: skill and level fields repurposed for compatibility
-    return StartQuestionSetTestResponse(
-        session_id=test_session.session_id,
-        question_set_id=assessment.question_set_id or "",
-        skill=list(assessment.required_skills.keys())[0] if assessment.required_skills else "",
-        level=assessment.assessment_method or 'questionnaire',
-        total_questions=test_session.total_questions,
-        started_at=started_at,
-        questions=question_list,
+    return start_response(
+        {
+            "session_id": test_session.session_id,
+            "question_set_id": assessment.question_set_id or "",
+            "skill": list(assessment.required_skills.keys())[0] if assessment.required_skills else "",
+            "level": assessment.assessment_method or 'questionnaire',
+            "total_questions": test_session.total_questions,
+            "started_at": started_at,
+        },
+        payload,
+        shuffle_seed=test_session.session_id if get_settings().QUESTION_SHUFFLE_ENABLED else None,
     )
 
 
@@ -25,6 +25,7 @@ import csv
 import io
 import secrets
 from app.core.email import send_email
+from app.core.tasks.match_scores import enqueue, refresh_candidate_matches
 from config import get_settings
 from datetime import timedelta
 
@@ -134,6 +135,7 @@ async def create_candidate(
     db.add(candidate)
     await db.commit()
     await db.refresh(candidate)
+    enqueue(refresh_candidate_matches, candidate.candidate_id)
     
     return CandidateResponse(
         id=candidate.id,
@@ -253,6 +255,8 @@ async def update_candidate(
     candidate.updated_at = datetime.utcnow()
     await db.commit()
     await db.refresh(candidate)
+    if request.skills is not None:
+        enqueue(refresh_candidate_matches, candidate.candidate_id)
     
     return CandidateResponse(
         id=candidate.id,
@@ -397,6 +401,7 @@ async def override_candidate_skills(
     candidate.updated_at = datetime.utcnow()
     await db.commit()
     await db.refresh(candidate)
+    enqueue(refresh_candidate_matches, candidate.candidate_id)
     
     return CandidateResponse(
         id=candidate.id,
@@ -597,6 +602,8 @@ async def bulk_candidates(payload: dict, current_user: User = Depends(get_curren
             c.is_active = (action == 'reactivate')
             c.updated_at = datetime.utcnow()
         await db.commit()
+        for c in rows:
+            enqueue(refresh_candidate_matches, c.candidate_id)
         return {"message": f"Action {action} applied to {len(rows)} candidates"}
     elif action == 'export':
         # Export CSV
@@ -716,6 +723,7 @@ async def deactivate_candidate(candidate_id: str, current_user: Optional[User] =
     c.is_active = False
     c.updated_at = datetime.utcnow()
     await db.commit()
+    enqueue(refresh_candidate_matches, c.candidate_id)
     return {"message": "Candidate deactivated"}
 
 
@@ -734,6 +742,7 @@ async def reactivate_candidate(candidate_id: str, current_user: Optional[User] =
     c.updated_at = datetime.utcnow()
     await db.commit()
     await db.refresh(c)
+    enqueue(refresh_candidate_matches, c.candidate_id)
     return CandidateResponse(
         id=c.id,
         candidate_id=c.candidate_id,
@@ -838,6 +847,7 @@ async def save_cv_extracted_data(
         candidate.updated_at = datetime.utcnow()
         await db.commit()
         await db.refresh(candidate)
+        enqueue(refresh_candidate_matches, candidate.candidate_id)
         
         return {
             "status": "success",
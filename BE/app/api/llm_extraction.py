@@ -2,16 +2,20 @@
 LLM-based CV and JD extraction API endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Literal, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+import json
 import os
 
 from app.core.dependencies import get_db, optional_user
 from app.db.models import User, ExtractionLog
 from app.utils.llm_cv_extractor import LLMCVExtractor
 from app.utils.ollama_extractor import OllamaExtractor
+from app.vector_db.skill_matcher import load_skill_matcher
 from app.core.logging import get_logger
 from config import get_settings
 
@@ -175,6 +179,45 @@ async def extract_cv_with_llm(
             detail=f"CV extraction failed: {str(e)}"
         )
 
+@router.post("/cv-with-llm/stream")
+async def stream_cv_entries_with_llm(
+    request: CVExtractionRequest,
+    field: Literal["work_experience", "projects"] = Query("work_experience"),
+) -> StreamingResponse:
+    """
+    Stream CV work-experience or project entries as NDJSON
+
+    Each line is one entry, validated against the CV entry schema and sent
+    as soon as the LLM closes it, so clients can render the first entries
+    before the whole completion has arrived.
+    """
+    if not llm_api_key:
+        logger.error("LLM API key not configured")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="LLM extraction service not configured"
+        )
+
+    if len(request.cv_text.strip()) < 50:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CV text too short for extraction"
+        )
+
+    extractor = get_extractor()
+
+    async def entries() -> AsyncIterator[str]:
+        if isinstance(extractor, LLMCVExtractor):
+            async for entry in extractor.stream_cv_entries(request.cv_text, field=field):
+                yield json.dumps(entry) + "\n"
+        else:
+            # Extractors without streaming: extract once, then emit the entries
+            data = await extractor.extract_cv_data(request.cv_text)
+            for entry in data.get(field) or []:
+                yield json.dumps(entry) + "\n"
+
+    return StreamingResponse(entries(), media_type="application/x-ndjson")
+
 @router.post("/jd-with-llm", response_model=JDExtractionResponse)
 async def extract_jd_with_llm(
     request: JDExtractionRequest,
@@ -276,18 +319,15 @@ async def compare_cv_with_jd(
         jd_must_have = jd_data.get("must_have_skills", [])
         jd_nice_to_have = jd_data.get("nice_to_have_skills", [])
         
-        # Find matching skills
-        must_have_matches = [
-            skill for skill in jd_must_have
-            if any(cv_skill.lower() in skill.lower() or skill.lower() in cv_skill.lower()
-                   for cv_skill in cv_skills)
-        ]
-        
-        nice_to_have_matches = [
-            skill for skill in jd_nice_to_have
-            if any(cv_skill.lower() in skill.lower() or skill.lower() in cv_skill.lower()
-                   for cv_skill in cv_skills)
-        ]
+        # Find matching skills: one similarity matrix for all JD skills vs CV skills
+        matcher = await load_skill_matcher()
+        results = await run_in_threadpool(matcher.match, jd_must_have + jd_nice_to_have, cv_skills)
+        skill_scores = {
+            result.skill: {"matched_cv_skill": result.matched, "score": result.score}
+            for result in results
+        }
+        must_have_matches = [r.skill for r in results[:len(jd_must_have)] if r.matched]
+        nice_to_have_matches = [r.skill for r in results[len(jd_must_have):] if r.matched]
         
         must_have_percentage = (
             (len(must_have_matches) / len(jd_must_have) * 100)
@@ -312,7 +352,8 @@ async def compare_cv_with_jd(
                 "must_have_percentage": must_have_percentage,
                 "nice_to_have_matches": nice_to_have_matches,
                 "nice_to_have_percentage": nice_to_have_percentage,
-                "missing_must_have": [s for s in jd_must_have if s not in must_have_matches]
+                "missing_must_have": [s for s in jd_must_have if s not in must_have_matches],
+                "skill_scores": skill_scores,
             },
             "experience_match": {
                 "candidate_experience": f"{cv_exp} years",
@@ -1,4 +1,5 @@
 """Proctoring endpoints for logging and reviewing events."""
+import uuid
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,9 +7,17 @@ from sqlalchemy import select, desc
 from datetime import datetime
 
 from app.db.session import get_db
-from app.db.models import ProctoringEvent, User, TestSession
-from app.models.schemas import ProctoringEventCreate, ProctoringEventResponse, ProctoringEventReview, ProctoringEventAdminResponse
+from app.db.models import ProctoringEvent, ProctoringIncidentSeverity, User, TestSession
+from app.models.schemas import (
+    ProctoringEventCreate, ProctoringEventResponse, ProctoringEventReview, ProctoringEventAdminResponse,
+    ProctoringEventBatch, ProctoringEventBatchResponse,
+)
 from app.core.dependencies import get_current_user
+from app.core.proctoring_buffer import get_proctoring_buffer
+from app.core.proctoring_risk import record_risk
+from config import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/proctoring", tags=["proctoring"])
 
@@ -28,50 +37,63 @@ async def log_event(payload: ProctoringEventCreate, db: AsyncSession = Depends(g
         question_id=payload.question_id,
         snapshot_url=payload.snapshot_url,
         event_metadata=payload.metadata,
-        detected_at=datetime.utcnow(),
+        detected_at=payload.detected_at or datetime.utcnow(),
     )
     db.add(evt)
     await db.commit()
     await db.refresh(evt)
-    return ProctoringEventResponse.from_orm(evt)
-
-
-def _serialize_event(evt: ProctoringEvent, session: TestSession | None) -> dict:
-    # Safely serialize a ProctoringEvent to a plain dict suitable for JSON responses.
-    # Some DB rows may have `metadata` column name conflicts; ensure `event_metadata` is a dict.
-    try:
-        base = ProctoringEventResponse.from_orm(evt).dict(by_alias=True)
-    except Exception:
-        # Fallback: build the dict manually to avoid Pydantic validation errors (e.g., when event_metadata is not a dict)
-        base = {
-            "id": getattr(evt, 'id', None),
-            "event_id": getattr(evt, 'event_id', None),
-            "test_session_id": getattr(evt, 'test_session_id', None),
-            "event_type": getattr(evt, 'event_type', None),
-            "severity": getattr(evt, 'severity', None),
-            "detected_at": getattr(evt, 'detected_at', None),
-            "duration_seconds": getattr(evt, 'duration_seconds', None),
-            "question_id": getattr(evt, 'question_id', None),
-            "snapshot_url": getattr(evt, 'snapshot_url', None),
-            # Ensure metadata is a dict
-            "metadata": getattr(evt, 'event_metadata', {}) if isinstance(getattr(evt, 'event_metadata', {}), dict) else {},
-            "reviewed": getattr(evt, 'reviewed', False),
-            "reviewed_by": getattr(evt, 'reviewed_by', None),
-            "reviewed_at": getattr(evt, 'reviewed_at', None),
-            "reviewer_notes": getattr(evt, 'reviewer_notes', None),
-            "flagged": getattr(evt, 'flagged', False),
-            "created_at": getattr(evt, 'created_at', None),
-        }
-
-    # Attach flattened test session fields for admin UIs
-    base.update({
-        "test_session_id": base.get('test_session_id') or evt.test_session_id,
-        "test_session_candidate_name": getattr(session, 'candidate_name', None) if session else None,
-        "test_session_candidate_email": getattr(session, 'candidate_email', None) if session else None,
+    await record_risk([{"test_session_id": evt.test_session_id, "event_type": evt.event_type, "severity": evt.severity}])
+    return ProctoringEventResponse.model_validate(evt)
+
+
+@router.post("/events/batch", response_model=ProctoringEventBatchResponse, status_code=202)
+async def log_events_batch(payload: ProctoringEventBatch) -> ProctoringEventBatchResponse:
+    """Accept several events and write them asynchronously in batches.
+
+    Returns 503 with Retry-After when the ingestion buffer is full; nothing
+    from the request is kept in that case, so the client can resend it as is.
+    """
+    if len(payload.events) > settings.PROCTORING_MAX_BATCH_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.PROCTORING_MAX_BATCH_EVENTS} events per batch"
+        )
+    received_at = datetime.utcnow()
+    rows = []
+    for event in payload.events:
+        try:
+            severity = ProctoringIncidentSeverity(event.severity)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid severity '{event.severity}'")
+        rows.append({
+            "event_id": f"proc_{uuid.uuid4().hex[:12]}",
+            "test_session_id": event.test_session_id,
+            "event_type": event.event_type,
+            "severity": severity,
+            "duration_seconds": event.duration_seconds,
+            "question_id": event.question_id,
+            "snapshot_url": event.snapshot_url,
+            "event_metadata": event.metadata,
+            "detected_at": event.detected_at or received_at,
+        })
+    if not get_proctoring_buffer().submit(rows):
+        raise HTTPException(
+            status_code=503,
+            detail="Proctoring event buffer is full, retry later",
+            headers={"Retry-After": str(settings.PROCTORING_RETRY_AFTER_SECONDS)},
+        )
+    await record_risk(rows)
+    return ProctoringEventBatchResponse(accepted=len(rows), event_ids=[row["event_id"] for row in rows])
+
+
+def _serialize_event(evt: ProctoringEvent, session: TestSession | None) -> ProctoringEventAdminResponse:
+    """Event plus flattened test session fields for admin UIs."""
+    return ProctoringEventAdminResponse.model_validate(evt).model_copy(update={
+        "test_session_candidate_name": session.candidate_name if session else None,
+        "test_session_candidate_email": session.candidate_email if session else None,
         "test_session_job_title": getattr(session, 'job_title', None) if session else None,
-        "test_session_score_percentage": getattr(session, 'score_percentage', None) if session else None,
+        "test_session_score_percentage": session.score_percentage if session else None,
     })
-    return base
 
 
 @router.get("/events", response_model=List["ProctoringEventAdminResponse"])
@@ -1,27 +1,87 @@
 """QuestionSet Test API - Immediate feedback flow."""
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Collection, Dict, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
 from app.db.session import get_db
 from app.db.models import User, TestSession, Question, Answer, QuestionSet
+from app.core.answer_journal import JournaledAnswers, get_answer_journal, upsert_answers
 from app.core.dependencies import get_current_user
+from app.core.logging import get_logger
+from app.core.question_cache import get_question_cache, start_response
+from app.core.scoring import get_answer_keys
 from app.utils.streak_manager import check_and_update_quiz_completion
 from app.models.schemas import (
     StartQuestionSetTestRequest,
     StartQuestionSetTestResponse,
     SubmitAllAnswersRequest,
+    SaveAnswersRequest,
+    SaveAnswersResponse,
     TestResultResponse,
-    MCQQuestion,
     MCQOption,
     QuestionResultDetailed
 )
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
 
 router = APIRouter()
 
 
+def _seconds_left(session: TestSession) -> int:
+    """Server-side time left, including the grace period, from the session start."""
+    deadline = session.started_at + timedelta(
+        minutes=settings.TEST_DURATION_MINUTES, seconds=settings.TEST_DEADLINE_GRACE_SECONDS
+    )
+    return int((deadline - datetime.now(timezone.utc)).total_seconds())
+
+
+def _validate_answers(answers: JournaledAnswers, options: Dict[int, Collection[str]]) -> None:
+    for question_id, (selected_answer, _) in answers.items():
+        if question_id not in options:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question {question_id} not found in this QuestionSet"
+            )
+        if selected_answer not in options[question_id]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid answer '{selected_answer}' for question {question_id}"
+            )
+
+
+async def _load_open_session(
+    db: AsyncSession, session_id: str, user_id: int
+) -> Tuple[TestSession, Dict[int, Question]]:
+    """The user's unfinished QuestionSet session and its questions by id."""
+    result = await db.execute(
+        select(TestSession).where(
+            and_(TestSession.session_id == session_id, TestSession.user_id == user_id)
+        )
+    )
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test session not found")
+    if session.is_completed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Test session already completed")
+    if not session.question_set_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This endpoint is only for QuestionSet-based tests"
+        )
+    questions_result = await db.execute(
+        select(Question).where(Question.question_set_id == session.question_set_id)
+    )
+    return session, {q.id: q for q in questions_result.scalars().all()}
+
+
+def _time_over() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Test time is over")
+
+
 @router.post("/questionset-tests/start", response_model=StartQuestionSetTestResponse)
 async def start_questionset_test(
     request: StartQuestionSetTestRequest,
@@ -60,7 +120,8 @@ async def start_questionset_test(
     - Prevents duplicate sessions from being created
     
     **Next Steps:**
-    After starting the test, use `/questionset-tests/submit` to submit all answers.
+    Save answers as the candidate goes with `PUT /questionset-tests/{session_id}/answers`,
+    then finish with `/questionset-tests/submit`.
     
     **Example Response:**
     ```json
@@ -85,27 +146,18 @@ async def start_questionset_test(
     }
     ```
     """
-    # Get QuestionSet
-    result = await db.execute(
-        select(QuestionSet).where(QuestionSet.question_set_id == request.question_set_id)
-    )
-    question_set = result.scalar_one_or_none()
+    # Answer-free questions come pre-serialized from the question payload cache
+    payload = await get_question_cache().get(db, request.question_set_id)
     
-    if not question_set:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"QuestionSet '{request.question_set_id}' not found"
+    if payload is None:
+        result = await db.execute(
+            select(QuestionSet.id).where(QuestionSet.question_set_id == request.question_set_id)
         )
-    
-    # Get all questions for this set
-    questions_result = await db.execute(
-        select(Question)
-        .where(Question.question_set_id == request.question_set_id)
-        .order_by(Question.id)
-    )
-    questions = questions_result.scalars().all()
-    
-    if not questions:
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"QuestionSet '{request.question_set_id}' not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No questions found for QuestionSet '{request.question_set_id}'"
@@ -119,7 +171,7 @@ async def start_questionset_test(
         candidate_name=current_user.full_name,
         candidate_email=current_user.email,
         started_at=started_at,
-        total_questions=len(questions),
+        total_questions=payload.count,
         is_completed=False,
         is_scored=False  # Will be scored immediately upon submission
     )
@@ -128,33 +180,101 @@ async def start_questionset_test(
     await db.commit()
     await db.refresh(test_session)
     
-    # Format questions for response (WITHOUT correct answers)
-    question_list = []
-    for q in questions:
-        options = [
-            MCQOption(option_id=opt_id, text=opt_text)
-            for opt_id, opt_text in sorted(q.options.items())
-        ]
-        question_list.append(
-            MCQQuestion(
-                question_id=q.id,
-                question_text=q.question_text,
-                options=options,
-                correct_answer=""  # Don't reveal correct answer
+    # Start the server-side deadline and the answer journal
+    journal = get_answer_journal()
+    if journal is not None:
+        try:
+            await journal.open(
+                test_session.session_id, current_user.id, request.question_set_id,
+                payload.options,
+                settings.TEST_DURATION_MINUTES * 60 + settings.TEST_DEADLINE_GRACE_SECONDS,
             )
-        )
+        except Exception as e:
+            logger.warning(f"Answer journal unavailable for {test_session.session_id}: {e}")
     
-    return StartQuestionSetTestResponse(
-        session_id=test_session.session_id,
-        question_set_id=question_set.question_set_id,
-        skill=question_set.skill,
-        level=question_set.level,
-        total_questions=question_set.total_questions,
-        started_at=started_at,
-        questions=question_list
+    # Questions WITHOUT correct answers, shuffled per session when enabled
+    return start_response(
+        {
+            "session_id": test_session.session_id,
+            "question_set_id": payload.question_set_id,
+            "skill": payload.skill,
+            "level": payload.level,
+            "total_questions": payload.total_questions,
+            "started_at": started_at,
+        },
+        payload,
+        shuffle_seed=test_session.session_id if settings.QUESTION_SHUFFLE_ENABLED else None,
     )
 
 
+@router.put("/questionset-tests/{session_id}/answers", response_model=SaveAnswersResponse)
+async def save_questionset_answers(
+    session_id: str,
+    request: SaveAnswersRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> SaveAnswersResponse:
+    """
+    💾 Save Answers While the Test Is in Progress
+    
+    Saves one or more answers so a dropped connection does not lose the test.
+    Saving a question again replaces its previous answer.
+    
+    **Request Body:**
+    ```json
+    {
+      "answers": [
+        {"question_id": 1, "selected_answer": "A", "time_taken_seconds": 12}
+      ]
+    }
+    ```
+    
+    **Behaviour:**
+    - Answers are journaled in Redis and written to the database in batches
+      (directly when the journal is disabled)
+    - Saves after the server-side deadline are rejected with 409
+    - `/questionset-tests/submit` scores every saved answer, so the final
+      submit only needs answers not saved yet
+    """
+    answers = {a.question_id: (a.selected_answer, a.time_taken_seconds) for a in request.answers}
+    journal = get_answer_journal()
+    
+    if journal is None:
+        session, questions = await _load_open_session(db, session_id, current_user.id)
+        _validate_answers(answers, {qid: q.options for qid, q in questions.items()})
+        remaining = _seconds_left(session)
+        if remaining <= 0:
+            raise _time_over()
+        await upsert_answers(db, [
+            {"session_id": session_id, "question_id": qid, "selected_answer": selected, "time_taken_seconds": taken}
+            for qid, (selected, taken) in answers.items()
+        ])
+        await db.commit()
+        return SaveAnswersResponse(session_id=session_id, saved=len(answers), remaining_seconds=remaining)
+    
+    meta = await journal.meta(session_id)
+    if meta is None:
+        # Session started before journaling, or its journal expired: rebuild it from the database
+        session, questions = await _load_open_session(db, session_id, current_user.id)
+        remaining = _seconds_left(session)
+        if remaining <= 0:
+            raise _time_over()
+        await journal.open(
+            session_id, session.user_id, session.question_set_id,
+            {qid: q.options for qid, q in questions.items()}, remaining,
+        )
+        meta = await journal.meta(session_id)
+    
+    if meta["user_id"] != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test session not found")
+    remaining = await journal.remaining(session_id)
+    if remaining is None:
+        raise _time_over()
+    _validate_answers(answers, {int(qid): opts for qid, opts in meta["options"].items()})
+    await journal.record(session_id, answers)
+    return SaveAnswersResponse(session_id=session_id, saved=len(answers), remaining_seconds=remaining)
+
+
 @router.post("/questionset-tests/submit", response_model=TestResultResponse)
 async def submit_questionset_answers(
     request: SubmitAllAnswersRequest,
@@ -168,7 +288,7 @@ async def submit_questionset_answers(
     
     **Process:**
     1. ✔️ Validates the test session belongs to the user
-    2. 💾 Saves all submitted answers to the database
+    2. 💾 Merges answers saved during the test with the submitted ones and saves them
     3. 🎯 Calculates score by comparing with correct answers
     4. 📊 Generates detailed results for each question
     5. ⏰ Records completion time
@@ -265,60 +385,50 @@ async def submit_questionset_answers(
             detail="This endpoint is only for QuestionSet-based tests"
         )
     
-    # Get QuestionSet
-    qs_result = await db.execute(
-        select(QuestionSet).where(QuestionSet.question_set_id == session.question_set_id)
-    )
-    question_set = qs_result.scalar_one_or_none()
+    # Cached questions (options for validation) and answer key
+    payload = await get_question_cache().get(db, session.question_set_id)
     
-    if not question_set:
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="QuestionSet not found"
         )
     
-    # Get all questions for this set
-    questions_result = await db.execute(
-        select(Question).where(Question.question_set_id == session.question_set_id)
-    )
-    questions = {q.id: q for q in questions_result.scalars().all()}
-    
-    # Validate all answers and save them
-    correct_count = 0
-    answer_records = []
-    
-    for answer_submit in request.answers:
-        question = questions.get(answer_submit.question_id)
-        
-        if not question:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Question {answer_submit.question_id} not found in this QuestionSet"
-            )
-        
-        # Validate answer format
-        if answer_submit.selected_answer not in question.options:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid answer '{answer_submit.selected_answer}' for question {answer_submit.question_id}"
-            )
-        
-        # Check if correct
-        is_correct = answer_submit.selected_answer == question.correct_answer
-        if is_correct:
-            correct_count += 1
-        
-        # Create answer record
-        answer_record = Answer(
-            session_id=request.session_id,
-            question_id=answer_submit.question_id,
-            selected_answer=answer_submit.selected_answer,
-            is_correct=is_correct
+    answer_key = await get_answer_keys().get(db, session.question_set_id)
+    
+    # Reconcile answers saved during the test with the submitted ones
+    submitted = {a.question_id: (a.selected_answer, a.time_taken_seconds) for a in request.answers}
+    journal = get_answer_journal()
+    if journal is not None and await journal.meta(request.session_id) is not None:
+        saved = await journal.answers(request.session_id)
+        # Past the server-side deadline only what was saved in time counts
+        final_answers = saved if await journal.remaining(request.session_id) is None else {**saved, **submitted}
+    else:
+        saved_result = await db.execute(
+            select(Answer.question_id, Answer.selected_answer, Answer.time_taken_seconds)
+            .where(Answer.session_id == request.session_id)
         )
-        answer_records.append(answer_record)
+        saved = {row.question_id: (row.selected_answer, row.time_taken_seconds) for row in saved_result}
+        final_answers = {**saved, **submitted}
+    
+    # Validate all answers, score them against the answer key in one pass and save them
+    _validate_answers(final_answers, payload.options)
+    question_ids = list(final_answers)
+    marks = answer_key.mark(question_ids, [final_answers[qid][0] for qid in question_ids])
+    correct_count = int(marks.sum())
+    answer_records = [
+        {
+            "session_id": request.session_id,
+            "question_id": question_id,
+            "selected_answer": final_answers[question_id][0],
+            "time_taken_seconds": final_answers[question_id][1],
+            "is_correct": bool(is_correct),
+        }
+        for question_id, is_correct in zip(question_ids, marks)
+    ]
     
-    # Save all answers
-    db.add_all(answer_records)
+    # Save all answers (overwriting rows already flushed from the journal)
+    await upsert_answers(db, answer_records, scored=True)
     
     # Update session with results
     completed_at = datetime.now(timezone.utc)
@@ -335,37 +445,36 @@ async def submit_questionset_answers(
     
     await db.commit()
     
+    if journal is not None:
+        try:
+            await journal.close(request.session_id)
+        except Exception as e:
+            logger.warning(f"Could not clear answer journal for {request.session_id}: {e}")
+    
     # Update quiz streak
     quiz_streak_info = await check_and_update_quiz_completion(current_user, db, test_completed=True)
     
     # Build detailed results
+    questions = {q["question_id"]: q for q in payload.questions()}
     detailed_results = []
-    for answer_submit in request.answers:
-        question = questions[answer_submit.question_id]
-        options = [
-            MCQOption(option_id=opt_id, text=opt_text)
-            for opt_id, opt_text in sorted(question.options.items())
-        ]
-        
-        # Find if this answer was correct
-        is_correct = answer_submit.selected_answer == question.correct_answer
-        
+    for record in answer_records:
+        question = questions[record["question_id"]]
         detailed_results.append(
             QuestionResultDetailed(
-                question_id=question.id,
-                question_text=question.question_text,
-                options=options,
-                your_answer=answer_submit.selected_answer,
-                correct_answer=question.correct_answer,
-                is_correct=is_correct
+                question_id=question["question_id"],
+                question_text=question["question_text"],
+                options=[MCQOption(**opt) for opt in question["options"]],
+                your_answer=record["selected_answer"],
+                correct_answer=answer_key.correct_answer(record["question_id"]) or "",
+                is_correct=record["is_correct"]
             )
         )
     
     return TestResultResponse(
         session_id=request.session_id,
         question_set_id=session.question_set_id,
-        skill=question_set.skill,
-        level=question_set.level,
+        skill=payload.skill,
+        level=payload.level,
         total_questions=session.total_questions,
         correct_answers=correct_count,
         score_percentage=score_percentage,
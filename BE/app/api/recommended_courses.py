@@ -1,31 +1,15 @@
 """Recommended Courses API - AI-powered course recommendations using vector search."""
 from fastapi import APIRouter, Query, HTTPException
 from typing import List, Optional
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 import math
-import pandas as pd
-import os
 import json
 
 # Import response schemas from schemas.py
 from app.models.schemas import CourseRecommendation, RecommendedCoursesResponse
+from app.vector_db.course_index import CourseIndexUnavailableError, get_course_index
 
 router = APIRouter()
 
-# Load embedding model & FAISS index
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-vectorstore = FAISS.load_local(
-    "data/course_faiss_index",
-    embedding_model,
-    allow_dangerous_deserialization=True
-)
-
-# Load Excel course data and clean
-EXCEL_PATH = os.path.join("data", "Courses Masterdata.xlsx")
-df_courses = pd.read_excel(EXCEL_PATH)
-df_courses = df_courses.fillna("")
-
 def get_allowed_levels(input_level: str):
     """Returns list of allowed course levels for a given input level."""
     level_map = {
@@ -36,34 +20,9 @@ def get_allowed_levels(input_level: str):
     return level_map.get(input_level, [])
 
 async def fallback_search(topic: str, level: Optional[str] = None):
-    """Simple Excel-based fallback if vector results are few. Optionally filter by level."""
-    topic_lower = topic.lower()
-    filtered = df_courses[
-        df_courses['Skill/Topic Pathways'].str.lower().str.contains(topic_lower, na=False)
-        | df_courses['Pathway Display Name'].str.lower().str.contains(topic_lower, na=False)
-        | df_courses['Collection Name'].str.lower().str.contains(topic_lower, na=False)
-    ]
-
-    # Exclude courses with empty Course Level
-    filtered = filtered[filtered['Course Level'].str.strip() != ""]
-
-    if level:
-        allowed_levels = get_allowed_levels(level)
-        filtered = filtered[filtered['Course Level'].isin(allowed_levels)]
-
-    results = []
-    for _, row in filtered.iterrows():
-        results.append({
-            "name": row.get('Pathway Display Name', "") or "",
-            "topic": row.get('Skill/Topic Pathways', "") or "",
-            "collection": row.get('Collection Name', "") or "",
-            "category": row.get('Category', "") or "",
-            "description": row.get('Description', "") or "",
-            "url": row.get('Pathway URL', "") or "",
-            "score": None,
-            "course_level": row.get('Course Level', "") or ""
-        })
-    return results
+    """Keyword fallback over the pre-indexed masterdata if vector results are few. Optionally filter by level."""
+    allowed_levels = get_allowed_levels(level) if level else None
+    return get_course_index().catalog.search(topic, allowed_levels)
 
 def sanitize_for_json(data):
     """Recursively sanitize dict/list to remove NaN/inf floats."""
@@ -106,7 +65,7 @@ async def recommended_courses(
     vector similarity search powered by FAISS and HuggingFace embeddings.
 
     Details:
-    - Uses semantic search via FAISS vector DB (top 10 results)
+    - Uses semantic search via FAISS vector DB, restricted to the allowed course levels inside the index (top 10 results)
     - All fields of each course (name, topic, collection, category, description, url, score, course_level) are included in the output.
     - If fewer than 3 vector matches, does a keyword-based fallback from the Excel masterdata.
     - Only courses with a non-empty Course Level are recommended.
@@ -126,17 +85,20 @@ async def recommended_courses(
                 detail="Marks must be between 0 and 100."
             )
 
-    try:
-        normalized_level = marks_to_level(marks)
+    normalized_level = marks_to_level(marks)
 
-        # Original logic below, now using normalized_level.
-        results = vectorstore.similarity_search_with_score(
-            topic, k=10, filter={"type": "resource"}
-        )
+    try:
+        course_index = await get_course_index().ensure_ready()
+    except CourseIndexUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Course index unavailable: {e}")
 
-        recommended = []
+    try:
         allowed_levels = get_allowed_levels(normalized_level) if normalized_level else None
+        # Query vectors are cached and batched across concurrent requests; the
+        # level restriction is applied inside FAISS, so one pass returns k allowed courses
+        results = await course_index.search_topic(topic, 10, allowed_levels)
 
+        recommended = []
         for doc, score in results:
             try:
                 score_value = float(score)
@@ -147,11 +109,6 @@ async def recommended_courses(
                 score_value = None
 
             course_level = doc.metadata.get("course_level", "").strip()
-            if not course_level:
-                continue
-            if normalized_level and course_level not in allowed_levels:
-                continue
-
             recommended.append({
                 "name": doc.metadata.get("name", "") or "",
                 "topic": doc.metadata.get("topic", "") or "",
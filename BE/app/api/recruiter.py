@@ -2,11 +2,15 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, nulls_last
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 
 from app.db.session import get_db
-from app.db.models import JobRequisition, ApplicationNote, AssessmentApplication
+from app.db.models import (
+    JobRequisition, ApplicationNote, AssessmentApplication, Assessment, Candidate, JDMatchProfile,
+    CandidateRequisitionMatch,
+)
 from app.models.schemas import (
     JobRequisitionCreate,
     JobRequisitionUpdate,
@@ -14,11 +18,19 @@ from app.models.schemas import (
     ApplicationNoteCreate,
     ApplicationNoteResponse,
     AssessmentApplicationResponse,
+    CandidateRankingResponse,
+    RankedCandidate,
 )
 from app.core.dependencies import get_current_user
+from app.core.tasks.match_scores import enqueue, refresh_requisition_matches
+from app.vector_db.match_profiles import rank_candidates, refresh_requisition_profile, try_refresh_profile
+from app.vector_db.skill_matcher import load_skill_matcher
 
 router = APIRouter(prefix="/api/v1/recruiter", tags=["recruiter"])
 
+# Requisition fields the match profile is built from
+PROFILE_FIELDS = {"required_skills", "min_experience_years", "max_experience_years", "experience_level"}
+
 
 def _ensure_recruiter_or_admin(user):
     if not hasattr(user, 'role') or user.role not in ("recruiter", "admin", "superadmin"):
@@ -70,6 +82,8 @@ async def create_requisition(
     db.add(requisition)
     await db.commit()
     await db.refresh(requisition)
+    await try_refresh_profile(db, requisition)
+    enqueue(refresh_requisition_matches, requisition.requisition_id)
 
     return JobRequisitionResponse.from_orm(requisition)
 
@@ -83,6 +97,62 @@ async def get_requisition(requisition_id: str, db: AsyncSession = Depends(get_db
     return JobRequisitionResponse.from_orm(req)
 
 
+@router.get("/requisitions/{requisition_id}/ranked-candidates", response_model=CandidateRankingResponse)
+async def rank_requisition_candidates(
+    requisition_id: str,
+    top_n: int = Query(50, ge=1, le=500),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> CandidateRankingResponse:
+    """Score every active candidate's skills against the requisition's match profile and return the best."""
+    _ensure_recruiter_or_admin(current_user)
+    result = await db.execute(select(JobRequisition).where(JobRequisition.requisition_id == requisition_id))
+    req = result.scalar_one_or_none()
+    if not req:
+        raise HTTPException(status_code=404, detail="Requisition not found")
+
+    result = await db.execute(
+        select(JDMatchProfile).where(
+            JDMatchProfile.source_type == "requisition", JDMatchProfile.source_id == requisition_id
+        )
+    )
+    profile = result.scalar_one_or_none() or await refresh_requisition_profile(db, req)
+
+    result = await db.execute(
+        select(
+            Candidate.candidate_id, Candidate.full_name, Candidate.email,
+            Candidate.skills, Candidate.experience_years,
+        ).where(Candidate.is_active.is_(True))
+    )
+    rows = result.all()
+
+    matcher = await load_skill_matcher()
+    ranked = await run_in_threadpool(
+        rank_candidates,
+        profile.skills,
+        profile.min_experience_years,
+        [(row.skills, row.experience_years) for row in rows],
+        matcher,
+        top_n,
+    )
+
+    return CandidateRankingResponse(
+        requisition_id=requisition_id,
+        total_candidates=len(rows),
+        profile_skills=[s["skill"] for s in profile.skills],
+        profile_updated_at=profile.updated_at,
+        candidates=[
+            RankedCandidate(
+                candidate_id=rows[r["index"]].candidate_id,
+                full_name=rows[r["index"]].full_name,
+                email=rows[r["index"]].email,
+                **{k: v for k, v in r.items() if k != "index"},
+            )
+            for r in ranked
+        ],
+    )
+
+
 @router.patch("/requisitions/{requisition_id}", response_model=JobRequisitionResponse)
 async def update_requisition(
     requisition_id: str,
@@ -100,11 +170,16 @@ async def update_requisition(
     if current_user.role not in ("admin", "superadmin") and current_user.id not in (req.created_by, req.hiring_manager_id):
         raise HTTPException(status_code=403, detail="Not authorized to update this requisition")
 
-    for k, v in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    for k, v in changes.items():
         setattr(req, k, v)
 
     await db.commit()
     await db.refresh(req)
+    if PROFILE_FIELDS.intersection(changes):
+        await try_refresh_profile(db, req)
+    if PROFILE_FIELDS.intersection(changes) or "status" in changes:
+        enqueue(refresh_requisition_matches, requisition_id)
     return JobRequisitionResponse.from_orm(req)
 
 
@@ -221,9 +296,32 @@ async def update_application_status(
 
 
 @router.get("/requisitions/{requisition_id}/applications", response_model=List[AssessmentApplicationResponse])
-async def list_requisition_applications(requisition_id: str, page: int = Query(1, ge=1), per_page: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_db)) -> List[AssessmentApplicationResponse]:
-    stmt = select(AssessmentApplication).where(AssessmentApplication.requisition_id == requisition_id)
-    stmt = stmt.order_by(desc(AssessmentApplication.applied_at)).limit(per_page).offset((page - 1) * per_page)
+async def list_requisition_applications(
+    requisition_id: str,
+    sort: str = Query("fit", pattern="^(fit|applied_at)$"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+) -> List[AssessmentApplicationResponse]:
+    """Applications to the requisition's assessment, best fit first (from the materialized match table)."""
+    stmt = (
+        select(AssessmentApplication, CandidateRequisitionMatch.score)
+        .join(Assessment, Assessment.id == AssessmentApplication.assessment_id)
+        .join(JobRequisition, JobRequisition.assessment_id == Assessment.assessment_id)
+        .outerjoin(
+            CandidateRequisitionMatch,
+            (CandidateRequisitionMatch.candidate_id == AssessmentApplication.candidate_id)
+            & (CandidateRequisitionMatch.requisition_id == JobRequisition.requisition_id),
+        )
+        .where(JobRequisition.requisition_id == requisition_id)
+    )
+    if sort == "fit":
+        stmt = stmt.order_by(nulls_last(desc(CandidateRequisitionMatch.score)), desc(AssessmentApplication.applied_at))
+    else:
+        stmt = stmt.order_by(desc(AssessmentApplication.applied_at))
+    stmt = stmt.limit(per_page).offset((page - 1) * per_page)
     result = await db.execute(stmt)
-    rows = result.scalars().all()
-    return [AssessmentApplicationResponse.from_orm(r) for r in rows]
+    return [
+        AssessmentApplicationResponse.model_validate(app_obj).model_copy(update={"match_score": score})
+        for app_obj, score in result.all()
+    ]
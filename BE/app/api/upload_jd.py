@@ -11,6 +11,7 @@ from app.core.dependencies import get_db, optional_user, optional_auth
 from app.core.storage import get_s3_service
 from app.db.models import User, JobDescription, UploadedDocument, Candidate
 from app.models.schemas import UploadedDocumentResponse
+from app.vector_db.match_profiles import try_refresh_profile
 
 router = APIRouter()
 
@@ -40,7 +41,7 @@ async def upload_jd(file: UploadFile = File(...)):
     jd_id = str(uuid.uuid4())
     
     try:
-        mcq_questions = generate_mcqs_for_topic(jd_text)
+        mcq_questions = await generate_mcqs_for_topic(jd_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"MCQ generation failed: {str(e)}")
     
@@ -184,6 +185,7 @@ async def upload_document(
         )
         db.add(jd)
         await db.commit()
+        await try_refresh_profile(db, jd)
     
     return UploadedDocumentResponse(
         id=document.id,
@@ -0,0 +1,226 @@
+"""Redis-buffered answer journaling for test sessions.
+
+Candidates save answers as they go; each save is one Redis hash write
+(last answer per question wins) plus a mark in a "dirty sessions" set. The
+server-side deadline is the session's test timer key, set when the test
+starts. A background flusher periodically pops dirty sessions and upserts
+their answers into Postgres with multi-row upserts, so peak exam
+traffic never turns into per-click commits. Final submission reconciles the
+journal with the submitted answers and scores everything in one write.
+
+Enabled with ANSWER_JOURNAL_ENABLED (Redis must be reachable); otherwise
+answers are upserted directly.
+"""
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.core.redis import RedisService
+from app.db.models import Answer
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# question_id -> (selected_answer, time_taken_seconds)
+JournaledAnswers = Dict[int, Tuple[str, Optional[int]]]
+
+# Journal keys outlive the deadline so a late submit can still reconcile
+JOURNAL_RETENTION_SECONDS = 24 * 3600
+
+# Rows per INSERT, well below Postgres' bind-parameter limit
+UPSERT_CHUNK_ROWS = 2000
+
+
+class AnswerJournal:
+    """Per-session answer hash, session metadata and deadline in Redis."""
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self.service = RedisService(redis)
+
+    @staticmethod
+    def _key(session_id: str, suffix: str) -> str:
+        return f"{settings.REDIS_SESSION_PREFIX}{session_id}:{suffix}"
+
+    @property
+    def dirty_key(self) -> str:
+        return f"{settings.REDIS_SESSION_PREFIX}answers:dirty"
+
+    async def open(
+        self,
+        session_id: str,
+        user_id: Optional[int],
+        question_set_id: str,
+        options: Dict[int, Iterable[str]],
+        duration_seconds: int,
+    ) -> None:
+        """Store what answer saves validate against and start the deadline timer."""
+        meta = {
+            "user_id": user_id,
+            "question_set_id": question_set_id,
+            "options": {str(qid): sorted(opts) for qid, opts in options.items()},
+        }
+        # One MULTI, timer first: meta without a timer would read as "past the deadline"
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.setex(self._key(session_id, "timer"), duration_seconds, "active")
+        pipe.setex(self._key(session_id, "meta"), duration_seconds + JOURNAL_RETENTION_SECONDS, json.dumps(meta))
+        await pipe.execute()
+
+    async def meta(self, session_id: str) -> Optional[dict]:
+        data = await self.redis.get(self._key(session_id, "meta"))
+        return json.loads(data) if data else None
+
+    async def remaining(self, session_id: str) -> Optional[int]:
+        """Seconds left before the deadline; None once it has passed."""
+        return await self.service.get_test_remaining_time(session_id)
+
+    async def record(self, session_id: str, answers: JournaledAnswers) -> None:
+        key = self._key(session_id, "answers")
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(key, mapping={
+            str(qid): json.dumps([selected, taken]) for qid, (selected, taken) in answers.items()
+        })
+        pipe.expire(key, JOURNAL_RETENTION_SECONDS)
+        pipe.sadd(self.dirty_key, session_id)
+        await pipe.execute()
+
+    async def answers(self, session_id: str) -> JournaledAnswers:
+        return self._decode(await self.redis.hgetall(self._key(session_id, "answers")))
+
+    async def answers_many(self, session_ids: List[str]) -> Dict[str, JournaledAnswers]:
+        pipe = self.redis.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hgetall(self._key(session_id, "answers"))
+        return {sid: self._decode(raw) for sid, raw in zip(session_ids, await pipe.execute())}
+
+    @staticmethod
+    def _decode(raw: dict) -> JournaledAnswers:
+        answers = {}
+        for qid, value in raw.items():
+            selected, taken = json.loads(value)
+            answers[int(qid)] = (selected, taken)
+        return answers
+
+    async def close(self, session_id: str) -> None:
+        """Drop a submitted session's journal."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(self._key(session_id, "meta"), self._key(session_id, "answers"), self._key(session_id, "timer"))
+        pipe.srem(self.dirty_key, session_id)
+        await pipe.execute()
+
+    async def take_dirty(self, count: int) -> List[str]:
+        return await self.redis.spop(self.dirty_key, count) or []
+
+    async def mark_dirty(self, session_ids: List[str]) -> None:
+        if session_ids:
+            await self.redis.sadd(self.dirty_key, *session_ids)
+
+
+async def upsert_answers(db: AsyncSession, rows: List[dict], scored: bool = False) -> None:
+    """Insert or update answers with multi-row upserts (caller commits).
+
+    Unscored writes (the flusher) never overwrite an answer that final
+    submission has already scored.
+    """
+    for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+        stmt = pg_insert(Answer).values(rows[start:start + UPSERT_CHUNK_ROWS])
+        update = {
+            "selected_answer": stmt.excluded.selected_answer,
+            "time_taken_seconds": stmt.excluded.time_taken_seconds,
+            "updated_at": func.now(),
+        }
+        if scored:
+            update["is_correct"] = stmt.excluded.is_correct
+            stmt = stmt.on_conflict_do_update(constraint="uq_answer_session_question", set_=update)
+        else:
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_answer_session_question", set_=update, where=Answer.is_correct.is_(None)
+            )
+        await db.execute(stmt)
+
+
+async def flush_answers(journal: AnswerJournal, batch_size: int) -> int:
+    """Write the journaled answers of up to batch_size dirty sessions; returns sessions flushed."""
+    from app.db.session import async_session_maker
+
+    session_ids = await journal.take_dirty(batch_size)
+    if not session_ids:
+        return 0
+    try:
+        journaled = await journal.answers_many(session_ids)
+        rows = [
+            {"session_id": sid, "question_id": qid, "selected_answer": selected, "time_taken_seconds": taken}
+            for sid, answers in journaled.items()
+            for qid, (selected, taken) in answers.items()
+        ]
+        async with async_session_maker() as db:
+            await upsert_answers(db, rows)
+            await db.commit()
+    except BaseException:
+        # Also on cancellation (shutdown): the sessions are already popped from
+        # the dirty set, so put them back or their answers are never flushed
+        await asyncio.shield(journal.mark_dirty(session_ids))
+        raise
+    return len(session_ids)
+
+
+_journal: Optional[AnswerJournal] = None
+_flusher: Optional[asyncio.Task] = None
+
+
+def get_answer_journal() -> Optional[AnswerJournal]:
+    """The journal when enabled and Redis is initialized, else None."""
+    global _journal
+    from app.core import redis as redis_module
+
+    if not settings.ANSWER_JOURNAL_ENABLED or redis_module.redis_client is None:
+        return None
+    if _journal is None or _journal.redis is not redis_module.redis_client:
+        _journal = AnswerJournal(redis_module.redis_client)
+    return _journal
+
+
+async def _flush_loop(journal: AnswerJournal) -> None:
+    while True:
+        try:
+            # Drain while there is a backlog, then wait for the next interval
+            while await flush_answers(journal, settings.ANSWER_JOURNAL_FLUSH_BATCH):
+                pass
+        except Exception as e:
+            logger.error(f"Answer journal flush failed: {e}")
+        await asyncio.sleep(settings.ANSWER_JOURNAL_FLUSH_SECONDS)
+
+
+def start_answer_flusher() -> None:
+    """Start the background flusher (no-op when journaling is off)."""
+    global _flusher
+    journal = get_answer_journal()
+    if journal is not None and _flusher is None:
+        _flusher = asyncio.create_task(_flush_loop(journal))
+
+
+async def stop_answer_flusher() -> None:
+    """Stop the flusher and write whatever is still journaled."""
+    global _flusher
+    if _flusher is None:
+        return
+    _flusher.cancel()
+    try:
+        await _flusher
+    except asyncio.CancelledError:
+        pass
+    _flusher = None
+    journal = get_answer_journal()
+    if journal is not None:
+        try:
+            while await flush_answers(journal, settings.ANSWER_JOURNAL_FLUSH_BATCH):
+                pass
+        except Exception as e:
+            logger.error(f"Final answer journal flush failed: {e}")
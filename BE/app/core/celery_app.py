@@ -1,5 +1,6 @@
 """Celery application configuration."""
 from celery import Celery
+from celery.schedules import crontab
 from config import get_settings
 
 settings = get_settings()
@@ -12,6 +13,8 @@ celery_app = Celery(
         'app.core.tasks.question_generation',
         'app.core.tasks.score_release',
         'app.core.tasks.email_tasks',
+        'app.core.tasks.match_scores',
+        'app.core.tasks.item_analytics',
     ]
 )
 
@@ -29,6 +32,14 @@ celery_app.conf.update(
         'app.core.tasks.question_generation.*': {'queue': 'questions'},
         'app.core.tasks.score_release.*': {'queue': 'scores'},
         'app.core.tasks.email_tasks.*': {'queue': 'emails'},
+        'app.core.tasks.match_scores.*': {'queue': 'matching'},
+        'app.core.tasks.item_analytics.*': {'queue': 'analytics'},
+    },
+    beat_schedule={
+        'refresh-item-analytics-nightly': {
+            'task': 'app.core.tasks.item_analytics.refresh_item_analytics',
+            'schedule': crontab(hour=settings.ITEM_ANALYTICS_HOUR_UTC, minute=0),
+        },
     },
     task_default_queue='default',
     task_default_exchange='default',
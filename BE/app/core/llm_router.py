@@ -0,0 +1,169 @@
+"""Latency-aware multi-provider routing with hedged requests.
+
+The router ranks the configured providers by their observed p95 latency and
+error rate (from the gateway's rolling stats), sends the call to the best
+one and, if it has not answered by the primary's latency percentile, fires
+a hedge request at the next provider. Whichever answers first wins and the
+other request is cancelled. ``LLMOverloadedError`` is raised when no
+provider can take the call so callers can fall back to local extraction.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from app.core.llm_gateway import (
+    LLMGateway,
+    LLMGatewayError,
+    LLMResponse,
+    Messages,
+    get_llm_gateway,
+    to_messages,
+)
+from app.core.logging import get_logger
+from app.core.metrics import llm_router_decisions_total
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+class LLMOverloadedError(LLMGatewayError):
+    """No routable provider is available (circuits open or saturated)."""
+
+
+def provider_api_keys() -> Dict[str, str]:
+    """API keys per provider from settings."""
+    keys = {
+        "openai": settings.OPENAI_API_KEY,
+        "anthropic": settings.ANTHROPIC_API_KEY,
+        "groq": settings.GROQ_API_KEY,
+    }
+    if settings.LLM_API_KEY:
+        keys[settings.LLM_PROVIDER.lower()] = settings.LLM_API_KEY
+    return {name: key for name, key in keys.items() if key}
+
+
+class LLMRouter:
+    """Choose a provider per call and hedge slow requests."""
+
+    def __init__(
+        self,
+        providers: List[str],
+        api_keys: Dict[str, str],
+        gateway: Optional[LLMGateway] = None,
+    ):
+        self.providers = [p.lower() for p in providers]
+        self.api_keys = dict(api_keys)
+        self._gateway = gateway
+
+    @property
+    def gateway(self) -> LLMGateway:
+        return self._gateway or get_llm_gateway()
+
+    def _score(self, provider: str) -> float:
+        stats = self.gateway.client(provider).stats
+        if len(stats.outcomes) < settings.LLM_ROUTER_MIN_SAMPLES:
+            latency = settings.LLM_HEDGE_DEFAULT_DELAY_MS
+        else:
+            latency = stats.percentile(95) or settings.LLM_HEDGE_DEFAULT_DELAY_MS
+        return latency * (1.0 + 4.0 * stats.error_rate)
+
+    def _healthy(self, provider: str) -> bool:
+        client = self.gateway.client(provider)
+        if not client.available:
+            return False
+        stats = client.stats
+        return (
+            len(stats.outcomes) < settings.LLM_ROUTER_MIN_SAMPLES
+            or stats.error_rate <= settings.LLM_ROUTER_MAX_ERROR_RATE
+        )
+
+    def candidates(self, preferred: Optional[str] = None, api_keys: Optional[Dict[str, str]] = None) -> List[str]:
+        """Routable providers, best first; ``preferred`` wins ties."""
+        keys = {**self.api_keys, **(api_keys or {})}
+        names = list(self.providers)
+        if preferred and preferred.lower() not in names:
+            names.append(preferred.lower())
+        names = [n for n in names if keys.get(n) and self._healthy(n)]
+        preferred = (preferred or "").lower()
+        return sorted(names, key=lambda n: (self._score(n), n != preferred, n))
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on ``provider`` before sending a hedge request."""
+        stats = self.gateway.client(provider).stats
+        delay_ms = settings.LLM_HEDGE_DEFAULT_DELAY_MS
+        if len(stats.outcomes) >= settings.LLM_ROUTER_MIN_SAMPLES:
+            delay_ms = stats.percentile(settings.LLM_HEDGE_PERCENTILE) or delay_ms
+        return max(delay_ms, settings.LLM_HEDGE_MIN_DELAY_MS) / 1000.0
+
+    async def complete(
+        self,
+        messages: Messages,
+        system: Optional[str] = None,
+        preferred: Optional[str] = None,
+        api_keys: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> LLMResponse:
+        """Route one completion; the response's ``provider`` names who served it."""
+        keys = {**self.api_keys, **(api_keys or {})}
+        order = self.candidates(preferred, keys)
+        if not order:
+            llm_router_decisions_total.labels(provider=preferred or "none", outcome="overload").inc()
+            raise LLMOverloadedError("router", "no LLM provider available")
+
+        chat = to_messages(messages, system)
+        # Model names are provider-specific; let each adapter use its default.
+        kwargs.pop("model", None)
+
+        def launch(provider: str, role: str) -> asyncio.Task:
+            task = asyncio.create_task(
+                self.gateway.client(provider).complete(chat, api_key=keys[provider], **kwargs)
+            )
+            task.provider, task.role = provider, role
+            return task
+
+        primary = launch(order[0], "primary")
+        pending = {primary}
+        next_idx = 1
+        errors: List[str] = []
+
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay(order[0]))
+            if not done and next_idx < len(order):
+                logger.info(f"Hedging slow {order[0]} request with {order[next_idx]}")
+                pending.add(launch(order[next_idx], "hedge"))
+                next_idx += 1
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response = task.result()
+                        response.hedged = task.role == "hedge"
+                        llm_router_decisions_total.labels(provider=response.provider, outcome=task.role).inc()
+                        return response
+                    errors.append(f"{task.provider}: {task.exception()}")
+
+                # Fail over to the next provider once nothing is in flight
+                if not pending and next_idx < len(order):
+                    pending.add(launch(order[next_idx], "failover"))
+                    next_idx += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMGatewayError("router", "all providers failed: " + "; ".join(errors))
+
+
+_router: Optional[LLMRouter] = None
+
+
+def routing_enabled() -> bool:
+    return bool(settings.LLM_ROUTING_PROVIDERS)
+
+
+def get_llm_router() -> LLMRouter:
+    """Get the process-wide router built from settings."""
+    global _router
+    if _router is None:
+        _router = LLMRouter(settings.LLM_ROUTING_PROVIDERS, provider_api_keys())
+    return _router
@@ -65,6 +65,31 @@ celery_tasks_total = Counter(
     ["task_name", "status"]
 )
 
+llm_requests_total = Counter(
+    "llm_requests_total",
+    "Total LLM provider requests",
+    ["provider", "status"]
+)
+
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "LLM provider request latency",
+    ["provider"],
+    buckets=[0.25, 0.5, 1, 2, 4, 8, 15, 30, 60]
+)
+
+llm_router_decisions_total = Counter(
+    "llm_router_decisions_total",
+    "LLM router outcomes (primary, hedge, failover, overload)",
+    ["provider", "outcome"]
+)
+
+llm_tokens_total = Counter(
+    "llm_tokens_total",
+    "Total LLM tokens consumed",
+    ["provider", "kind"]
+)
+
 
 def setup_metrics(app) -> Instrumentator:
     """Setup Prometheus metrics instrumentation."""
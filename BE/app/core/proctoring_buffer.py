@@ -0,0 +1,184 @@
+"""Buffered, batched ingestion of proctoring events.
+
+Browser clients report tab switches, focus changes and face checks every
+few seconds per candidate. Instead of one commit per event, accepted events
+go into a bounded in-process queue and a background writer inserts them
+with one multi-row INSERT per batch. When the queue is full new events are
+refused, so clients back off (HTTP 503 with Retry-After) rather than the
+database falling behind.
+
+A batch that fails because the database is unreachable is retried with
+backoff before anything else is taken from the queue, so an outage fills
+the queue and turns into backpressure instead of lost events. Rows the
+database rejects (bad data, unknown sessions) are dropped one by one.
+
+Events still queued when the process stops are written during shutdown;
+a hard crash loses at most the queue contents.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+
+from app.core.logging import get_logger
+from app.db.models import ProctoringEvent, TestSession
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Errors caused by the rows themselves; anything else fails the whole batch
+ROW_ERRORS = (DataError, IntegrityError)
+
+# Connection-level failures worth retrying the batch for
+TRANSIENT_ERRORS = (DBAPIError, OSError, asyncio.TimeoutError)
+
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+class ProctoringEventBuffer:
+    """Bounded queue of proctoring event rows drained by a single writer task."""
+
+    def __init__(self, max_events: int = 50000, batch_size: int = 1000, flush_seconds: float = 1.0):
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_events)
+        self._writer: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def submit(self, rows: List[Dict]) -> bool:
+        """Queue event rows; False (nothing queued) when they do not all fit."""
+        if self.pending + len(rows) > self.max_events:
+            return False
+        for row in rows:
+            self.queue.put_nowait(row)
+        return True
+
+    def _take(self, first: Dict) -> List[Dict]:
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    @staticmethod
+    async def _insert(db, rows: List[Dict]) -> bool:
+        try:
+            await db.execute(insert(ProctoringEvent).values(rows))
+            await db.commit()
+            return True
+        except ROW_ERRORS:
+            await db.rollback()
+            return False
+
+    async def write(self, rows: List[Dict]) -> int:
+        """Insert one batch; returns rows written.
+
+        One bad row fails the whole multi-row INSERT, so a batch rejected for
+        its data is retried without rows for unknown test sessions and then
+        row by row (one savepoint each); only the rows that still fail are
+        dropped. Connection errors propagate so the caller can retry.
+        """
+        from app.db.session import async_session_maker
+
+        async with async_session_maker() as db:
+            if await self._insert(db, rows):
+                return len(rows)
+
+            session_ids = {row["test_session_id"] for row in rows}
+            result = await db.execute(select(TestSession.session_id).where(TestSession.session_id.in_(session_ids)))
+            known = set(result.scalars().all())
+            valid = [row for row in rows if row["test_session_id"] in known]
+            if len(valid) < len(rows):
+                logger.warning(f"Dropped {len(rows) - len(valid)} proctoring events for unknown test sessions")
+            if not valid or await self._insert(db, valid):
+                return len(valid)
+
+            written = 0
+            for row in valid:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(ProctoringEvent).values(row))
+                    written += 1
+                except ROW_ERRORS as e:
+                    logger.warning(f"Dropped proctoring event {row.get('event_id')}: {e.orig or e}")
+            await db.commit()
+            return written
+
+    async def _write_until_stored(self, batch: List[Dict]) -> None:
+        """Write a batch, retrying with backoff while the database is unreachable."""
+        delay = self.flush_seconds
+        while True:
+            try:
+                await self.write(batch)
+                return
+            except TRANSIENT_ERRORS as e:
+                if self._stopping:
+                    logger.error(f"Dropped {len(batch)} proctoring events at shutdown: {e}")
+                    return
+                logger.error(f"Proctoring event batch of {len(batch)} failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+            except Exception as e:
+                logger.error(f"Dropped proctoring event batch of {len(batch)}: {e}")
+                return
+
+    async def _run(self) -> None:
+        # Runs until stop() is requested and the queue has been drained
+        while not (self._stopping and self.queue.empty()):
+            try:
+                first = await asyncio.wait_for(self.queue.get(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                continue
+            batch = self._take(first)
+            await self._write_until_stored(batch)
+            if len(batch) < self.batch_size and not self._stopping:
+                # Let small batches accumulate instead of writing every few events
+                await asyncio.sleep(self.flush_seconds)
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._stopping = False
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Let the writer drain the queue, then stop it."""
+        if self._writer is None:
+            return
+        self._stopping = True
+        await self._writer
+        self._writer = None
+
+
+_buffer: Optional[ProctoringEventBuffer] = None
+
+
+def get_proctoring_buffer() -> ProctoringEventBuffer:
+    """Get the proctoring event buffer singleton."""
+    global _buffer
+    if _buffer is None:
+        _buffer = ProctoringEventBuffer(
+            max_events=settings.PROCTORING_BUFFER_MAX_EVENTS,
+            batch_size=settings.PROCTORING_FLUSH_BATCH,
+            flush_seconds=settings.PROCTORING_FLUSH_SECONDS,
+        )
+    return _buffer
+
+
+def start_proctoring_writer() -> None:
+    """Start the background writer."""
+    get_proctoring_buffer().start()
+
+
+async def stop_proctoring_writer() -> None:
+    """Stop the writer, flushing queued events."""
+    if _buffer is not None:
+        await _buffer.stop()
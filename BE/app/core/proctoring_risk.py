@@ -0,0 +1,171 @@
+"""Rolling per-session proctoring risk scores in Redis.
+
+Every proctoring event adds a weight (severity weight x event-type
+multiplier) to its session's score, and scores decay exponentially with
+PROCTORING_RISK_HALF_LIFE_SECONDS, so frequent recent events dominate and a
+single old incident fades. Updates are one Lua call per event, atomic
+across workers.
+
+Ranking uses a sorted set per epoch (a UTC day, shorter for very short
+half-lives). Members are stored as score * exp(decay * (now - epoch_start));
+since every session decays at the same rate, that order equals the order of
+current scores and ZREVRANGE returns the riskiest sessions without
+rescoring anything. The previous epoch's set is read as well so sessions
+spanning an epoch boundary are not lost.
+"""
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.core.logging import get_logger
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+SEVERITY_WEIGHTS = {"low": 1.0, "medium": 3.0, "high": 8.0, "critical": 20.0}
+
+# Event types that are stronger evidence than their severity alone suggests
+EVENT_TYPE_MULTIPLIERS = {
+    "multiple_faces": 2.0,
+    "phone_detected": 2.0,
+    "no_face": 1.5,
+    "screen_share_stopped": 1.5,
+    "copy_paste": 1.25,
+    "tab_switch": 1.0,
+    "window_blur": 0.5,
+}
+
+EPOCH_SECONDS = 24 * 3600
+
+# Keeps exp(decay * epoch) far below float overflow for short half-lives
+MAX_EPOCH_HALF_LIVES = 500
+
+# score = score * exp(-decay * elapsed) + weight; returns the new score
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local decay = tonumber(ARGV[3])
+local score = tonumber(redis.call('HGET', KEYS[1], 'score') or '0')
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated_at') or ARGV[1])
+score = score * math.exp(-decay * math.max(now - updated, 0)) + tonumber(ARGV[2])
+redis.call('HSET', KEYS[1], 'score', tostring(score), 'updated_at', ARGV[1], 'last_event_type', ARGV[5])
+redis.call('HINCRBY', KEYS[1], 'events', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+redis.call('ZADD', KEYS[2], score * math.exp(decay * (now - tonumber(ARGV[4]))), ARGV[7])
+redis.call('EXPIRE', KEYS[2], 2 * tonumber(ARGV[8]))
+return tostring(score)
+"""
+
+
+def event_weight(event_type: str, severity: str) -> float:
+    return SEVERITY_WEIGHTS.get(str(severity).lower(), 1.0) * EVENT_TYPE_MULTIPLIERS.get(event_type, 1.0)
+
+
+class ProctoringRiskScorer:
+    """Records events into decaying session scores and ranks sessions."""
+
+    def __init__(self, redis, half_life_seconds: float = 300.0, retention_seconds: int = 6 * 3600):
+        self.redis = redis
+        self.decay = math.log(2) / half_life_seconds
+        self.epoch_seconds = int(min(EPOCH_SECONDS, half_life_seconds * MAX_EPOCH_HALF_LIVES))
+        self.retention_seconds = retention_seconds
+        self._script = redis.register_script(_RECORD_SCRIPT)
+
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        return f"proctoring:risk:session:{session_id}"
+
+    @staticmethod
+    def _ranking_key(epoch_start: int) -> str:
+        return f"proctoring:risk:ranking:{epoch_start}"
+
+    async def record(self, events: Iterable[Dict]) -> None:
+        """Fold events (test_session_id, event_type, severity) into the session scores."""
+        now = time.time()
+        epoch_start = int(now // self.epoch_seconds * self.epoch_seconds)
+        ranking_key = self._ranking_key(epoch_start)
+        pipe = self.redis.pipeline(transaction=False)
+        for event in events:
+            session_id = event["test_session_id"]
+            severity = getattr(event["severity"], "value", event["severity"])
+            await self._script(
+                keys=[self._session_key(session_id), ranking_key],
+                args=[
+                    now, event_weight(event["event_type"], severity), self.decay, epoch_start,
+                    event["event_type"], self.retention_seconds, session_id, self.epoch_seconds,
+                ],
+                client=pipe,
+            )
+        await pipe.execute()
+
+    def _current(self, stored: float, updated_at: float, now: float) -> float:
+        return stored * math.exp(-self.decay * max(now - updated_at, 0))
+
+    async def top(self, limit: int) -> List[Dict]:
+        """Sessions with the highest current risk, highest first."""
+        now = time.time()
+        epoch_start = int(now // self.epoch_seconds * self.epoch_seconds)
+        ranked: Dict[str, float] = {}
+        for start in (epoch_start, epoch_start - self.epoch_seconds):
+            members = await self.redis.zrevrange(self._ranking_key(start), 0, limit - 1, withscores=True)
+            factor = math.exp(-self.decay * (now - start))
+            for session_id, value in members:
+                ranked[session_id] = max(ranked.get(session_id, 0.0), value * factor)
+        session_ids = sorted(ranked, key=ranked.get, reverse=True)[:limit]
+
+        pipe = self.redis.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hgetall(self._session_key(session_id))
+        out = []
+        for session_id, state in zip(session_ids, await pipe.execute()):
+            if not state:
+                continue  # expired
+            updated_at = float(state["updated_at"])
+            out.append({
+                "test_session_id": session_id,
+                "risk_score": round(self._current(float(state["score"]), updated_at, now), 2),
+                "events": int(state.get("events", 0)),
+                "last_event_type": state.get("last_event_type"),
+                "last_event_at": updated_at,
+            })
+        return out
+
+    async def forget(self, session_ids: List[str]) -> None:
+        """Drop sessions from the ranking (e.g. once completed)."""
+        if not session_ids:
+            return
+        now = time.time()
+        epoch_start = int(now // self.epoch_seconds * self.epoch_seconds)
+        pipe = self.redis.pipeline(transaction=False)
+        for start in (epoch_start, epoch_start - self.epoch_seconds):
+            pipe.zrem(self._ranking_key(start), *session_ids)
+        await pipe.execute()
+
+
+_scorer: Optional[ProctoringRiskScorer] = None
+
+
+def get_risk_scorer() -> Optional[ProctoringRiskScorer]:
+    """The scorer when enabled and Redis is initialized, else None."""
+    global _scorer
+    from app.core import redis as redis_module
+
+    if not settings.PROCTORING_RISK_ENABLED or redis_module.redis_client is None:
+        return None
+    if _scorer is None or _scorer.redis is not redis_module.redis_client:
+        _scorer = ProctoringRiskScorer(
+            redis_module.redis_client,
+            half_life_seconds=settings.PROCTORING_RISK_HALF_LIFE_SECONDS,
+        )
+    return _scorer
+
+
+async def record_risk(events: List[Dict]) -> None:
+    """Update risk scores for incoming events; never fails the ingesting request."""
+    scorer = get_risk_scorer()
+    if scorer is None or not events:
+        return
+    try:
+        await scorer.record(events)
+    except Exception as e:
+        logger.warning(f"Proctoring risk update failed for {len(events)} events: {e}")
@@ -0,0 +1,257 @@
+"""Cached, pre-serialized question payloads for starting tests.
+
+Everyone taking the same question set gets the same answer-free question
+list, so it is built once per question_set_id: each question is serialized
+to orjson bytes and kept in a per-process LRU (short TTL) and, when Redis is
+initialized, in Redis for the other workers. A test start then needs no
+Question query and no per-question work; per-candidate order is a seeded
+permutation that joins the cached byte fragments.
+
+Question inserts, updates and deletes through the ORM invalidate the
+affected sets (and their in-process answer keys) after commit. Bulk statements that bypass the ORM must call
+invalidate() themselves.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.core.scoring import get_answer_keys
+from app.db.models import Question, QuestionSet
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+@dataclass
+class QuestionSetPayload:
+    question_set_id: str
+    skill: str
+    level: str
+    total_questions: int
+    fragments: List[bytes]  # one serialized answer-free question per entry, in Question.id order
+    options: Dict[int, List[str]]  # question_id -> option ids, what answer saves validate against
+
+    @property
+    def count(self) -> int:
+        return len(self.fragments)
+
+    def questions_json(self, shuffle_seed: Optional[str] = None) -> bytes:
+        """The question array as JSON, optionally in a per-seed (e.g. per-session) order."""
+        fragments = self.fragments
+        if shuffle_seed is not None:
+            fragments = [fragments[i] for i in random.Random(shuffle_seed).sample(range(self.count), self.count)]
+        return b"[" + b",".join(fragments) + b"]"
+
+    def questions(self) -> List[Dict[str, Any]]:
+        """The questions decoded, in Question.id order."""
+        return orjson.loads(self.questions_json())
+
+    def to_redis(self) -> bytes:
+        return orjson.dumps({
+            "skill": self.skill,
+            "level": self.level,
+            "total_questions": self.total_questions,
+            "questions": orjson.Fragment(self.questions_json()),
+        })
+
+    @classmethod
+    def from_redis(cls, question_set_id: str, data) -> "QuestionSetPayload":
+        doc = orjson.loads(data)
+        return cls(
+            question_set_id=question_set_id,
+            skill=doc["skill"],
+            level=doc["level"],
+            total_questions=doc["total_questions"],
+            fragments=[orjson.dumps(q) for q in doc["questions"]],
+            options={q["question_id"]: [opt["option_id"] for opt in q["options"]] for q in doc["questions"]},
+        )
+
+
+def serialize_question(question: Question) -> bytes:
+    """Answer-free MCQQuestion JSON for one question."""
+    return orjson.dumps({
+        "question_id": question.id,
+        "question_text": question.question_text,
+        "options": [
+            {"option_id": opt_id, "text": opt_text}
+            for opt_id, opt_text in sorted(question.options.items())
+        ],
+        "correct_answer": "",
+    })
+
+
+def start_response(envelope: Dict[str, Any], payload: Optional[QuestionSetPayload], shuffle_seed: Optional[str] = None) -> Response:
+    """JSON response of envelope plus the cached questions, without re-serializing them."""
+    questions = payload.questions_json(shuffle_seed) if payload else b"[]"
+    body = orjson.dumps({**envelope, "questions": orjson.Fragment(questions)})
+    return Response(content=body, media_type="application/json")
+
+
+class QuestionPayloadCache:
+    """In-process LRU over an optional Redis copy of question-set payloads."""
+
+    def __init__(self, max_items: int = 512, memory_ttl: float = 300.0, redis_ttl: int = 86400):
+        self.max_items = max_items
+        self.memory_ttl = memory_ttl
+        self.redis_ttl = redis_ttl
+        self._items: "OrderedDict[str, Tuple[float, QuestionSetPayload]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _redis():
+        # Redis may be initialized for other features (answer journal, risk scoring)
+        if not settings.QUESTION_CACHE_USE_REDIS:
+            return None
+        from app.core import redis as redis_module
+
+        return redis_module.redis_client
+
+    @staticmethod
+    def _redis_key(question_set_id: str) -> str:
+        return f"{settings.REDIS_CACHE_PREFIX}questionset:{question_set_id}"
+
+    def _remember(self, payload: QuestionSetPayload) -> None:
+        with self._lock:
+            self._items[payload.question_set_id] = (time.monotonic() + self.memory_ttl, payload)
+            self._items.move_to_end(payload.question_set_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def _cached(self, question_set_id: str) -> Optional[QuestionSetPayload]:
+        with self._lock:
+            entry = self._items.get(question_set_id)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires < time.monotonic():
+                del self._items[question_set_id]
+                return None
+            self._items.move_to_end(question_set_id)
+            return payload
+
+    async def get(self, db: AsyncSession, question_set_id: str) -> Optional[QuestionSetPayload]:
+        """Payload for a question set; None if the set does not exist or has no questions."""
+        payload = self._cached(question_set_id)
+        if payload is not None:
+            self.hits += 1
+            return payload
+        self.misses += 1
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                data = await redis.get(self._redis_key(question_set_id))
+                if data:
+                    payload = QuestionSetPayload.from_redis(question_set_id, data)
+                    self._remember(payload)
+                    return payload
+            except Exception as e:
+                logger.warning(f"Question payload cache read failed for {question_set_id}: {e}")
+
+        payload = await self._load(db, question_set_id)
+        if payload is None:
+            return None
+        self._remember(payload)
+        if redis is not None:
+            try:
+                await redis.setex(self._redis_key(question_set_id), self.redis_ttl, payload.to_redis())
+            except Exception as e:
+                logger.warning(f"Question payload cache write failed for {question_set_id}: {e}")
+        return payload
+
+    @staticmethod
+    async def _load(db: AsyncSession, question_set_id: str) -> Optional[QuestionSetPayload]:
+        result = await db.execute(select(QuestionSet).where(QuestionSet.question_set_id == question_set_id))
+        question_set = result.scalar_one_or_none()
+        if question_set is None:
+            return None
+        result = await db.execute(
+            select(Question).where(Question.question_set_id == question_set_id).order_by(Question.id)
+        )
+        questions = result.scalars().all()
+        if not questions:
+            return None
+        return QuestionSetPayload(
+            question_set_id=question_set_id,
+            skill=question_set.skill,
+            level=question_set.level,
+            total_questions=question_set.total_questions,
+            fragments=[serialize_question(q) for q in questions],
+            options={q.id: sorted(q.options) for q in questions},
+        )
+
+    def forget(self, question_set_id: str) -> None:
+        """Drop the in-process copy."""
+        with self._lock:
+            self._items.pop(question_set_id, None)
+
+    async def invalidate(self, question_set_id: str) -> None:
+        """Drop the payload here and in Redis (other workers' copies age out with the memory TTL)."""
+        self.forget(question_set_id)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.delete(self._redis_key(question_set_id))
+            except Exception as e:
+                logger.warning(f"Question payload cache invalidation failed for {question_set_id}: {e}")
+
+
+_question_cache: Optional[QuestionPayloadCache] = None
+
+
+def get_question_cache() -> QuestionPayloadCache:
+    """Get the question payload cache singleton."""
+    global _question_cache
+    if _question_cache is None:
+        _question_cache = QuestionPayloadCache(
+            max_items=settings.QUESTION_CACHE_SIZE,
+            memory_ttl=settings.QUESTION_CACHE_MEMORY_TTL_SECONDS,
+            redis_ttl=settings.QUESTION_CACHE_REDIS_TTL_SECONDS,
+        )
+    return _question_cache
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_question_sets(session: Session, flush_context, instances) -> None:
+    changed: Set[str] = session.info.setdefault("changed_question_sets", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Question) and obj.question_set_id:
+            changed.add(obj.question_set_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_question_sets(session: Session) -> None:
+    changed = session.info.pop("changed_question_sets", None)
+    if not changed:
+        return
+    cache = get_question_cache()
+    answer_keys = get_answer_keys()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for question_set_id in changed:
+        answer_keys.forget(question_set_id)
+        if loop is not None:
+            loop.create_task(cache.invalidate(question_set_id))
+        else:
+            cache.forget(question_set_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_question_sets(session: Session) -> None:
+    session.info.pop("changed_question_sets", None)
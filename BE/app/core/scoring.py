@@ -0,0 +1,241 @@
+"""Vectorized MCQ scoring against precomputed answer keys.
+
+A question set's answer key is two aligned NumPy arrays (sorted question ids
+and their correct options) cached in-process; answer keys never leave the
+process. Every lookup checks the set's key version (question count and
+latest Question.updated_at), so a correction committed by another worker is
+picked up on that worker's next submission instead of after the TTL. Scoring a submission, or re-scoring every scored
+session of a set after a key correction, is a searchsorted plus one array
+comparison instead of per-answer ORM lookups. Cohort re-scoring also yields
+classical item statistics (difficulty and upper/lower discrimination).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.models import Answer, Question, TestSession
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Share of examinees in each of the upper and lower groups (Kelley's 27%)
+DISCRIMINATION_GROUP_FRACTION = 0.27
+
+
+@dataclass
+class AnswerKey:
+    question_set_id: str
+    question_ids: np.ndarray  # sorted int64
+    correct: np.ndarray  # correct option per question, aligned with question_ids
+    version: Any = None  # (question count, latest updated_at) when loaded
+
+    @classmethod
+    def from_rows(cls, question_set_id: str, rows: Sequence[Tuple[int, str]], version: Any = None) -> "AnswerKey":
+        rows = sorted(rows)
+        return cls(
+            question_set_id=question_set_id,
+            question_ids=np.array([qid for qid, _ in rows], dtype=np.int64),
+            correct=np.array([answer for _, answer in rows], dtype=object).astype(str),
+            version=version,
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.question_ids)
+
+    def positions(self, question_ids) -> np.ndarray:
+        """Index of each question in the key; -1 for questions not in this set."""
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        if not self.size:
+            return np.full(len(question_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.question_ids, question_ids), self.size - 1)
+        return np.where(self.question_ids[pos] == question_ids, pos, -1)
+
+    def mark(self, question_ids, selected_answers) -> np.ndarray:
+        """Boolean correctness of each (question_id, selected_answer) pair."""
+        pos = self.positions(question_ids)
+        if not len(pos) or not self.size:
+            return np.zeros(len(pos), dtype=bool)
+        selected = np.asarray(selected_answers, dtype=object).astype(str)
+        return (pos >= 0) & (self.correct[np.maximum(pos, 0)] == selected)
+
+    def correct_answer(self, question_id: int) -> Optional[str]:
+        pos = int(self.positions([question_id])[0])
+        return str(self.correct[pos]) if pos >= 0 else None
+
+
+class AnswerKeyCache:
+    """In-process LRU of answer keys by question_set_id, revalidated against the database."""
+
+    def __init__(self, max_items: int = 512, ttl: float = 300.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, AnswerKey]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    async def _version(db: AsyncSession, question_set_id: str) -> Tuple:
+        result = await db.execute(
+            select(func.count(), func.max(Question.updated_at)).where(Question.question_set_id == question_set_id)
+        )
+        return tuple(result.one())
+
+    async def get(self, db: AsyncSession, question_set_id: str) -> AnswerKey:
+        # One aggregate over the set's index instead of reloading the key; catches
+        # corrections, inserts and deletes committed by any worker
+        version = await self._version(db, question_set_id)
+        with self._lock:
+            entry = self._items.get(question_set_id)
+            if entry is not None and entry[0] >= time.monotonic() and entry[1].version == version:
+                self._items.move_to_end(question_set_id)
+                return entry[1]
+
+        result = await db.execute(
+            select(Question.id, Question.correct_answer).where(Question.question_set_id == question_set_id)
+        )
+        key = AnswerKey.from_rows(question_set_id, [tuple(row) for row in result.all()], version)
+        with self._lock:
+            self._items[question_set_id] = (time.monotonic() + self.ttl, key)
+            self._items.move_to_end(question_set_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return key
+
+    def forget(self, question_set_id: str) -> None:
+        with self._lock:
+            self._items.pop(question_set_id, None)
+
+
+_answer_keys: Optional[AnswerKeyCache] = None
+
+
+def get_answer_keys() -> AnswerKeyCache:
+    """Get the answer key cache singleton."""
+    global _answer_keys
+    if _answer_keys is None:
+        _answer_keys = AnswerKeyCache(
+            max_items=settings.QUESTION_CACHE_SIZE, ttl=settings.QUESTION_CACHE_MEMORY_TTL_SECONDS
+        )
+    return _answer_keys
+
+
+def item_statistics(key: AnswerKey, correct: np.ndarray, answered: np.ndarray) -> List[Dict]:
+    """Per-question statistics from a sessions x questions correctness matrix.
+
+    difficulty is the share of examinees answering correctly (unanswered
+    counts as wrong); discrimination is the difficulty in the top 27% of
+    total scores minus that in the bottom 27% (None with fewer than two
+    examinees).
+    """
+    n_sessions = correct.shape[0]
+    if n_sessions:
+        difficulty = correct.mean(axis=0)
+    else:
+        difficulty = np.full(key.size, np.nan)
+
+    discrimination = np.full(key.size, np.nan)
+    if n_sessions >= 2:
+        group = max(1, int(round(n_sessions * DISCRIMINATION_GROUP_FRACTION)))
+        order = np.argsort(correct.sum(axis=1), kind="stable")
+        discrimination = correct[order[-group:]].mean(axis=0) - correct[order[:group]].mean(axis=0)
+
+    responses = answered.sum(axis=0)
+    return [
+        {
+            "question_id": int(qid),
+            "responses": int(responses[i]),
+            "difficulty": None if np.isnan(difficulty[i]) else round(float(difficulty[i]), 4),
+            "discrimination": None if np.isnan(discrimination[i]) else round(float(discrimination[i]), 4),
+        }
+        for i, qid in enumerate(key.question_ids)
+    ]
+
+
+def score_cohort(
+    key: AnswerKey, session_index: np.ndarray, question_ids: np.ndarray, selected_answers: Sequence[str], n_sessions: int
+) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
+    """Score answer rows of many sessions at once.
+
+    Rows are (session_index[i], question_ids[i], selected_answers[i]).
+    Returns per-row correctness, per-session correct counts and item
+    statistics.
+    """
+    marks = key.mark(question_ids, selected_answers)
+    pos = key.positions(question_ids)
+    known = pos >= 0
+
+    correct = np.zeros((n_sessions, key.size), dtype=bool)
+    answered = np.zeros((n_sessions, key.size), dtype=bool)
+    correct[session_index[known], pos[known]] = marks[known]
+    answered[session_index[known], pos[known]] = True
+
+    counts = correct.sum(axis=1)
+    return marks, counts, item_statistics(key, correct, answered)
+
+
+async def rescore_question_set(db: AsyncSession, question_set_id: str) -> Dict:
+    """Re-score every scored session of a question set against its current key (caller commits)."""
+    get_answer_keys().forget(question_set_id)
+    key = await get_answer_keys().get(db, question_set_id)
+
+    result = await db.execute(
+        select(TestSession.id, TestSession.session_id, TestSession.total_questions, TestSession.correct_answers)
+        .where(TestSession.question_set_id == question_set_id, TestSession.is_scored.is_(True))
+    )
+    sessions = result.all()
+    index = {s.session_id: i for i, s in enumerate(sessions)}
+
+    result = await db.execute(
+        select(Answer.id, Answer.session_id, Answer.question_id, Answer.selected_answer, Answer.is_correct)
+        .join(TestSession, TestSession.session_id == Answer.session_id)
+        .where(TestSession.question_set_id == question_set_id, TestSession.is_scored.is_(True))
+    )
+    # Sessions scored between the two queries are left for the next re-score
+    answers = [a for a in result.all() if a.session_id in index]
+
+    marks, counts, stats = score_cohort(
+        key,
+        np.fromiter((index[a.session_id] for a in answers), dtype=np.int64, count=len(answers)),
+        np.fromiter((a.question_id for a in answers), dtype=np.int64, count=len(answers)),
+        [a.selected_answer for a in answers],
+        len(sessions),
+    )
+
+    answer_updates = [
+        {"id": a.id, "is_correct": bool(mark)}
+        for a, mark in zip(answers, marks)
+        if a.is_correct is None or a.is_correct != bool(mark)
+    ]
+    session_updates = [
+        {
+            "id": s.id,
+            "correct_answers": int(count),
+            "score_percentage": (int(count) / s.total_questions * 100) if s.total_questions > 0 else 0,
+        }
+        for s, count in zip(sessions, counts)
+        if s.correct_answers != int(count)
+    ]
+    if answer_updates:
+        await db.execute(update(Answer), answer_updates)
+    if session_updates:
+        await db.execute(update(TestSession), session_updates)
+
+    logger.info(
+        f"Re-scored {question_set_id}: {len(sessions)} sessions, "
+        f"{len(answer_updates)} answers and {len(session_updates)} scores changed"
+    )
+    return {
+        "question_set_id": question_set_id,
+        "sessions_rescored": len(sessions),
+        "answers_changed": len(answer_updates),
+        "scores_changed": len(session_updates),
+        "item_statistics": stats,
+    }
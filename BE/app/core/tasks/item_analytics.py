@@ -0,0 +1,157 @@
+"""Nightly item analytics over scored answers.
+
+Per question, Postgres aggregates answers joined with their scored test
+sessions: p-value (share correct), point-biserial correlation of the item
+with the rest-of-test score, and the selection rate of every option. The
+results, with flags for items that look broken, replace the rows in
+question_item_stats, which the admin endpoint reads directly.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.celery_app import celery_app
+from app.core.logging import get_logger
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Rows per INSERT, well below Postgres' bind-parameter limit
+UPSERT_CHUNK_ROWS = 2000
+
+
+def item_flags(
+    responses: int,
+    p_value: Optional[float],
+    point_biserial: Optional[float],
+    option_rates: Dict[str, float],
+    correct_answer: str,
+) -> List[str]:
+    """Reasons an item deserves review; none until it has enough responses."""
+    if responses < settings.ITEM_ANALYTICS_MIN_RESPONSES or p_value is None:
+        return []
+    flags = []
+    if p_value < settings.ITEM_ANALYTICS_MIN_P_VALUE:
+        flags.append("too_hard")
+    elif p_value > settings.ITEM_ANALYTICS_MAX_P_VALUE:
+        flags.append("too_easy")
+    if point_biserial is not None:
+        if point_biserial < 0:
+            flags.append("negative_discrimination")
+        elif point_biserial < settings.ITEM_ANALYTICS_MIN_POINT_BISERIAL:
+            flags.append("low_discrimination")
+    key_rate = option_rates.get(correct_answer, 0.0)
+    distractors = {opt: rate for opt, rate in option_rates.items() if opt != correct_answer}
+    if any(rate > key_rate for rate in distractors.values()):
+        flags.append("distractor_beats_key")
+    if any(rate == 0 for rate in distractors.values()):
+        flags.append("unused_distractor")
+    return flags
+
+
+@celery_app.task(
+    bind=True,
+    name='app.core.tasks.item_analytics.refresh_item_analytics',
+    max_retries=2,
+    default_retry_delay=600
+)
+def refresh_item_analytics(self) -> Dict:
+    """
+    Recompute item statistics for every answered question (scheduled nightly).
+
+    Returns:
+        Task result dict
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(_refresh_item_analytics())
+    except Exception as exc:
+        raise self.retry(exc=exc)
+    finally:
+        loop.close()
+
+
+async def _refresh_item_analytics() -> Dict:
+    from sqlalchemy import Integer, cast, delete, func, select
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.db.session import async_session_maker
+    from app.db.models import Answer, Question, QuestionItemStatistic, TestSession
+
+    computed_at = datetime.now(timezone.utc)
+    item = cast(Answer.is_correct, Integer)  # 1 correct, 0 wrong
+    # Legacy JD-based sessions can hold unscored answers (NULL is_correct);
+    # leaving them out keeps responses, p-values and option rates on the same rows
+    scored = (
+        select()
+        .select_from(Answer)
+        .join(TestSession, TestSession.session_id == Answer.session_id)
+        .where(TestSession.is_scored.is_(True), Answer.is_correct.isnot(None))
+    )
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            scored.add_columns(
+                Question.id,
+                Question.question_set_id,
+                Question.correct_answer,
+                Question.options,
+                func.count().label("responses"),
+                func.avg(item).label("p_value"),
+                # Corrected item-total correlation: the item against the rest of the test
+                func.corr(item, TestSession.correct_answers - item).label("point_biserial"),
+            )
+            .join(Question, Question.id == Answer.question_id)
+            .group_by(Question.id)
+        )
+        items = result.all()
+
+        result = await session.execute(
+            scored.add_columns(Answer.question_id, Answer.selected_answer, func.count().label("picks"))
+            .group_by(Answer.question_id, Answer.selected_answer)
+        )
+        picks: Dict[int, Dict[str, int]] = {}
+        for row in result:
+            picks.setdefault(row.question_id, {})[row.selected_answer] = row.picks
+
+        rows = []
+        for q in items:
+            counts = picks.get(q.id, {})
+            option_rates = {
+                opt: round(counts.get(opt, 0) / q.responses, 4)
+                for opt in sorted(set(q.options or {}) | set(counts))
+            }
+            p_value = float(q.p_value) if q.p_value is not None else None
+            point_biserial = float(q.point_biserial) if q.point_biserial is not None else None
+            flags = item_flags(q.responses, p_value, point_biserial, option_rates, q.correct_answer)
+            rows.append({
+                "question_id": q.id,
+                "question_set_id": q.question_set_id,
+                "responses": q.responses,
+                "p_value": round(p_value, 4) if p_value is not None else None,
+                "point_biserial": round(point_biserial, 4) if point_biserial is not None else None,
+                "option_rates": option_rates,
+                "flags": flags,
+                "is_flagged": bool(flags),
+                "computed_at": computed_at,
+            })
+
+        for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            stmt = pg_insert(QuestionItemStatistic).values(rows[start:start + UPSERT_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[QuestionItemStatistic.question_id],
+                set_={
+                    **{col: stmt.excluded[col] for col in rows[0] if col != "question_id"},
+                    "updated_at": func.now(),
+                },
+            )
+            await session.execute(stmt)
+        # Questions with no scored answers any more
+        await session.execute(delete(QuestionItemStatistic).where(QuestionItemStatistic.computed_at < computed_at))
+        await session.commit()
+
+    flagged = sum(1 for row in rows if row["is_flagged"])
+    logger.info(f"Item analytics refreshed: {len(rows)} questions, {flagged} flagged")
+    return {'status': 'refreshed', 'questions': len(rows), 'flagged': flagged}
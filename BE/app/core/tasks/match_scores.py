@@ -0,0 +1,217 @@
+"""Celery tasks maintaining the candidate-requisition match table.
+
+Rows are only recomputed for what changed: a candidate's skills are scored
+against every open requisition, and a requisition's profile against every
+active candidate. Inactive candidates and closed requisitions lose their rows.
+"""
+import asyncio
+from typing import Dict, List
+
+from app.core.celery_app import celery_app
+from app.core.logging import get_logger
+from app.db.models import JobRequisitionStatus
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Requisitions that can still receive candidates
+MATCHABLE_STATUSES = (JobRequisitionStatus.DRAFT, JobRequisitionStatus.OPEN, JobRequisitionStatus.PAUSED)
+
+
+def enqueue(task, *args) -> None:
+    """Queue a refresh without failing the request that triggered it."""
+    try:
+        task.delay(*args)
+    except Exception as e:
+        logger.warning(f"Could not queue {task.name}{args}: {e}")
+
+
+def _run(coro) -> Dict:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _rows(candidate_pk: int, requisition_id: str, result: Dict) -> Dict:
+    return {
+        "candidate_id": candidate_pk,
+        "requisition_id": requisition_id,
+        "score": result["score"],
+        "skill_score": result["skill_score"],
+        "experience_score": result["experience_score"],
+        "matched_skills": result["matched_skills"],
+        "missing_skills": result["missing_skills"],
+    }
+
+
+async def _upsert(session, rows: List[Dict]) -> None:
+    """Insert or overwrite match rows; a concurrent refresh may have written the same pair."""
+    from sqlalchemy import func
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.db.models import CandidateRequisitionMatch
+
+    stmt = pg_insert(CandidateRequisitionMatch)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_candidate_requisition_match",
+        set_={
+            **{col: stmt.excluded[col] for col in rows[0] if col not in ("candidate_id", "requisition_id")},
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt, rows)
+
+
+@celery_app.task(
+    bind=True,
+    name='app.core.tasks.match_scores.refresh_candidate_matches',
+    max_retries=3,
+    default_retry_delay=60
+)
+def refresh_candidate_matches(self, candidate_id: str) -> Dict:
+    """
+    Re-score one candidate against all open requisitions.
+
+    Args:
+        candidate_id: Candidate public ID (cand_...)
+
+    Returns:
+        Task result dict
+    """
+    try:
+        return _run(_refresh_candidate_matches(candidate_id))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+@celery_app.task(
+    bind=True,
+    name='app.core.tasks.match_scores.refresh_requisition_matches',
+    max_retries=3,
+    default_retry_delay=60
+)
+def refresh_requisition_matches(self, requisition_id: str) -> Dict:
+    """
+    Re-score all active candidates against one requisition.
+
+    Args:
+        requisition_id: Requisition public ID (req_...)
+
+    Returns:
+        Task result dict
+    """
+    try:
+        return _run(_refresh_requisition_matches(requisition_id))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+
+async def _load_profiles(session, requisitions) -> Dict[str, object]:
+    """Stored match profiles by requisition_id, building any that are missing."""
+    from sqlalchemy import select
+    from app.db.models import JDMatchProfile
+    from app.vector_db.match_profiles import refresh_requisition_profile
+
+    ids = [req.requisition_id for req in requisitions]
+    result = await session.execute(
+        select(JDMatchProfile).where(
+            JDMatchProfile.source_type == "requisition", JDMatchProfile.source_id.in_(ids)
+        )
+    )
+    profiles = {profile.source_id: profile for profile in result.scalars().all()}
+    for req in requisitions:
+        if req.requisition_id not in profiles:
+            profiles[req.requisition_id] = await refresh_requisition_profile(session, req)
+    return profiles
+
+
+async def _refresh_candidate_matches(candidate_id: str) -> Dict:
+    from sqlalchemy import delete, select
+    from app.db.session import async_session_maker
+    from app.db.models import Candidate, CandidateRequisitionMatch, JobRequisition
+    from app.vector_db.match_profiles import score_candidates
+    from app.vector_db.skill_matcher import load_skill_matcher
+
+    async with async_session_maker() as session:
+        result = await session.execute(select(Candidate).where(Candidate.candidate_id == candidate_id))
+        candidate = result.scalar_one_or_none()
+        if candidate is None or not candidate.is_active:
+            if candidate is not None:
+                await session.execute(
+                    delete(CandidateRequisitionMatch).where(CandidateRequisitionMatch.candidate_id == candidate.id)
+                )
+                await session.commit()
+            return {'candidate_id': candidate_id, 'status': 'removed', 'matches': 0}
+
+        result = await session.execute(
+            select(JobRequisition).where(JobRequisition.status.in_(MATCHABLE_STATUSES))
+        )
+        requisitions = result.scalars().all()
+        profiles = await _load_profiles(session, requisitions)
+        matcher = await load_skill_matcher()
+
+        pair = [(candidate.skills, candidate.experience_years)]
+        rows: List[Dict] = []
+        for req in requisitions:
+            profile = profiles[req.requisition_id]
+            scored = score_candidates(profile.skills, profile.min_experience_years, pair, matcher)
+            rows.append(_rows(candidate.id, req.requisition_id, scored[0]))
+
+        # Only rows for requisitions that are no longer matchable go away
+        await session.execute(
+            delete(CandidateRequisitionMatch).where(
+                CandidateRequisitionMatch.candidate_id == candidate.id,
+                CandidateRequisitionMatch.requisition_id.not_in(
+                    select(JobRequisition.requisition_id).where(JobRequisition.status.in_(MATCHABLE_STATUSES))
+                ),
+            )
+        )
+        if rows:
+            await _upsert(session, rows)
+        await session.commit()
+
+    return {'candidate_id': candidate_id, 'status': 'refreshed', 'matches': len(rows)}
+
+
+async def _refresh_requisition_matches(requisition_id: str) -> Dict:
+    from sqlalchemy import delete, select
+    from app.db.session import async_session_maker
+    from app.db.models import Candidate, CandidateRequisitionMatch, JobRequisition
+    from app.vector_db.match_profiles import score_candidates
+    from app.vector_db.skill_matcher import load_skill_matcher
+
+    async with async_session_maker() as session:
+        result = await session.execute(select(JobRequisition).where(JobRequisition.requisition_id == requisition_id))
+        req = result.scalar_one_or_none()
+        stale = delete(CandidateRequisitionMatch).where(CandidateRequisitionMatch.requisition_id == requisition_id)
+        if req is None or req.status not in MATCHABLE_STATUSES:
+            await session.execute(stale)
+            await session.commit()
+            return {'requisition_id': requisition_id, 'status': 'removed', 'matches': 0}
+
+        profile = (await _load_profiles(session, [req]))[requisition_id]
+        result = await session.execute(
+            select(Candidate.id, Candidate.skills, Candidate.experience_years).where(Candidate.is_active.is_(True))
+        )
+        candidates = result.all()
+        matcher = await load_skill_matcher()
+        scored = score_candidates(
+            profile.skills, profile.min_experience_years,
+            [(c.skills, c.experience_years) for c in candidates], matcher,
+        )
+        rows = [_rows(candidates[r["index"]].id, requisition_id, r) for r in scored]
+
+        # Only rows for candidates that are no longer active go away
+        await session.execute(
+            stale.where(
+                CandidateRequisitionMatch.candidate_id.not_in(select(Candidate.id).where(Candidate.is_active.is_(True)))
+            )
+        )
+        if rows:
+            await _upsert(session, rows)
+        await session.commit()
+
+    return {'requisition_id': requisition_id, 'status': 'refreshed', 'matches': len(rows)}
@@ -548,6 +548,77 @@ class SkillMatch(Base, TimestampMixin):
         return f"<SkillMatch(id={self.id}, match_id='{self.match_id}', score={self.match_score})>"
 
 
+class JDMatchProfile(Base, TimestampMixin):
+    """Pre-computed match requirements of a JD or job requisition, rebuilt when the source is saved."""
+
+    __tablename__ = "jd_match_profiles"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    source_type: Mapped[str] = mapped_column(String(20), nullable=False)  # requisition, jd
+    source_id: Mapped[str] = mapped_column(String(100), nullable=False)  # requisition_id or jd_id
+    # [{skill, canonical, min_proficiency, priority, weight}]
+    skills: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    min_experience_years: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_experience_years: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    experience_level: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("source_type", "source_id", name="uq_jd_match_profiles_source"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<JDMatchProfile(id={self.id}, source='{self.source_type}:{self.source_id}', skills={len(self.skills or [])})>"
+
+
+class CandidateRequisitionMatch(Base, TimestampMixin):
+    """Materialized fit of an active candidate for an open requisition, refreshed on write."""
+
+    __tablename__ = "candidate_requisition_matches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    candidate_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    requisition_id: Mapped[str] = mapped_column(
+        String(100), ForeignKey("job_requisitions.requisition_id", ondelete="CASCADE"), nullable=False
+    )
+    score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    skill_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    experience_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    matched_skills: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    missing_skills: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+
+    __table_args__ = (
+        UniqueConstraint("candidate_id", "requisition_id", name="uq_candidate_requisition_match"),
+        Index("ix_candidate_requisition_matches_requisition_score", "requisition_id", "score"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CandidateRequisitionMatch(candidate_id={self.candidate_id}, requisition_id='{self.requisition_id}', score={self.score})>"
+
+
+class QuestionItemStatistic(Base, TimestampMixin):
+    """Nightly item analytics for one question, aggregated over scored sessions."""
+
+    __tablename__ = "question_item_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    question_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    question_set_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)
+    responses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    p_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # share answering correctly
+    point_biserial: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # item vs rest-of-test score
+    option_rates: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)  # {"A": 0.4, "B": 0.1, ...}
+    flags: Mapped[list] = mapped_column(JSON, nullable=False, default=list)  # e.g. ["too_hard", "distractor_beats_key"]
+    is_flagged: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, index=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<QuestionItemStatistic(question_id={self.question_id}, p_value={self.p_value})>"
+
+
 class AssessmentToken(Base, TimestampMixin):
     """Assessment access token for candidate invitation links."""
 
@@ -19,11 +19,15 @@ import structlog
 
 from config import get_settings
 from app.db.session import init_db, close_db
-# from app.core.redis import init_redis, close_redis  # DISABLED - Redis not in use
+from app.core.redis import init_redis, close_redis  # only used when a Redis-backed feature is enabled
+from app.core.answer_journal import start_answer_flusher, stop_answer_flusher
+from app.core.proctoring_buffer import start_proctoring_writer, stop_proctoring_writer
 from app.core.logging import configure_logging, get_logger
 from app.core.sentry import init_sentry
 from app.core.metrics import setup_metrics
 from app.core.error_handlers import validation_error_handler, ERROR_CODES
+from app.core.llm_gateway import close_llm_gateway
+from app.utils.cv_formatter import close_render_pool
 
 # API routers
 from app.api.mcq_generation import router as mcq_generation_router
@@ -42,6 +46,7 @@ from app.api.llm_extraction import router as llm_extraction_router
 # Import for recommended courses if it exists
 try:
     from app.api.recommended_courses import router as recommended_courses_router
+    from app.vector_db.course_index import get_course_index
     has_recommended_courses = True
 except ImportError:
     has_recommended_courses = False
@@ -58,12 +63,17 @@ async def lifespan(app: FastAPI):
     configure_logging()
     init_sentry()
     
-    # Redis - DISABLED
-    # try:
-    #     await init_redis()
-    #     logger.info("redis_initialized")
-    # except Exception as e:
-    #     logger.error("redis_initialization_failed", error=str(e))
+    # Redis - only needed for the answer journal, the shared question cache and proctoring risk scores
+    redis_enabled = (
+        settings.ANSWER_JOURNAL_ENABLED or settings.QUESTION_CACHE_USE_REDIS or settings.PROCTORING_RISK_ENABLED
+    )
+    if redis_enabled:
+        try:
+            await init_redis()
+            logger.info("redis_initialized")
+            start_answer_flusher()
+        except Exception as e:
+            logger.error("redis_initialization_failed", error=str(e))
     
     try:
         await init_db()
@@ -71,11 +81,25 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("database_initialization_failed", error=str(e))
     
+    # Batched proctoring event writer
+    start_proctoring_writer()
+    
+    if has_recommended_courses and settings.COURSE_INDEX_MODE == "warm":
+        # Load the course index in the background; requests wait for it on first use
+        get_course_index().start_background_warm_up(preembed_skills=settings.COURSE_PREEMBED_SKILLS)
+    
     yield
     
     logger.info("shutting_down_application")
     
-    # await close_redis()  # Redis not in use
+    await stop_proctoring_writer()
+    if redis_enabled:
+        await stop_answer_flusher()
+        await close_redis()
+    await close_llm_gateway()
+    close_render_pool()
+    if has_recommended_courses:
+        get_course_index().close()
     await close_db()
     
     logger.info("application_shutdown_complete")
@@ -296,13 +320,16 @@ if settings.ENVIRONMENT != "testing":
 
 # Health check endpoints
 @app.get("/health", tags=["Health"])
-async def health_check() -> dict[str, str]:
+async def health_check() -> dict:
     """Health check endpoint."""
-    return {
+    health = {
         "status": "healthy",
         "version": settings.APP_VERSION,
         "environment": settings.ENVIRONMENT,
     }
+    if has_recommended_courses:
+        health["course_index"] = get_course_index().health()
+    return health
 
 
 @app.get("/", tags=["Root"])
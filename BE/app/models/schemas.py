@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -72,12 +72,23 @@ class AnswerSubmit(BaseModel):
     """Single answer submission."""
     question_id: int
     selected_answer: str  # e.g., "A", "B", "C", "D"
+    time_taken_seconds: Optional[int] = None
 
 class SubmitAllAnswersRequest(BaseModel):
-    """Submit all answers at once."""
+    """Submit all answers at once (answers already saved during the test may be omitted)."""
     session_id: str
     answers: List[AnswerSubmit]
 
+class SaveAnswersRequest(BaseModel):
+    """Save answers while the test is in progress."""
+    answers: List[AnswerSubmit]
+
+class SaveAnswersResponse(BaseModel):
+    """Acknowledgement of saved answers."""
+    session_id: str
+    saved: int
+    remaining_seconds: Optional[int] = None
+
 class QuestionResultDetailed(BaseModel):
     """Detailed result for a single question."""
     question_id: int
@@ -100,6 +111,40 @@ class TestResultResponse(BaseModel):
     time_taken_seconds: int
     detailed_results: List[QuestionResultDetailed]
 
+class AnswerKeyCorrection(BaseModel):
+    """Corrected answer key for a single question."""
+    correct_answer: str
+
+class ItemStatistics(BaseModel):
+    """Classical item statistics for one question."""
+    question_id: int
+    responses: int
+    difficulty: Optional[float] = None  # share of examinees answering correctly
+    discrimination: Optional[float] = None  # upper 27% minus lower 27% difficulty
+
+class RescoreResponse(BaseModel):
+    """Result of re-scoring a question set's sessions."""
+    question_set_id: str
+    sessions_rescored: int
+    answers_changed: int
+    scores_changed: int
+    item_statistics: List[ItemStatistics]
+
+class ItemAnalyticsResponse(BaseModel):
+    """Nightly item analytics for one question."""
+    model_config = {"from_attributes": True}
+
+    question_id: int
+    question_set_id: Optional[str] = None
+    question_text: Optional[str] = None
+    correct_answer: Optional[str] = None
+    responses: int
+    p_value: Optional[float] = None
+    point_biserial: Optional[float] = None
+    option_rates: Dict[str, float] = {}
+    flags: List[str] = []
+    computed_at: datetime
+
 class AnswerSubmission(BaseModel):
     session_id: str
     question_id: int
@@ -254,6 +299,41 @@ class TransformCVResponse(BaseModel):
     extracted_skills: Optional[List[str]] = None
 
 
+# ============ LLM EXTRACTION OUTPUT SCHEMAS ============
+
+class CVWorkExperienceEntry(BaseModel):
+    """Single work-experience entry emitted by the LLM CV extractor."""
+    model_config = ConfigDict(extra="allow")
+
+    company: str = ""
+    role: str = ""
+    duration: str = ""
+    responsibilities: List[str] = []
+    achievements: List[str] = []
+
+
+class CVProjectEntry(BaseModel):
+    """Single project entry emitted by the LLM CV extractor."""
+    model_config = ConfigDict(extra="allow")
+
+    project_name: str = ""
+    role: str = ""
+    duration: str = ""
+    tech_stack: List[str] = []
+    description: str = ""
+    responsibilities: List[str] = []
+    complexity_level: str = ""
+    impact: str = ""
+
+
+class DocumentClassification(BaseModel):
+    """CV/JD classifier output."""
+    document_type: str = "unknown"  # cv, jd, unknown
+    confidence: float = 0.0
+    reason: str = ""
+    quick_hint: str = ""
+
+
 class CandidateNoteCreate(BaseModel):
     note_text: str
     note_type: Optional[str] = "general"
@@ -381,6 +461,8 @@ class AssessmentApplicationRequest(BaseModel):
 
 class AssessmentApplicationResponse(BaseModel):
     """Response with application details."""
+    model_config = {"from_attributes": True}
+    
     id: int
     application_id: str
     candidate_id: int
@@ -394,6 +476,7 @@ class AssessmentApplicationResponse(BaseModel):
     completed_at: Optional[datetime]
     created_at: datetime
     updated_at: datetime
+    match_score: Optional[float] = None  # fit for the requisition, when listed per requisition
 
 
 class UploadedDocumentResponse(BaseModel):
@@ -452,6 +535,8 @@ class MatchedSkill(BaseModel):
     jd_proficiency: Optional[str] = None
     cv_proficiency: Optional[str] = None
     confidence: Optional[float] = Field(default=0.0, ge=0.0, le=1.0)
+    cv_skill_name: Optional[str] = None  # CV skill matched to skill_name, if named differently
+    similarity: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 
 class SkillMatchResponse(BaseModel):
@@ -550,6 +635,28 @@ class JobRequisitionResponse(BaseModel):
     updated_at: datetime
 
 
+class RankedCandidate(BaseModel):
+    """Candidate scored against a requisition's match profile."""
+    candidate_id: str
+    full_name: str
+    email: str
+    score: float
+    skill_score: float
+    experience_score: float
+    experience_years: Optional[float] = None
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+
+
+class CandidateRankingResponse(BaseModel):
+    """Top candidates for a requisition."""
+    requisition_id: str
+    total_candidates: int
+    profile_skills: List[str] = []
+    profile_updated_at: Optional[datetime] = None
+    candidates: List[RankedCandidate] = []
+
+
 # ============ INTERVIEW SESSION SCHEMAS ============
 
 class InterviewSessionCreate(BaseModel):
@@ -680,13 +787,26 @@ class InterviewFeedbackResponse(BaseModel):
 
 class ProctoringEventCreate(BaseModel):
     """Request to log a proctoring event."""
-    test_session_id: str
-    event_type: str
-    severity: str  # low, medium, high, critical
+    # Limits match the proctoring_events columns, so oversized values fail validation, not the batch insert
+    test_session_id: str = Field(..., max_length=100)
+    event_type: str = Field(..., max_length=100)
+    severity: str = Field(..., max_length=50)  # low, medium, high, critical
     duration_seconds: Optional[int] = None
     question_id: Optional[int] = None
-    snapshot_url: Optional[str] = None
+    snapshot_url: Optional[str] = Field(None, max_length=500)
     metadata: dict = {}
+    detected_at: Optional[datetime] = None  # client-side time; defaults to receipt time
+
+
+class ProctoringEventBatch(BaseModel):
+    """Request to log several proctoring events at once."""
+    events: List[ProctoringEventCreate] = Field(..., min_length=1)
+
+
+class ProctoringEventBatchResponse(BaseModel):
+    """Events accepted for asynchronous writing."""
+    accepted: int
+    event_ids: List[str]
 
 
 class ProctoringEventResponse(BaseModel):
@@ -702,8 +822,13 @@ class ProctoringEventResponse(BaseModel):
     duration_seconds: Optional[int]
     question_id: Optional[int]
     snapshot_url: Optional[str]
-    # Map the DB attribute `event_metadata` to the external name `metadata` via alias
-    event_metadata: dict = Field(alias="metadata")
+    # Read the ORM attribute `event_metadata` (the model's `metadata` is SQLAlchemy's MetaData)
+    # and expose it as `metadata`
+    event_metadata: dict = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("event_metadata", "metadata"),
+        serialization_alias="metadata",
+    )
     reviewed: bool
     reviewed_by: Optional[int]
     reviewed_at: Optional[datetime]
@@ -730,6 +855,18 @@ class ProctoringEventAdminResponse(ProctoringEventResponse):
     test_session_score_percentage: Optional[float] = None
 
 
+class ProctoringRiskResponse(BaseModel):
+    """Rolling proctoring risk of an active test session."""
+    test_session_id: str
+    risk_score: float
+    events: int
+    last_event_type: Optional[str] = None
+    last_event_at: datetime
+    candidate_name: Optional[str] = None
+    candidate_email: Optional[str] = None
+    started_at: Optional[datetime] = None
+
+
 # ============ NOTIFICATION SCHEMAS ============
 
 class NotificationCreate(BaseModel):
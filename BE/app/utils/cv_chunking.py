@@ -0,0 +1,213 @@
+"""Section-aware chunking for LLM CV extraction.
+
+Long CVs are split along ``CVParser`` sections so each LLM call sees one
+focused slice (profile, experience, projects, skills) that fits the
+provider's input budget. Partial JSON results are merged deterministically.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from app.utils.cv_parser import CVParser
+
+# Rough chars-per-token ratio for English CV text.
+CHARS_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGET = 1000
+
+# Fields requested from each chunk kind; the full prompt asks for all of them.
+CHUNK_FIELDS: Dict[str, List[str]] = {
+    "profile": [
+        "candidate_name", "email", "phone", "location", "total_experience_years",
+        "current_role", "current_company", "education", "certifications", "achievements",
+        "domains_worked_in", "github_url", "linkedin_url", "portfolio_url", "potential_red_flags",
+    ],
+    "experience": [
+        "work_experience", "current_role", "current_company", "total_experience_years",
+        "domains_worked_in", "potential_red_flags",
+    ],
+    "projects": ["projects"],
+    "skills": ["primary_skills", "secondary_skills", "technical_skills", "soft_skills", "classified_skills"],
+}
+
+# Merge priority: for scalar fields the first non-empty value in this order wins.
+CHUNK_ORDER = ["experience", "profile", "projects", "skills", "full"]
+
+# Key used to de-duplicate list entries that are objects.
+ENTRY_KEYS = {
+    # Duration keeps separate stints at the same company and role apart
+    "work_experience": ("company", "role", "duration"),
+    "projects": ("project_name",),
+    "classified_skills": ("skill_name",),
+}
+
+SECTION_CHUNKS = {"experience": "experience", "projects": "projects", "skills": "skills"}
+
+
+@dataclass
+class CVChunk:
+    """One slice of a CV sent to the LLM as its own prompt."""
+    kind: str  # profile, experience, projects, skills, full
+    text: str
+    index: int = 0  # Position among chunks of the same kind
+
+
+def token_budget(provider: str) -> int:
+    """Input-token budget for document text for the given provider."""
+    from config import get_settings
+
+    budgets = get_settings().LLM_INPUT_TOKEN_BUDGETS
+    return budgets.get((provider or "").lower(), DEFAULT_TOKEN_BUDGET)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Truncate text to the budget, cutting at a line boundary when possible."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:_cut_index(text, max_chars)].rstrip()
+
+
+def _cut_index(text: str, max_chars: int) -> int:
+    """Last line break in the first half of the window, else the hard limit."""
+    cut = text.rfind("\n", 0, max_chars)
+    return cut if cut >= max_chars // 2 else max_chars
+
+
+def split_to_budget(text: str, max_tokens: int) -> List[str]:
+    """Split text into pieces within budget, keeping blank-line separated blocks whole."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in text.split("\n\n"):
+        block_len = len(block) + 2
+        if current and size + block_len > max_chars:
+            pieces.append("\n\n".join(current))
+            current, size = [], 0
+        while len(block) > max_chars:
+            # Advance by the raw cut: the stripped head can be shorter (or empty)
+            cut = _cut_index(block, max_chars)
+            head = block[:cut].rstrip()
+            if head:
+                pieces.append(head)
+            block = block[cut:].strip()
+        if block:
+            block_len = len(block) + 2
+            current.append(block)
+            size += block_len
+    if current:
+        pieces.append("\n\n".join(current))
+    return [p for p in pieces if p.strip()]
+
+
+def build_cv_chunks(cv_text: str, provider: str) -> List[CVChunk]:
+    """Split a CV into LLM-sized chunks along its sections.
+
+    Returns a single ``full`` chunk when the CV already fits the budget.
+    """
+    budget = token_budget(provider)
+    if estimate_tokens(cv_text) <= budget:
+        return [CVChunk(kind="full", text=cv_text)]
+
+    sections = CVParser(cv_text).parse()
+    chunks: List[CVChunk] = []
+    chunked_spans: List[Tuple[int, int]] = []
+
+    for section_name, kind in SECTION_CHUNKS.items():
+        section = sections.get(section_name)
+        if section is None:
+            continue
+        content = section.content
+        if not content.strip():
+            continue
+        chunked_spans.extend(section.spans)
+        for i, piece in enumerate(split_to_budget(content, budget)):
+            chunks.append(CVChunk(kind=kind, text=piece, index=i))
+
+    if not chunks:
+        # No recognizable sections: fall back to plain windows over the text.
+        return [
+            CVChunk(kind="full", text=piece, index=i)
+            for i, piece in enumerate(split_to_budget(cv_text, budget))
+        ]
+
+    # Profile is whatever lies outside the chunked sections
+    gaps, pos = [], 0
+    for start, end in sorted(chunked_spans):
+        gaps.append(cv_text[pos:start])
+        pos = max(pos, end)
+    gaps.append(cv_text[pos:])
+    profile_text = "".join(gaps).strip()
+    if profile_text:
+        # Split rather than truncate: contact details and education must not be cut
+        chunks[:0] = [
+            CVChunk(kind="profile", text=piece, index=i)
+            for i, piece in enumerate(split_to_budget(profile_text, budget))
+        ]
+    return chunks
+
+
+def _is_empty(value: Any) -> bool:
+    return value in (None, "", [], {}) or (isinstance(value, dict) and not any(value.values()))
+
+
+def _entry_key(field_name: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        keys = ENTRY_KEYS.get(field_name)
+        if keys:
+            return tuple(str(value.get(k, "")).strip().lower() for k in keys)
+        return tuple(sorted((k, str(v)) for k, v in value.items()))
+    return str(value).strip().lower()
+
+
+def merge_cv_results(partials: List[Tuple[CVChunk, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Merge per-chunk extraction results into one CV dict.
+
+    Deterministic regardless of completion order: chunks are ordered by
+    (CHUNK_ORDER, index); scalars take the first non-empty value, lists are
+    concatenated with de-duplication and dicts are merged key by key.
+    """
+    ordered = sorted(
+        (p for p in partials if p[1]),
+        key=lambda p: (CHUNK_ORDER.index(p[0].kind) if p[0].kind in CHUNK_ORDER else len(CHUNK_ORDER), p[0].index),
+    )
+    merged: Dict[str, Any] = {}
+    seen: Dict[str, set] = {}
+
+    for chunk, result in ordered:
+        allowed = CHUNK_FIELDS.get(chunk.kind)
+        for field_name, value in result.items():
+            if allowed is not None and field_name not in allowed:
+                continue
+            if _is_empty(value):
+                merged.setdefault(field_name, value)
+                continue
+            if isinstance(value, list):
+                bucket = merged.setdefault(field_name, [])
+                if not isinstance(bucket, list):
+                    continue
+                keys = seen.setdefault(field_name, {_entry_key(field_name, v) for v in bucket})
+                for item in value:
+                    key = _entry_key(field_name, item)
+                    if key not in keys:
+                        keys.add(key)
+                        bucket.append(item)
+            elif isinstance(value, dict):
+                current = merged.get(field_name)
+                if not isinstance(current, dict):
+                    current = {}
+                    merged[field_name] = current
+                for k, v in value.items():
+                    if _is_empty(current.get(k)):
+                        current[k] = v
+            elif _is_empty(merged.get(field_name)):
+                merged[field_name] = value
+
+    return merged
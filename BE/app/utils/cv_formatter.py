@@ -1,16 +1,33 @@
 """CV Formatter - Generate editable and professional CV documents (DOCX and PDF)."""
-from typing import Dict, List, Optional, Any
+import copy
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
 from io import BytesIO
 from datetime import datetime
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
 from docx.shared import Pt, RGBColor, Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+from config import get_settings
+
+settings = get_settings()
+
 
 class CVFormatter:
-    """Format CV data into professional DOCX documents."""
+    """Format CV data into professional DOCX documents.
+    
+    Margins, fonts, colours and rule lines live in paragraph styles of a
+    template built (or loaded from CV_DOCX_TEMPLATE_PATH) once per process;
+    each render deep-copies the template and only adds styled paragraphs.
+    """
     
     # Color scheme
     PRIMARY_COLOR = RGBColor(31, 78, 121)      # Dark blue
@@ -24,10 +41,68 @@ class CVFormatter:
     BODY_FONT_SIZE = 11
     SMALL_FONT_SIZE = 10
     
+    # Paragraph styles the template provides: name -> formatting
+    STYLES = {
+        'CV Name': {'size': NAME_FONT_SIZE, 'bold': True, 'color': PRIMARY_COLOR, 'align': WD_ALIGN_PARAGRAPH.CENTER},
+        'CV Contact': {'size': SMALL_FONT_SIZE, 'color': LIGHT_TEXT, 'align': WD_ALIGN_PARAGRAPH.CENTER},
+        'CV Rule': {'border': True},
+        'CV Section': {'size': SECTION_FONT_SIZE, 'bold': True, 'color': PRIMARY_COLOR, 'border': True},
+        'CV Body': {'size': BODY_FONT_SIZE, 'color': TEXT_COLOR},
+        'CV Body Justified': {'size': BODY_FONT_SIZE, 'color': TEXT_COLOR, 'align': WD_ALIGN_PARAGRAPH.JUSTIFY},
+        'CV Subtext': {'size': SMALL_FONT_SIZE, 'italic': True, 'color': LIGHT_TEXT, 'indent': 0.25},
+        'CV Bullet': {'base': 'List Bullet', 'size': BODY_FONT_SIZE, 'color': TEXT_COLOR, 'indent': 0.5},
+        'CV List': {'base': 'List Bullet', 'size': BODY_FONT_SIZE, 'color': TEXT_COLOR},
+    }
+    
+    _template: Optional[Document] = None
+    _style_ids: Dict[str, str] = {}
+    _template_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize CV formatter."""
         self.doc = None
     
+    @classmethod
+    def load_template(cls) -> Tuple[Document, Dict[str, str]]:
+        """Load (once per process) the pre-styled template and its style ids."""
+        if cls._template is None:
+            with cls._template_lock:
+                if cls._template is None:
+                    template = Document(settings.CV_DOCX_TEMPLATE_PATH) if settings.CV_DOCX_TEMPLATE_PATH else Document()
+                    cls._style_ids = cls._apply_template_styles(template)
+                    cls._template = template
+        return cls._template, cls._style_ids
+    
+    @classmethod
+    def _apply_template_styles(cls, doc: Document, top=1, bottom=1, left=0.75, right=0.75) -> Dict[str, str]:
+        """Set margins and add any CV styles the template does not define yet."""
+        for section in doc.sections:
+            section.top_margin = Inches(top)
+            section.bottom_margin = Inches(bottom)
+            section.left_margin = Inches(left)
+            section.right_margin = Inches(right)
+        
+        existing = {style.name: style for style in doc.styles if style.type == WD_STYLE_TYPE.PARAGRAPH}
+        style_ids = {}
+        for name, spec in cls.STYLES.items():
+            style = existing.get(name)
+            if style is None:
+                style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+                style.base_style = existing.get(spec.get('base', 'Normal'))
+                style.font.size = Pt(spec['size']) if 'size' in spec else None
+                style.font.bold = spec.get('bold')
+                style.font.italic = spec.get('italic')
+                if 'color' in spec:
+                    style.font.color.rgb = spec['color']
+                if 'align' in spec:
+                    style.paragraph_format.alignment = spec['align']
+                if 'indent' in spec:
+                    style.paragraph_format.left_indent = Inches(spec['indent'])
+                if spec.get('border'):
+                    cls._add_bottom_border(style.element.get_or_add_pPr())
+            style_ids[name] = style.style_id
+        return style_ids
+    
     def create_cv(self, cv_data: Dict[str, Any]) -> Document:
         """Create a professional DOCX CV document.
         
@@ -58,8 +133,8 @@ class CVFormatter:
         Returns:
             Document: The created Word document
         """
-        self.doc = Document()
-        self._set_document_margins()
+        template, self._styles = self.load_template()
+        self.doc = copy.deepcopy(template)
         
         # Add header
         self._add_header(cv_data)
@@ -86,24 +161,17 @@ class CVFormatter:
         
         return self.doc
     
-    def _set_document_margins(self, top=1, bottom=1, left=0.75, right=0.75):
-        """Set document margins in inches."""
-        sections = self.doc.sections
-        for section in sections:
-            section.top_margin = Inches(top)
-            section.bottom_margin = Inches(bottom)
-            section.left_margin = Inches(left)
-            section.right_margin = Inches(right)
+    def _add_paragraph(self, text: str = '', style: Optional[str] = None):
+        """Add a paragraph, setting the style id directly (no lookup by name)."""
+        para = self.doc.add_paragraph(text)
+        if style:
+            para._p.style = self._styles[style]
+        return para
     
     def _add_header(self, cv_data: Dict[str, str]):
         """Add CV header with name and contact information."""
         # Name
-        name_para = self.doc.add_paragraph()
-        name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        name_run = name_para.add_run(cv_data.get('name', 'Your Name'))
-        name_run.font.size = Pt(self.NAME_FONT_SIZE)
-        name_run.font.bold = True
-        name_run.font.color.rgb = self.PRIMARY_COLOR
+        self._add_paragraph(cv_data.get('name', 'Your Name'), 'CV Name')
         
         # Contact information
         contact_info = []
@@ -115,14 +183,10 @@ class CVFormatter:
             contact_info.append(cv_data['location'])
         
         if contact_info:
-            contact_para = self.doc.add_paragraph()
-            contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            contact_run = contact_para.add_run(' | '.join(contact_info))
-            contact_run.font.size = Pt(self.SMALL_FONT_SIZE)
-            contact_run.font.color.rgb = self.LIGHT_TEXT
+            self._add_paragraph(' | '.join(contact_info), 'CV Contact')
         
         # Add horizontal line
-        self._add_horizontal_line()
+        self._add_paragraph(style='CV Rule')
         
         # Add spacing
         self.doc.add_paragraph()
@@ -130,9 +194,7 @@ class CVFormatter:
     def _add_summary(self, summary: str):
         """Add professional summary section."""
         self._add_section_title('PROFESSIONAL SUMMARY')
-        summary_para = self.doc.add_paragraph(summary)
-        summary_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        self._format_body_text(summary_para)
+        self._add_paragraph(summary, 'CV Body Justified')
         self.doc.add_paragraph()
     
     def _add_experience_section(self, experience: List[Dict[str, str]]):
@@ -140,34 +202,22 @@ class CVFormatter:
         self._add_section_title('PROFESSIONAL EXPERIENCE')
         
         for i, job in enumerate(experience):
-            # Job title and company
-            job_para = self.doc.add_paragraph()
-            
             # Company and role
-            company_run = job_para.add_run(f"{job.get('company', 'Company')}")
-            company_run.font.bold = True
-            company_run.font.size = Pt(self.BODY_FONT_SIZE)
-            company_run.font.color.rgb = self.TEXT_COLOR
+            job_para = self._add_paragraph(style='CV Body')
+            job_para.add_run(f"{job.get('company', 'Company')}").bold = True
             
             # Role in separate line if available
             if job.get('role'):
                 job_para.add_run('\n')
-                role_run = job_para.add_run(f"{job.get('role', '')}")
-                role_run.font.italic = True
-                role_run.font.size = Pt(self.BODY_FONT_SIZE)
-                role_run.font.color.rgb = self.TEXT_COLOR
+                job_para.add_run(f"{job.get('role', '')}").italic = True
             
             # Dates
             if job.get('dates'):
-                dates_para = self.doc.add_paragraph(job.get('dates', ''))
-                dates_para.paragraph_format.left_indent = Inches(0.25)
-                self._format_subtext(dates_para)
+                self._add_paragraph(job.get('dates', ''), 'CV Subtext')
             
             # Description
             if job.get('description'):
-                desc_para = self.doc.add_paragraph(job.get('description', ''), style='List Bullet')
-                desc_para.paragraph_format.left_indent = Inches(0.5)
-                self._format_body_text(desc_para)
+                self._add_paragraph(job.get('description', ''), 'CV Bullet')
             
             # Spacing between entries
             if i < len(experience) - 1:
@@ -181,24 +231,16 @@ class CVFormatter:
         
         for i, edu in enumerate(education):
             # Degree and institution
-            edu_para = self.doc.add_paragraph()
-            
-            degree_run = edu_para.add_run(f"{edu.get('degree', 'Degree')}")
-            degree_run.font.bold = True
-            degree_run.font.size = Pt(self.BODY_FONT_SIZE)
-            degree_run.font.color.rgb = self.TEXT_COLOR
+            edu_para = self._add_paragraph(style='CV Body')
+            edu_para.add_run(f"{edu.get('degree', 'Degree')}").bold = True
             
             if edu.get('institution'):
                 edu_para.add_run('\n')
-                inst_run = edu_para.add_run(f"{edu.get('institution', '')}")
-                inst_run.font.size = Pt(self.BODY_FONT_SIZE)
-                inst_run.font.color.rgb = self.TEXT_COLOR
+                edu_para.add_run(f"{edu.get('institution', '')}")
             
             # Year
             if edu.get('year'):
-                year_para = self.doc.add_paragraph(edu.get('year', ''))
-                year_para.paragraph_format.left_indent = Inches(0.25)
-                self._format_subtext(year_para)
+                self._add_paragraph(edu.get('year', ''), 'CV Subtext')
             
             # Spacing between entries
             if i < len(education) - 1:
@@ -209,13 +251,7 @@ class CVFormatter:
     def _add_skills_section(self, skills: List[str]):
         """Add skills section."""
         self._add_section_title('TECHNICAL SKILLS')
-        
-        # Group skills for better presentation
-        skills_str = ', '.join(skills)
-        skills_para = self.doc.add_paragraph(skills_str)
-        skills_para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        self._format_body_text(skills_para)
-        
+        self._add_paragraph(', '.join(skills), 'CV Body Justified')
         self.doc.add_paragraph()
     
     def _add_certifications_section(self, certifications: List[str]):
@@ -223,8 +259,7 @@ class CVFormatter:
         self._add_section_title('CERTIFICATIONS & LICENSES')
         
         for cert in certifications:
-            cert_para = self.doc.add_paragraph(cert, style='List Bullet')
-            self._format_body_text(cert_para)
+            self._add_paragraph(cert, 'CV List')
         
         self.doc.add_paragraph()
     
@@ -234,17 +269,12 @@ class CVFormatter:
         
         for i, project in enumerate(projects):
             # Project name
-            proj_para = self.doc.add_paragraph()
-            proj_run = proj_para.add_run(f"{project.get('project', 'Project')}")
-            proj_run.font.bold = True
-            proj_run.font.size = Pt(self.BODY_FONT_SIZE)
-            proj_run.font.color.rgb = self.TEXT_COLOR
+            proj_para = self._add_paragraph(style='CV Body')
+            proj_para.add_run(f"{project.get('project', 'Project')}").bold = True
             
             # Description
             if project.get('description'):
-                desc_para = self.doc.add_paragraph(project.get('description', ''), style='List Bullet')
-                desc_para.paragraph_format.left_indent = Inches(0.5)
-                self._format_body_text(desc_para)
+                self._add_paragraph(project.get('description', ''), 'CV Bullet')
             
             # Spacing between entries
             if i < len(projects) - 1:
@@ -254,51 +284,21 @@ class CVFormatter:
     
     def _add_section_title(self, title: str):
         """Add a section title with formatting."""
-        title_para = self.doc.add_paragraph()
-        title_run = title_para.add_run(title)
-        title_run.font.size = Pt(self.SECTION_FONT_SIZE)
-        title_run.font.bold = True
-        title_run.font.color.rgb = self.PRIMARY_COLOR
-        
-        # Add underline
-        pPr = title_para._element.get_or_add_pPr()
-        pBdr = OxmlElement('w:pBdr')
-        bottom = OxmlElement('w:bottom')
-        bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), '12')  # Border size
-        bottom.set(qn('w:space'), '1')
-        bottom.set(qn('w:color'), self._rgb_to_hex(self.PRIMARY_COLOR))
-        pBdr.append(bottom)
-        pPr.append(pBdr)
-        
+        self._add_paragraph(title, 'CV Section')
         self.doc.add_paragraph()
     
-    def _add_horizontal_line(self):
-        """Add a horizontal line separator."""
-        para = self.doc.add_paragraph()
-        pPr = para._element.get_or_add_pPr()
+    @classmethod
+    def _add_bottom_border(cls, pPr):
+        """Append a bottom rule to a paragraph (or paragraph style) pPr."""
         pBdr = OxmlElement('w:pBdr')
         bottom = OxmlElement('w:bottom')
         bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), '12')
+        bottom.set(qn('w:sz'), '12')  # Border size
         bottom.set(qn('w:space'), '1')
-        bottom.set(qn('w:color'), self._rgb_to_hex(self.PRIMARY_COLOR))
+        bottom.set(qn('w:color'), cls._rgb_to_hex(cls.PRIMARY_COLOR))
         pBdr.append(bottom)
         pPr.append(pBdr)
     
-    def _format_body_text(self, paragraph):
-        """Apply formatting to body text."""
-        for run in paragraph.runs:
-            run.font.size = Pt(self.BODY_FONT_SIZE)
-            run.font.color.rgb = self.TEXT_COLOR
-    
-    def _format_subtext(self, paragraph):
-        """Apply formatting to subtext (dates, etc)."""
-        for run in paragraph.runs:
-            run.font.size = Pt(self.SMALL_FONT_SIZE)
-            run.font.italic = True
-            run.font.color.rgb = self.LIGHT_TEXT
-    
     @staticmethod
     def _rgb_to_hex(rgb: RGBColor) -> str:
         """Convert RGBColor to hex string."""
@@ -332,6 +332,110 @@ class CVFormatter:
         raise ValueError("No document to save. Create a CV first.")
 
 
+def render_cv_docx(cv_data: Dict[str, Any]) -> bytes:
+    """Render one CV to DOCX bytes using the cached template."""
+    formatter = CVFormatter()
+    formatter.create_cv(cv_data)
+    return formatter.save_to_bytes().getvalue()
+
+
+def _render_named(item: Tuple[str, Dict[str, Any]]) -> Tuple[str, bytes]:
+    name, cv_data = item
+    return name, render_cv_docx(cv_data)
+
+
+def _warm_worker() -> None:
+    CVFormatter.load_template()
+
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Process pool for batch rendering; each worker loads the template once."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.CV_RENDER_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+    return _render_pool
+
+
+def close_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+def render_cv_batch(items: Iterable[Tuple[str, Dict[str, Any]]], workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """Render (name, cv_data) pairs to (name, docx bytes), preserving order.
+    
+    Uses the shared process pool unless ``workers`` is 0/1 or
+    CV_RENDER_WORKERS is 1, in which case rendering stays in-process.
+    """
+    workers = settings.CV_RENDER_WORKERS if workers is None else workers
+    if workers <= 1:
+        for item in items:
+            yield _render_named(item)
+        return
+    yield from get_render_pool().map(_render_named, items, chunksize=4)
+
+
+class _ZipStream:
+    """Write-only buffer zipfile can stream into; drained after each member."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+# Characters kept in zip member names; everything else becomes "_"
+_UNSAFE_ZIP_NAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def safe_zip_name(name: str) -> str:
+    """Member name without directories or unusual characters (no zip-slip on extract)."""
+    base = os.path.basename(name.replace('\\', '/'))
+    base = _UNSAFE_ZIP_NAME_RE.sub('_', base).strip('._')
+    return base or 'cv'
+
+
+def iter_docx_zip(rendered: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Stream rendered documents as a zip archive, one chunk per document."""
+    stream = _ZipStream()
+    emitted: Set[str] = set()
+    with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in rendered:
+            name = safe_zip_name(name)
+            base = name[:-5] if name.lower().endswith('.docx') else name
+            filename, count = f"{base}.docx", 0
+            # Compare against every name written so far ("a", "a", "a_1" must not collide)
+            while filename.lower() in emitted:
+                count += 1
+                filename = f"{base}_{count}.docx"
+            emitted.add(filename.lower())
+            archive.writestr(filename, data)
+            yield stream.drain()
+    yield stream.drain()
+
+
 def format_cv_from_parsed_sections(cv_text: str, cv_data: Optional[Dict[str, Any]] = None) -> Document:
     """Format a CV from parsed sections or raw data.
     
@@ -1,17 +1,158 @@
 """CV Parser - Parse and structure CV sections for flexible                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                      editing."""
-from typing import Dict, List, Optional, Tuple
+from collections.abc import Mapping
+from io import StringIO
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
-from dataclasses import dataclass
 
 
-@dataclass
+# Header-like lines: short, optionally bulleted/markdown-prefixed
+HEADER_MAX_LENGTH = 60
+HEADER_MAX_WORDS = 6
+HEADER_CONNECTORS = {'and', 'of', '&', '/', '-', 'in', 'for'}
+HEADER_STRIP_CHARS = '#*-•=_|: \t'
+
+# Stripped content of one line / one comma-separated skill
+_LINE_CONTENT_RE = re.compile(r'\S(?:[^\n]*\S)?')
+_SKILL_RE = re.compile(r'[^\s,;](?:[^,;\n]*[^\s,;])?')
+_YEAR_RE = re.compile(r'\d{4}')
+_ROLE_RE = re.compile(r'engineer|developer|manager|designer|analyst', re.IGNORECASE)
+
+Span = Tuple[int, int]
+
+
+def _compile_header_pattern(section_patterns: Dict[str, List[str]]) -> 're.Pattern':
+    """Combine all section patterns into one regex with a named group per section."""
+    groups = [
+        f"(?P<{section_type}>" + '|'.join(rf'\b{pattern}\b' for pattern in patterns) + ')'
+        for section_type, patterns in section_patterns.items()
+    ]
+    return re.compile('|'.join(groups))
+
+
+def _header_words(line: str) -> List[str]:
+    """Words of a short line without bullet/markdown decoration; [] if too long."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > HEADER_MAX_LENGTH:
+        return []
+    words = stripped.strip(HEADER_STRIP_CHARS).split()
+    return words if len(words) <= HEADER_MAX_WORDS else []
+
+
+def is_header_like(line: str) -> bool:
+    """Short line that is upper case or ends with a colon."""
+    words = _header_words(line)
+    return bool(words) and (line.strip().endswith(':') or ' '.join(words).isupper())
+
+
+def is_title_like(line: str) -> bool:
+    """Short Title Case line; a header only if it ends with a section keyword."""
+    words = _header_words(line)
+    return bool(words) and all(
+        word[0].isupper() or not word[0].isalpha() or word.lower() in HEADER_CONNECTORS
+        for word in words
+    )
+
+
+def iter_line_spans(text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+    """Yield (line_end, content_start, content_end) for each line in text[start:end].
+
+    Content offsets exclude surrounding whitespace; blank lines yield
+    content_start == content_end. No line strings are created.
+    """
+    end = len(text) if end is None else end
+    pos = start
+    while pos < end:
+        line_end = text.find('\n', pos, end)
+        if line_end == -1:
+            line_end = end
+        match = _LINE_CONTENT_RE.search(text, pos, line_end)
+        if match:
+            yield line_end, match.start(), match.end()
+        else:
+            yield line_end, line_end, line_end
+        pos = line_end + 1
+
+
+def _rstrip_offset(text: str, start: int, end: int) -> int:
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
+
+
+class CVItem(Mapping):
+    """A section item stored as offsets into the CV text.
+
+    Behaves like the read-only dict the parser used to build: each field is
+    a list of line spans joined with newlines (or a plain constant), and
+    ``content`` is the item's contiguous span. Values are sliced on access.
+    """
+    __slots__ = ('_text', 'start', 'end', '_fields')
+
+    def __init__(self, text: str, start: int, end: int, fields: Dict[str, Any]):
+        self._text = text
+        self.start = start
+        self.end = end
+        self._fields = fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'content':
+            return self._text[self.start:self.end]
+        value = self._fields[key]
+        if isinstance(value, list):
+            return '\n'.join(self._text[s:e] for s, e in value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield 'content'
+
+    def __len__(self) -> int:
+        return len(self._fields) + 1
+
+    def __repr__(self) -> str:
+        return f"CVItem({dict(self)!r})"
+
+
 class CVSection:
-    """Represents a section of a CV."""
-    name: str
-    title: str
-    content: str
-    items: List[Dict[str, str]] = None
-    include: bool = True
+    """Represents a section of a CV as spans of the original text."""
+    __slots__ = ('name', '_text', 'spans', 'header_ends', 'items', 'include')
+
+    def __init__(self, name: str, text: str, spans: List[Span], header_ends: List[int],
+                 items: Optional[List[CVItem]] = None, include: bool = True):
+        self.name = name
+        self._text = text
+        self.spans = spans  # (start, end) per header occurrence, whitespace-trimmed
+        self.header_ends = header_ends  # Offset of each header line's end
+        self.items = items if items is not None else []
+        self.include = include
+
+    @property
+    def title(self) -> str:
+        start = self.spans[0][0]
+        return self._text[start:_rstrip_offset(self._text, start, self.header_ends[0])]
+
+    @property
+    def content(self) -> str:
+        if len(self.spans) == 1:
+            start, end = self.spans[0]
+            return self._text[start:end]
+        return '\n\n'.join(self._text[start:end] for start, end in self.spans)
+
+    def titles(self) -> Iterator[Tuple[str, Span]]:
+        """(header line, full span) for each header occurrence of the section."""
+        for (start, end), header_end in zip(self.spans, self.header_ends):
+            yield self._text[start:_rstrip_offset(self._text, start, header_end)], (start, end)
+
+    def body_spans(self) -> Iterator[Span]:
+        """Spans after each header line, up to the end of the section."""
+        for (_, end), header_end in zip(self.spans, self.header_ends):
+            yield min(header_end + 1, end), end
+
+    @property
+    def body(self) -> str:
+        return '\n\n'.join(
+            self._text[start:end].strip() for start, end in self.body_spans() if start < end
+        ).strip()
 
 
 class CVParser:
@@ -29,11 +170,20 @@ class CVParser:
         'languages': [r'languages', r'language\s+proficiency'],
     }
     
+    # All section patterns as one alternation, compiled once at class load
+    HEADER_RE = _compile_header_pattern(SECTION_PATTERNS)
+    # Title Case lines must end with the keyword: "Work Experience", not "University of Michigan"
+    TITLE_HEADER_RE = re.compile(f"(?:{HEADER_RE.pattern})$")
+    
     def __init__(self, cv_text: str):
         """Initialize parser with CV text."""
         self.cv_text = cv_text
-        self.lines = cv_text.split('\n')
         self.sections: Dict[str, CVSection] = {}
+        self.section_spans: List[Tuple[str, int, int]] = []
+    
+    @property
+    def lines(self) -> List[str]:
+        return self.cv_text.split('\n')
     
     def parse(self) -> Dict[str, CVSection]:
         """Parse CV and return structured sections."""
@@ -41,40 +191,60 @@ class CVParser:
         self._extract_section_items()
         return self.sections
     
-    def _identify_sections(self) -> None:
-        """Identify and extract sections from CV."""
-        section_starts = {}
+    @classmethod
+    def classify_header(cls, line: str) -> Optional[str]:
+        """Return the section type for a header line, or None."""
+        text = line.strip().strip(HEADER_STRIP_CHARS).lower()
+        if is_header_like(line):
+            match = cls.HEADER_RE.search(text)
+        elif is_title_like(line):
+            match = cls.TITLE_HEADER_RE.search(text)
+        else:
+            return None
+        return match.lastgroup if match else None
+    
+    @classmethod
+    def find_section_spans(cls, text: str) -> List[Tuple[str, int, int]]:
+        """Ordered (section_type, start, end) character spans, one per header line.
         
-        for line_idx, line in enumerate(self.lines):
-            line_lower = line.lower().strip()
-            
-            # Skip empty lines
-            if not line_lower:
+        A span starts at its header line and runs to the next header (or the
+        end of the text), trimmed of surrounding whitespace.
+        """
+        starts = []
+        for line_end, start, end in iter_line_spans(text):
+            if start == end or end - start > HEADER_MAX_LENGTH:
                 continue
-            
-            # Check for section headers
-            for section_type, patterns in self.SECTION_PATTERNS.items():
-                for pattern in patterns:
-                    if re.search(r'\b' + pattern + r'\b', line_lower):
-                        section_starts[section_type] = line_idx
-                        break
+            section_type = cls.classify_header(text[start:end])
+            if section_type:
+                starts.append((section_type, start))
         
-        # Extract section content
-        sorted_sections = sorted(section_starts.items(), key=lambda x: x[1])
+        spans = []
+        for i, (section_type, start) in enumerate(starts):
+            end = starts[i + 1][1] if i + 1 < len(starts) else len(text)
+            spans.append((section_type, start, _rstrip_offset(text, start, end)))
+        return spans
+    
+    def _identify_sections(self) -> None:
+        """Identify sections from CV as offsets into the text."""
+        text = self.cv_text
+        self.section_spans = self.find_section_spans(text)
         
-        for i, (section_type, start_line) in enumerate(sorted_sections):
-            # Find end line (start of next section or end of file)
-            end_line = sorted_sections[i+1][1] if i+1 < len(sorted_sections) else len(self.lines)
+        for section_type, start, end in self.section_spans:
+            header_end = text.find('\n', start, end)
+            header_end = end if header_end == -1 else header_end
             
-            # Extract section content
-            section_content = '\n'.join(self.lines[start_line:end_line]).strip()
+            existing = self.sections.get(section_type)
+            if existing is not None:
+                # Repeated header of the same type continues that section
+                existing.spans.append((start, end))
+                existing.header_ends.append(header_end)
+                continue
             
             self.sections[section_type] = CVSection(
                 name=section_type,
-                title=self.lines[start_line].strip(),
-                content=section_content,
-                items=[],
-                include=True
+                text=text,
+                spans=[(start, end)],
+                header_ends=[header_end],
             )
     
     def _extract_section_items(self) -> None:
@@ -89,113 +259,80 @@ class CVParser:
             elif section_type == 'projects':
                 self._extract_projects_items(section)
     
+    def _iter_entries(self, section: CVSection) -> Iterator[List[Span]]:
+        """Blank-line separated entries of a section body as lists of line spans."""
+        for body_start, body_end in section.body_spans():
+            entry: List[Span] = []
+            for _, start, end in iter_line_spans(self.cv_text, body_start, body_end):
+                if start == end:
+                    if entry:
+                        yield entry
+                        entry = []
+                    continue
+                entry.append((start, end))
+            if entry:
+                yield entry
+    
     def _extract_experience_items(self, section: CVSection) -> None:
         """Extract experience entries (companies and roles)."""
-        lines = section.content.split('\n')[1:]  # Skip header
-        
-        current_entry = None
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_entry:
-                    section.items.append(current_entry)
-                    current_entry = None
-                continue
-            
-            # Look for company/role indicators
-            if current_entry is None:
-                current_entry = {
-                    'company': line,
-                    'role': '',
-                    'dates': '',
-                    'description': '',
-                    'content': line
-                }
-            else:
-                if not current_entry['role'] and any(role in line.lower() for role in ['engineer', 'developer', 'manager', 'designer', 'analyst']):
-                    current_entry['role'] = line
-                elif re.search(r'\d{4}', line):
-                    current_entry['dates'] = line
+        text = self.cv_text
+        for entry in self._iter_entries(section):
+            role: List[Span] = []
+            dates: List[Span] = []
+            description: List[Span] = []
+            for start, end in entry[1:]:
+                if not role and _ROLE_RE.search(text, start, end):
+                    role = [(start, end)]
+                elif _YEAR_RE.search(text, start, end):
+                    dates = [(start, end)]
                 else:
-                    current_entry['description'] += '\n' + line if current_entry['description'] else line
-                current_entry['content'] += '\n' + line
-        
-        if current_entry:
-            section.items.append(current_entry)
+                    description.append((start, end))
+            section.items.append(CVItem(text, entry[0][0], entry[-1][1], {
+                'company': [entry[0]],
+                'role': role,
+                'dates': dates,
+                'description': description,
+            }))
     
     def _extract_education_items(self, section: CVSection) -> None:
         """Extract education entries."""
-        lines = section.content.split('\n')[1:]  # Skip header
-        
-        current_entry = None
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_entry:
-                    section.items.append(current_entry)
-                    current_entry = None
-                continue
-            
-            if current_entry is None:
-                current_entry = {
-                    'degree': line,
-                    'institution': '',
-                    'year': '',
-                    'content': line
-                }
-            else:
-                if re.search(r'\d{4}', line):
-                    current_entry['year'] = line
-                elif not current_entry['institution']:
-                    current_entry['institution'] = line
-                current_entry['content'] += '\n' + line
-        
-        if current_entry:
-            section.items.append(current_entry)
+        text = self.cv_text
+        for entry in self._iter_entries(section):
+            institution: List[Span] = []
+            year: List[Span] = []
+            for start, end in entry[1:]:
+                if _YEAR_RE.search(text, start, end):
+                    year = [(start, end)]
+                elif not institution:
+                    institution = [(start, end)]
+            section.items.append(CVItem(text, entry[0][0], entry[-1][1], {
+                'degree': [entry[0]],
+                'institution': institution,
+                'year': year,
+            }))
     
     def _extract_skills_items(self, section: CVSection) -> None:
         """Extract individual skills."""
-        lines = section.content.split('\n')[1:]  # Skip header
-        
-        for line in lines:
-            line = line.strip()
-            if line and not line.isupper():
+        text = self.cv_text
+        for body_start, body_end in section.body_spans():
+            for _, start, end in iter_line_spans(text, body_start, body_end):
+                if start == end or text[start:end].isupper():
+                    continue
                 # Split by comma or semicolon
-                skills = re.split(r'[,;]', line)
-                for skill in skills:
-                    skill = skill.strip()
-                    if skill:
-                        section.items.append({
-                            'skill': skill,
-                            'content': skill,
-                            'include': True
-                        })
+                for match in _SKILL_RE.finditer(text, start, end):
+                    section.items.append(CVItem(text, match.start(), match.end(), {
+                        'skill': [match.span()],
+                        'include': True,
+                    }))
     
     def _extract_projects_items(self, section: CVSection) -> None:
         """Extract project entries."""
-        lines = section.content.split('\n')[1:]  # Skip header
-        
-        current_entry = None
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_entry:
-                    section.items.append(current_entry)
-                    current_entry = None
-                continue
-            
-            if current_entry is None:
-                current_entry = {
-                    'project': line,
-                    'description': '',
-                    'content': line
-                }
-            else:
-                current_entry['description'] += '\n' + line if current_entry['description'] else line
-                current_entry['content'] += '\n' + line
-        
-        if current_entry:
-            section.items.append(current_entry)
+        text = self.cv_text
+        for entry in self._iter_entries(section):
+            section.items.append(CVItem(text, entry[0][0], entry[-1][1], {
+                'project': [entry[0]],
+                'description': entry[1:],
+            }))
     
     def rebuild_cv(self, sections_config: Dict[str, Dict]) -> str:
         """Rebuild CV based on section configuration.
@@ -207,7 +344,8 @@ class CVParser:
                 ...
             }
         """
-        rebuilt_lines = []
+        text = self.cv_text
+        out = StringIO()
         
         for section_type in ['summary', 'contact', 'experience', 'education', 'skills', 'certifications', 'projects', 'languages']:
             if section_type not in self.sections:
@@ -220,28 +358,35 @@ class CVParser:
             if not config.get('include', True):
                 continue
             
-            # Add section header
-            rebuilt_lines.append(section.title)
-            rebuilt_lines.append('')
-            
-            # Add section items (filtered)
-            exclude_items = config.get('exclude_items', [])
-            
-            if not section.items:
-                # No structured items, use raw content
-                rebuilt_lines.append(section.content.split('\n', 1)[1].strip())
-            else:
-                for item in section.items:
-                    # Check if item should be excluded
-                    if any(exclude_key in str(item.get('content', '')).lower() for exclude_key in exclude_items):
-                        continue
-                    
-                    rebuilt_lines.append(item.get('content', ''))
-                    rebuilt_lines.append('')
+            exclude_items = [key.lower() for key in config.get('exclude_items', [])]
             
-            rebuilt_lines.append('\n')
+            # A section merged from repeated headers keeps every header with its own items
+            for (title, (span_start, span_end)), (body_start, body_end) in zip(section.titles(), section.body_spans()):
+                out.write(title)
+                out.write('\n\n')
+                
+                if not section.items:
+                    # No structured items, use raw content
+                    body = text[body_start:body_end].strip()
+                    if body:
+                        out.write(body)
+                        out.write('\n')
+                else:
+                    for item in section.items:
+                        if not span_start <= item.start < span_end:
+                            continue
+                        # Check if item should be excluded
+                        if exclude_items:
+                            content = item['content'].lower()
+                            if any(exclude_key in content for exclude_key in exclude_items):
+                                continue
+                        
+                        out.write(text[item.start:item.end])
+                        out.write('\n\n')
+                
+                out.write('\n\n')
         
-        return '\n'.join(rebuilt_lines).strip()
+        return out.getvalue().strip()
     
     def get_summary(self) -> Dict[str, any]:
         """Get summary of CV structure for UI display."""
@@ -0,0 +1,269 @@
+"""CV Renderer - Render structured cv_data to DOCX, PDF or HTML with an S3 artifact cache.
+
+All formats take the same ``cv_data`` dictionary as ``CVFormatter.create_cv``
+and share its colours, fonts and section order. Rendered artifacts are stored
+under a content hash of (cv_data, template version, format), so repeat
+previews and downloads are served from S3 through presigned URLs instead of
+being rendered again.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from html import escape
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.utils.cv_formatter import CVFormatter, render_cv_docx
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# format -> (media type, file extension)
+RENDER_FORMATS: Dict[str, Tuple[str, str]] = {
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "pdf": ("application/pdf", "pdf"),
+    "html": ("text/html; charset=utf-8", "html"),
+}
+
+
+class RendererUnavailableError(RuntimeError):
+    """The optional dependency needed for a format is not installed."""
+
+
+def _hex(rgb) -> str:
+    return "#" + CVFormatter._rgb_to_hex(rgb)
+
+
+def _text(value: Any, default: str = "") -> str:
+    """Display text for a cv_data value; LLM-extracted fields are often null."""
+    return str(value) if value not in (None, "") else default
+
+
+def _blocks(cv_data: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Sections of a CV in render order as (title, content) pairs."""
+    blocks = []
+    if cv_data.get("summary"):
+        blocks.append(("PROFESSIONAL SUMMARY", _text(cv_data["summary"])))
+    if cv_data.get("experience"):
+        blocks.append(("PROFESSIONAL EXPERIENCE", [
+            (_text(job.get("company"), "Company"), _text(job.get("role")), _text(job.get("dates")),
+             _text(job.get("description")))
+            for job in cv_data["experience"] if job
+        ]))
+    if cv_data.get("education"):
+        blocks.append(("EDUCATION", [
+            (_text(edu.get("degree"), "Degree"), _text(edu.get("institution")), _text(edu.get("year")), "")
+            for edu in cv_data["education"] if edu
+        ]))
+    if cv_data.get("skills"):
+        blocks.append(("TECHNICAL SKILLS", ", ".join(_text(skill) for skill in cv_data["skills"] if skill)))
+    if cv_data.get("certifications"):
+        blocks.append(("CERTIFICATIONS & LICENSES", [(_text(cert), "", "", "") for cert in cv_data["certifications"] if cert]))
+    if cv_data.get("projects"):
+        blocks.append(("PROJECTS", [
+            (_text(project.get("project"), "Project"), "", "", _text(project.get("description")))
+            for project in cv_data["projects"] if project
+        ]))
+    return blocks
+
+
+def _contact_line(cv_data: Dict[str, Any]) -> str:
+    return " | ".join(_text(cv_data[key]) for key in ("email", "phone", "location") if cv_data.get(key))
+
+
+def render_cv_html(cv_data: Dict[str, Any]) -> bytes:
+    """Render a standalone HTML page for previews."""
+    primary, text, light = _hex(CVFormatter.PRIMARY_COLOR), _hex(CVFormatter.TEXT_COLOR), _hex(CVFormatter.LIGHT_TEXT)
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">",
+        f"<title>{escape(_text(cv_data.get('name'), 'CV'))}</title><style>",
+        f"body{{font-family:Calibri,Arial,sans-serif;color:{text};max-width:800px;margin:40px auto;font-size:11pt}}",
+        f"h1{{color:{primary};text-align:center;font-size:18pt;margin-bottom:4px}}",
+        f".contact{{color:{light};text-align:center;font-size:10pt;border-bottom:2px solid {primary};padding-bottom:8px}}",
+        f"h2{{color:{primary};font-size:12pt;border-bottom:2px solid {primary};margin-top:24px}}",
+        f".sub{{color:{light};font-style:italic;font-size:10pt;margin-left:18px}}",
+        ".entry{margin-bottom:12px}p{text-align:justify}",
+        "</style></head><body>",
+        f"<h1>{escape(_text(cv_data.get('name'), 'Your Name'))}</h1>",
+    ]
+    contact = _contact_line(cv_data)
+    if contact:
+        parts.append(f"<div class=\"contact\">{escape(contact)}</div>")
+
+    for title, content in _blocks(cv_data):
+        parts.append(f"<h2>{escape(title)}</h2>")
+        if isinstance(content, str):
+            parts.append(f"<p>{escape(content)}</p>")
+            continue
+        for heading, subheading, dates, description in content:
+            parts.append(f"<div class=\"entry\"><strong>{escape(heading)}</strong>")
+            if subheading:
+                parts.append(f"<br><em>{escape(subheading)}</em>")
+            if dates:
+                parts.append(f"<div class=\"sub\">{escape(dates)}</div>")
+            if description:
+                parts.append(f"<ul><li>{escape(description)}</li></ul>")
+            parts.append("</div>")
+
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def render_cv_pdf(cv_data: Dict[str, Any]) -> bytes:
+    """Render a PDF with reportlab (optional dependency)."""
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import HRFlowable, ListFlowable, Paragraph, SimpleDocTemplate, Spacer
+    except ImportError as e:
+        raise RendererUnavailableError("PDF rendering requires reportlab") from e
+
+    primary = colors.HexColor(_hex(CVFormatter.PRIMARY_COLOR))
+    text = colors.HexColor(_hex(CVFormatter.TEXT_COLOR))
+    light = colors.HexColor(_hex(CVFormatter.LIGHT_TEXT))
+    styles = {
+        "name": ParagraphStyle("name", fontName="Helvetica-Bold", fontSize=CVFormatter.NAME_FONT_SIZE,
+                               leading=22, textColor=primary, alignment=TA_CENTER),
+        "contact": ParagraphStyle("contact", fontSize=CVFormatter.SMALL_FONT_SIZE, textColor=light, alignment=TA_CENTER),
+        "section": ParagraphStyle("section", fontName="Helvetica-Bold", fontSize=CVFormatter.SECTION_FONT_SIZE,
+                                  textColor=primary, spaceBefore=12),
+        "body": ParagraphStyle("body", fontSize=CVFormatter.BODY_FONT_SIZE, leading=14, textColor=text, alignment=TA_JUSTIFY),
+        "sub": ParagraphStyle("sub", fontName="Helvetica-Oblique", fontSize=CVFormatter.SMALL_FONT_SIZE,
+                              textColor=light, leftIndent=0.25 * inch),
+    }
+
+    story = [Paragraph(escape(_text(cv_data.get("name"), "Your Name")), styles["name"])]
+    contact = _contact_line(cv_data)
+    if contact:
+        story.append(Paragraph(escape(contact), styles["contact"]))
+    story.append(HRFlowable(width="100%", thickness=1.5, color=primary))
+
+    for title, content in _blocks(cv_data):
+        story.append(Paragraph(escape(title), styles["section"]))
+        story.append(HRFlowable(width="100%", thickness=1.5, color=primary, spaceAfter=6))
+        if isinstance(content, str):
+            story.append(Paragraph(escape(content), styles["body"]))
+            continue
+        for heading, subheading, dates, description in content:
+            line = f"<b>{escape(heading)}</b>"
+            if subheading:
+                line += f"<br/><i>{escape(subheading)}</i>"
+            story.append(Paragraph(line, styles["body"]))
+            if dates:
+                story.append(Paragraph(escape(dates), styles["sub"]))
+            if description:
+                story.append(ListFlowable(
+                    [Paragraph(escape(description), styles["body"])],
+                    bulletType="bullet", leftIndent=0.5 * inch,
+                ))
+            story.append(Spacer(1, 6))
+
+    buffer = BytesIO()
+    SimpleDocTemplate(
+        buffer, pagesize=A4,
+        topMargin=inch, bottomMargin=inch, leftMargin=0.75 * inch, rightMargin=0.75 * inch,
+        title=_text(cv_data.get("name"), "CV"),
+    ).build(story)
+    return buffer.getvalue()
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "docx": render_cv_docx,
+    "pdf": render_cv_pdf,
+    "html": render_cv_html,
+}
+
+
+def render_cv(cv_data: Dict[str, Any], fmt: str = "docx") -> bytes:
+    """Render cv_data in the requested format."""
+    renderer = RENDERERS.get(fmt)
+    if renderer is None:
+        raise ValueError(f"Unsupported format: {fmt}. Use one of {', '.join(RENDERERS)}")
+    return renderer(cv_data)
+
+
+def artifact_key(cv_data: Dict[str, Any], fmt: str) -> str:
+    """S3 key from a hash of the canonical input, template version and format."""
+    canonical = json.dumps(cv_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    digest = hashlib.sha256(
+        f"{settings.CV_TEMPLATE_VERSION}\x00{fmt}\x00{canonical}".encode("utf-8")
+    ).hexdigest()
+    return f"{settings.CV_ARTIFACT_PREFIX}/v{settings.CV_TEMPLATE_VERSION}/{fmt}/{digest}.{RENDER_FORMATS[fmt][1]}"
+
+
+class CVArtifactCache:
+    """Render-once cache of CV artifacts in S3, served through presigned URLs."""
+
+    def __init__(self, storage=None, known_keys: int = 4096):
+        self._storage = storage
+        # Keys known to exist in S3, to skip the HEAD request on repeat hits
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._known_max = known_keys
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from app.core.storage import get_s3_service
+
+            self._storage = get_s3_service()
+        return self._storage
+
+    def _remember(self, key: str) -> None:
+        with self._lock:
+            self._known[key] = None
+            self._known.move_to_end(key)
+            while len(self._known) > self._known_max:
+                self._known.popitem(last=False)
+
+    def _is_known(self, key: str) -> bool:
+        with self._lock:
+            if key in self._known:
+                self._known.move_to_end(key)
+                return True
+        return False
+
+    def get_or_render(self, cv_data: Dict[str, Any], fmt: str = "docx") -> Dict[str, Any]:
+        """Return {key, url, cached, format}; renders and uploads on a miss.
+
+        Blocking (rendering and boto3 calls); run it in a threadpool.
+        """
+        if fmt not in RENDER_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}. Use one of {', '.join(RENDER_FORMATS)}")
+
+        key = artifact_key(cv_data, fmt)
+        cached = self._is_known(key) or self.storage.file_exists(key)
+        if not cached:
+            content = render_cv(cv_data, fmt)
+            self.storage.upload_file(
+                BytesIO(content),
+                key,
+                content_type=RENDER_FORMATS[fmt][0],
+                metadata={"template_version": settings.CV_TEMPLATE_VERSION, "format": fmt},
+            )
+            logger.info(f"Rendered CV artifact {key} ({len(content)} bytes)")
+        self._remember(key)
+
+        return {
+            "key": key,
+            "url": self.storage.generate_presigned_url(key, expiration=settings.CV_ARTIFACT_URL_EXPIRY_SECONDS),
+            "cached": cached,
+            "format": fmt,
+        }
+
+
+_artifact_cache: Optional[CVArtifactCache] = None
+
+
+def get_cv_artifact_cache() -> CVArtifactCache:
+    """Get the CV artifact cache singleton."""
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = CVArtifactCache()
+    return _artifact_cache
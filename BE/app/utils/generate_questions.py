@@ -1,9 +1,7 @@
-from langchain_groq import ChatGroq
-from config import GROQ_API_KEY
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
 from app.models.schemas import MCQQuestion, MCQOption
-import json
-import re
+from app.core.llm_gateway import get_llm_gateway
+from app.utils.llm_json import aiter_json_items, iter_json_items
 
 system_message = SystemMessagePromptTemplate.from_template(
     "You are an expert in creating multiple-choice tests."
@@ -30,35 +28,47 @@ human_message = HumanMessagePromptTemplate.from_template(
 
 chat_prompt = ChatPromptTemplate.from_messages([system_message, human_message])
 
-def get_groq_llm():
-    """Get Groq LLM instance (created lazily to avoid import-time issues)"""
-    from config import GROQ_API_KEY
-    return ChatGroq(model="llama-3.3-70b-versatile", temperature=0, api_key=GROQ_API_KEY)
+MCQ_MODEL = "llama-3.3-70b-versatile"
 
-# Remove the global llm instance
-# llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0, api_key=GROQ_API_KEY)
+def build_mcq_messages(topic: str, level: str, subtopics: list = None):
+    """Render the MCQ prompt as chat messages for the LLM gateway."""
+    subtopics_str = ", ".join(subtopics) if subtopics else ""
+    prompt_messages = chat_prompt.format_messages(topic=topic, subtopics=subtopics_str, level=level)
+    roles = {"system": "system", "human": "user", "ai": "assistant"}
+    return [{"role": roles.get(m.type, "user"), "content": m.content} for m in prompt_messages]
 
 def parse_mcqs_from_response(response_text: str):
-    cleaned = re.sub(r'``````', '', response_text.strip())
-    mcqs_data = json.loads(cleaned)
-    questions = []
-    for mcq in mcqs_data:
-        options = [MCQOption(**opt) for opt in mcq['options']]
-        question = MCQQuestion(
-            question_id=mcq['question_id'],
-            question_text=mcq['question_text'],
-            options=options,
-            correct_answer=mcq['correct_answer']
-        )
-        questions.append(question)
+    """Parse MCQs from a (possibly fenced or truncated) LLM completion.
+
+    Questions that fail MCQQuestion validation are dropped instead of
+    failing the whole batch.
+    """
+    questions = list(iter_json_items([response_text], model=MCQQuestion))
+    if not questions:
+        raise ValueError("LLM response did not contain any valid MCQs")
     return questions
 
-def generate_mcqs_for_topic(topic: str, level: str, subtopics: list = None):
-    subtopics_str = ", ".join(subtopics) if subtopics else ""
-    prompt_messages = chat_prompt.format_messages(topic=topic, subtopics=subtopics_str, level=level)
-    llm = get_groq_llm()
-    response = llm.invoke(prompt_messages)
-    print("Raw LLM Response:")
-    print(response.content)
-    questions = parse_mcqs_from_response(response.content)
-    return questions
\ No newline at end of file
+async def iter_mcqs_for_topic(topic: str, level: str, subtopics: list = None):
+    """Stream MCQs from the LLM, yielding each question as soon as it closes."""
+    from config import GROQ_API_KEY
+    chunks = get_llm_gateway().stream(
+        "groq",
+        build_mcq_messages(topic, level, subtopics),
+        api_key=GROQ_API_KEY,
+        model=MCQ_MODEL,
+        temperature=0,
+        max_tokens=4000,
+    )
+    async for question in aiter_json_items(chunks, model=MCQQuestion):
+        yield question
+
+async def generate_mcqs_for_topic(topic: str, level: str, subtopics: list = None):
+    """Generate MCQs from the streamed completion.
+
+    Each question is validated as soon as it closes, so a truncated or
+    malformed tail only loses the questions it affects.
+    """
+    questions = [q async for q in iter_mcqs_for_topic(topic, level, subtopics)]
+    if not questions:
+        raise ValueError("LLM response did not contain any valid MCQs")
+    return questions
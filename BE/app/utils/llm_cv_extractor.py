@@ -3,14 +3,31 @@ LLM-based CV Extraction using Claude/GPT/Groq
 Extracts structured data from CVs using language models for better accuracy
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any
-import httpx
-from langchain_groq import ChatGroq
+from typing import Optional, Dict, Any, AsyncIterator
+from app.core.llm_gateway import LLMGatewayError, get_llm_gateway
+from app.core.llm_router import get_llm_router, routing_enabled
 from app.core.logging import get_logger
+from app.models.schemas import CVWorkExperienceEntry, CVProjectEntry, DocumentClassification
+from app.utils.cv_chunking import (
+    CHUNK_FIELDS,
+    CVChunk,
+    build_cv_chunks,
+    fit_to_budget,
+    merge_cv_results,
+    token_budget,
+)
+from app.utils.llm_json import loads_llm_json, aiter_json_items, validate_item
+from app.utils.ollama_extractor import OllamaExtractor
+from config import get_settings
 
 logger = get_logger(__name__)
+settings = get_settings()
+
+# Confidence reported for each provider's extractions
+PROVIDER_CONFIDENCE = {"openai": 0.95, "anthropic": 0.92, "groq": 0.88}
 
 # Prompt template for CV extraction
 CV_EXTRACTION_PROMPT = """You are an expert resume analyzer with deep HR and technical expertise.
@@ -72,12 +89,12 @@ OUTPUT ONLY THIS JSON STRUCTURE (no other text):
   "portfolio_url": "",
   "potential_red_flags": [],
     "classified_skills": [
-        {"skill_name": "", "category": "strong|intermediate|basic", "confidence": 0.0}
+        {{"skill_name": "", "category": "strong|intermediate|basic", "confidence": 0.0}}
     ],
   "extraction_confidence": 0.0
 }}"""
 "# Request improved, deeper analysis: add a flag and skill detail summary\n"
-CV_EXTRACTION_PROMPT = CV_EXTRACTION_PROMPT.replace('"extraction_confidence": 0.0', '"extraction_confidence": 0.0, "detected_document_type": "cv|jd|unknown", "skills_summary": {"top_skills": [], "skill_counts": {} }')
+CV_EXTRACTION_PROMPT = CV_EXTRACTION_PROMPT.replace('"extraction_confidence": 0.0', '"extraction_confidence": 0.0, "detected_document_type": "cv|jd|unknown", "skills_summary": {{"top_skills": [], "skill_counts": {{}} }}')
 
 JD_EXTRACTION_PROMPT = """You are an expert job description analyzer.
 
@@ -120,7 +137,53 @@ OUTPUT ONLY THIS JSON STRUCTURE (no other text):
   "key_success_metrics": []
 }}"""
 "# Enhance JD prompt to also detect if the text actually appears to be a CV and request deeper skill mapping\n"
-JD_EXTRACTION_PROMPT = JD_EXTRACTION_PROMPT.replace('"key_success_metrics": []', '"key_success_metrics": [], "detected_document_type": "jd|cv|unknown", "skills_mapping": {"must_have_count": 0, "nice_to_have_count": 0} ')
+JD_EXTRACTION_PROMPT = JD_EXTRACTION_PROMPT.replace('"key_success_metrics": []', '"key_success_metrics": [], "detected_document_type": "jd|cv|unknown", "skills_mapping": {{"must_have_count": 0, "nice_to_have_count": 0}} ')
+
+
+# Value shapes for each CV field, used to build per-section prompts
+CV_FIELD_TEMPLATES = {
+    "candidate_name": "",
+    "email": "",
+    "phone": "",
+    "location": "",
+    "total_experience_years": "",
+    "current_role": "",
+    "current_company": "",
+    "education": {"degree": "", "field": "", "institution": ""},
+    "primary_skills": [],
+    "secondary_skills": [],
+    "technical_skills": [],
+    "soft_skills": [],
+    "projects": [{
+        "project_name": "", "role": "", "duration": "", "tech_stack": [], "description": "",
+        "responsibilities": [], "complexity_level": "low|medium|high", "impact": "",
+    }],
+    "work_experience": [{"company": "", "role": "", "duration": "", "responsibilities": [], "achievements": []}],
+    "certifications": [],
+    "achievements": [],
+    "domains_worked_in": [],
+    "github_url": "",
+    "linkedin_url": "",
+    "portfolio_url": "",
+    "potential_red_flags": [],
+    "classified_skills": [{"skill_name": "", "category": "strong|intermediate|basic", "confidence": 0.0}],
+}
+
+CV_SECTION_EXTRACTION_PROMPT = """You are an expert resume analyzer with deep HR and technical expertise.
+
+Your task: The text below is the "{section}" part of a longer CV/Resume. Extract ONLY the fields listed below from it.
+
+CRITICAL RULES:
+1. Output ONLY valid JSON - no markdown, no code blocks, no explanations
+2. Extract EXACTLY what is present - NO assumptions or inferences
+3. If a field is not found in this part, use empty string ("") or empty array ([])
+4. Be precise with numbers and dates
+
+CV PART:
+{cv_text}
+
+OUTPUT ONLY THIS JSON STRUCTURE (no other text):
+{fields_json}"""
 
 
 DOCUMENT_CLASSIFIER_PROMPT = """You are a text classifier that decides whether a given document is a CV/Resume (candidate profile) or a Job Description (JD).
@@ -136,12 +199,12 @@ DOCUMENT TEXT:
 {doc_text}
 
 RESPONSE JSON:
-{
+{{
     "document_type": "cv|jd|unknown",
     "confidence": 0.0,
     "reason": "",
     "quick_hint": ""
-}
+}}
 """
 
 
@@ -174,24 +237,73 @@ class LLMCVExtractor:
                 self.logger.warning("CV text too short for extraction")
                 return self._empty_cv_response()
             
-            prompt = CV_EXTRACTION_PROMPT.format(cv_text=cv_text[:5000])  # Limit to 5000 chars
-            
-            if self.provider.lower() == "openai":
-                response = await self._extract_with_openai(prompt)
-            elif self.provider.lower() == "anthropic":
-                response = await self._extract_with_claude(prompt)
-            elif self.provider.lower() == "groq":
-                response = await self._extract_with_groq(prompt)
-            else:
+            if self.provider.lower() not in ("openai", "anthropic", "groq"):
                 self.logger.error(f"Unsupported provider: {self.provider}")
                 return self._empty_cv_response()
             
+            chunks = build_cv_chunks(cv_text, self.provider)
+            if len(chunks) == 1:
+                prompt = CV_EXTRACTION_PROMPT.format(cv_text=chunks[0].text)
+                response = await self._extract_with_selected_provider(prompt)
+                return response or await self._local_fallback(cv_text)
+            
+            # Long CV: one focused prompt per section, run concurrently
+            self.logger.info(f"Chunked CV extraction: {len(chunks)} chunks ({', '.join(c.kind for c in chunks)})")
+            results = await asyncio.gather(*(self._extract_chunk(chunk) for chunk in chunks))
+            merged = merge_cv_results(list(zip(chunks, results)))
+            if not merged:
+                return await self._local_fallback(cv_text)
+            
+            response = {**self._empty_cv_response(), **merged}
+            response["extraction_confidence"] = next(
+                (r["extraction_confidence"] for r in results if r.get("extraction_confidence")), 0.0
+            )
+            response["provider"] = next((r["provider"] for r in results if r.get("provider")), self.provider.lower())
+            response["chunks_processed"] = sum(1 for r in results if r)
             return response
             
         except Exception as e:
             self.logger.error(f"CV extraction error: {str(e)}")
             return self._empty_cv_response()
     
+    async def _local_fallback(self, cv_text: str) -> Dict[str, Any]:
+        """Extract locally when every remote provider failed or is overloaded"""
+        mode = settings.LLM_LOCAL_FALLBACK.lower()
+        if mode == "none":
+            return self._empty_cv_response()
+        
+        ollama = OllamaExtractor(base_url=settings.OLLAMA_BASE_URL, model=settings.OLLAMA_MODEL)
+        if mode == "ollama" and get_llm_gateway().client("ollama", ollama.base_url).available:
+            self.logger.warning("Remote LLM providers unavailable, falling back to Ollama")
+            return await ollama.extract_cv_data(cv_text)
+        
+        self.logger.warning("Remote LLM providers unavailable, falling back to regex extraction")
+        return ollama._regex_cv_extract(cv_text)
+    
+    async def _extract_chunk(self, chunk: CVChunk) -> Dict[str, Any]:
+        """Extract the fields relevant to one CV chunk"""
+        if chunk.kind == "full":
+            prompt = CV_EXTRACTION_PROMPT.format(cv_text=chunk.text)
+        else:
+            fields = {name: CV_FIELD_TEMPLATES[name] for name in CHUNK_FIELDS[chunk.kind]}
+            prompt = CV_SECTION_EXTRACTION_PROMPT.format(
+                section=chunk.kind,
+                fields_json=json.dumps(fields, indent=2),
+                cv_text=chunk.text,
+            )
+        return await self._extract_with_selected_provider(prompt)
+    
+    async def _extract_with_selected_provider(self, prompt: str) -> Dict[str, Any]:
+        """Dispatch a prompt to the configured provider"""
+        if self.provider.lower() == "openai":
+            return await self._extract_with_openai(prompt)
+        elif self.provider.lower() == "anthropic":
+            return await self._extract_with_claude(prompt)
+        elif self.provider.lower() == "groq":
+            return await self._extract_with_groq(prompt)
+        self.logger.error(f"Unsupported provider: {self.provider}")
+        return {}
+    
     async def extract_jd_data(self, jd_text: str) -> Dict[str, Any]:
         """
         Extract structured data from Job Description using LLM
@@ -207,7 +319,7 @@ class LLMCVExtractor:
                 self.logger.warning("JD text too short for extraction")
                 return self._empty_jd_response()
             
-            prompt = JD_EXTRACTION_PROMPT.format(jd_text=jd_text[:5000])  # Limit to 5000 chars
+            prompt = JD_EXTRACTION_PROMPT.format(jd_text=fit_to_budget(jd_text, token_budget(self.provider)))
             
             if self.provider.lower() == "openai":
                 response = await self._extract_with_openai(prompt)
@@ -224,160 +336,124 @@ class LLMCVExtractor:
         except Exception as e:
             self.logger.error(f"JD extraction error: {str(e)}")
             return self._empty_jd_response()
-    
-    async def _extract_with_openai(self, prompt: str) -> Dict[str, Any]:
-        """Extract using OpenAI API"""
+
+    async def stream_cv_entries(self, cv_text: str, field: str = "work_experience") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield validated CV entries as soon as the LLM closes each one
+
+        Args:
+            cv_text: Raw CV text
+            field: "work_experience" or "projects"
+
+        Yields:
+            Entry dictionaries validated against the CV entry schemas
+        """
+        model = CVProjectEntry if field == "projects" else CVWorkExperienceEntry
+
+        if not cv_text or len(cv_text.strip()) < 50:
+            self.logger.warning("CV text too short for extraction")
+            return
+
+        prompt = CV_EXTRACTION_PROMPT.format(cv_text=fit_to_budget(cv_text, token_budget(self.provider)))
+
+        provider = self.provider.lower()
+        if provider in ("openai", "anthropic", "groq") and self.api_key:
+            chunks = get_llm_gateway().stream(
+                provider,
+                prompt,
+                system="You are a JSON extractor. Output ONLY valid JSON, nothing else.",
+                api_key=self.api_key,
+                temperature=0.3,
+                max_tokens=2000,
+            )
+            try:
+                async for entry in aiter_json_items(chunks, path=(field,), model=model):
+                    yield entry.model_dump()
+            except Exception as e:
+                self.logger.error(f"{provider} streaming extraction error: {str(e)}")
+            return
+
+        # Unknown provider or missing key: extract once, then validate entries
+        data = await self.extract_cv_data(cv_text)
+        for item in data.get(field) or []:
+            entry = validate_item(item, model)
+            if entry is not None:
+                yield entry.model_dump()
+
+    async def _extract_with_provider(self, provider: str, prompt: str, confidence: float) -> Dict[str, Any]:
+        """Run the prompt through the shared LLM gateway and parse the JSON reply"""
+        content = ""
         try:
-            if not self.api_key:
-                self.logger.error("OpenAI API key not configured")
+            # With routing, other configured providers can serve the call even
+            # without a key for this one; the router raises when none is available
+            if not self.api_key and not routing_enabled():
+                self.logger.error(f"{provider} API key not configured")
                 return {}
             
-            self.logger.info("Starting OpenAI extraction with gpt-4-turbo-preview")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-4-turbo-preview",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "You are a JSON extractor. Output ONLY valid JSON, nothing else."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 2000
-                    },
-                    timeout=30.0
+            self.logger.info(f"Starting {provider} extraction")
+            
+            if routing_enabled():
+                # Router picks the fastest healthy provider and hedges slow calls
+                response = await get_llm_router().complete(
+                    prompt,
+                    system="You are a JSON extractor. Output ONLY valid JSON, nothing else.",
+                    preferred=provider,
+                    api_keys={provider: self.api_key} if self.api_key else None,
+                    temperature=0.3,
+                    max_tokens=2000,
+                )
+            else:
+                response = await get_llm_gateway().complete(
+                    provider,
+                    prompt,
+                    system="You are a JSON extractor. Output ONLY valid JSON, nothing else.",
+                    api_key=self.api_key,
+                    temperature=0.3,
+                    max_tokens=2000,
                 )
+            content = response.content
             
-            if response.status_code != 200:
-                self.logger.error(f"OpenAI API error: {response.status_code}")
+            if not content:
+                self.logger.error(f"Empty response from {provider}")
                 return {}
             
-            data = response.json()
-            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            
             # Parse JSON from response
-            extracted_data = json.loads(content)
+            extracted_data = loads_llm_json(content)
             
             # Add provider info and confidence
-            extracted_data["extraction_confidence"] = 0.95
-            extracted_data["provider"] = "openai"
-            
-            self.logger.info(f"OpenAI extraction successful, confidence: {extracted_data.get('extraction_confidence', 0)}")
+            extracted_data["extraction_confidence"] = PROVIDER_CONFIDENCE.get(response.provider, confidence)
+            extracted_data["provider"] = response.provider
+            if response.hedged:
+                extracted_data["hedged"] = True
+            
+            self.logger.info(
+                f"{response.provider} extraction successful in {response.latency_ms:.0f}ms, "
+                f"confidence: {extracted_data.get('extraction_confidence', 0)}"
+            )
             return extracted_data
             
         except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response from OpenAI: {e}")
-            self.logger.error(f"OpenAI response content: {content[:500] if 'content' in locals() else 'No content'}")
+            self.logger.error(f"Failed to parse JSON response from {provider}: {e}")
+            self.logger.error(f"{provider} response content: {content[:500] if content else 'No content'}")
+            return {}
+        except LLMGatewayError as e:
+            self.logger.error(f"{provider} extraction error: {str(e)}")
             return {}
         except Exception as e:
-            self.logger.error(f"OpenAI extraction error: {str(e)}")
+            self.logger.error(f"{provider} extraction error: {str(e)}")
             return {}
     
+    async def _extract_with_openai(self, prompt: str) -> Dict[str, Any]:
+        """Extract using OpenAI API"""
+        return await self._extract_with_provider("openai", prompt, 0.95)
+    
     async def _extract_with_claude(self, prompt: str) -> Dict[str, Any]:
         """Extract using Claude/Anthropic API"""
-        try:
-            if not self.api_key:
-                self.logger.error("Claude API key not configured")
-                return {}
-            
-            self.logger.info("Starting Claude extraction with claude-3-opus")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json"
-                    },
-                    json={
-                        "model": "claude-3-opus-20240229",
-                        "max_tokens": 2000,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    },
-                    timeout=30.0
-                )
-            
-            if response.status_code != 200:
-                self.logger.error(f"Claude API error: {response.status_code}")
-                return {}
-            
-            data = response.json()
-            content = data.get("content", [{}])[0].get("text", "")
-            
-            # Parse JSON from response
-            extracted_data = json.loads(content)
-            
-            # Add provider info and confidence
-            extracted_data["extraction_confidence"] = 0.92
-            extracted_data["provider"] = "anthropic"
-            
-            self.logger.info(f"Claude extraction successful, confidence: {extracted_data.get('extraction_confidence', 0)}")
-            return extracted_data
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response from Claude: {e}")
-            self.logger.error(f"Claude response content: {content[:500] if 'content' in locals() else 'No content'}")
-            return {}
-        except Exception as e:
-            self.logger.error(f"Claude extraction error: {str(e)}")
-            return {}
+        return await self._extract_with_provider("anthropic", prompt, 0.92)
     
     async def _extract_with_groq(self, prompt: str) -> Dict[str, Any]:
         """Extract using Groq API (FREE tier available at https://console.groq.com)"""
-        try:
-            if not self.api_key:
-                self.logger.error("Groq API key not configured")
-                return {}
-            
-            self.logger.info("Starting Groq extraction with llama-3.3-70b-versatile")
-            
-            llm = ChatGroq(
-                model="llama-3.3-70b-versatile",
-                temperature=0.3,
-                api_key=self.api_key,
-                timeout=30
-            )
-            
-            response = await llm.ainvoke(prompt)
-            
-            # Parse JSON from response
-            if not response.content:
-                self.logger.error("Empty response from Groq")
-                return {}
-            
-            extracted_data = json.loads(response.content)
-            
-            # Add provider info and confidence
-            extracted_data["extraction_confidence"] = 0.88
-            extracted_data["provider"] = "groq"
-            
-            self.logger.info(f"Groq extraction successful, confidence: {extracted_data.get('extraction_confidence', 0)}")
-            return extracted_data
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response from Groq: {e}")
-            self.logger.error(f"Groq response content: {response.content[:500] if 'response' in locals() else 'No response'}")
-            return {}
-        except Exception as e:
-            self.logger.error(f"Groq extraction error: {str(e)}")
-            return {}
+        return await self._extract_with_provider("groq", prompt, 0.88)
     
     def _empty_cv_response(self) -> Dict[str, Any]:
         """Return empty CV response structure"""
@@ -440,7 +516,7 @@ class LLMCVExtractor:
                 self.logger.warning("Document too short for classification")
                 return {"document_type": "unknown", "confidence": 0.0, "reason": "Text too short"}
 
-            prompt = DOCUMENT_CLASSIFIER_PROMPT.format(doc_text=doc_text[:6000])
+            prompt = DOCUMENT_CLASSIFIER_PROMPT.format(doc_text=fit_to_budget(doc_text, token_budget(self.provider)))
             # Reuse OpenAI/Groq/Claude extraction wrappers but expect classification JSON
             if self.provider.lower() == "openai":
                 resp = await self._extract_with_openai(prompt)
@@ -452,23 +528,16 @@ class LLMCVExtractor:
                 self.logger.error(f"Unsupported provider: {self.provider}")
                 return {"document_type": "unknown", "confidence": 0.0, "reason": "Unsupported provider"}
 
-            # _extract_with_openai/_claude/_groq try to parse JSON but their structure may not match; coerce
-            if not isinstance(resp, dict):
-                # If it's string-based parse JSON
-                try:
-                    resp_json = json.loads(resp)
-                except Exception:
-                    return {"document_type": "unknown", "confidence": 0.0, "reason": "Malformed classifier response"}
-            else:
-                resp_json = resp
+            if not resp:
+                return {"document_type": "unknown", "confidence": 0.0, "reason": "Malformed classifier response"}
 
             # Normalize keys
-            doc_type = resp_json.get("document_type") or resp_json.get("type") or "unknown"
-            confidence = float(resp_json.get("confidence", 0.0) or 0.0)
-            reason = resp_json.get("reason", "")
-            quick_hint = resp_json.get("quick_hint", "")
+            resp["document_type"] = resp.get("document_type") or resp.get("type") or "unknown"
+            resp["confidence"] = resp.get("confidence") or 0.0
+            classification = DocumentClassification.model_validate(resp)
+            classification.document_type = (classification.document_type or "unknown").lower()
 
-            return {"document_type": doc_type.lower(), "confidence": confidence, "reason": reason, "quick_hint": quick_hint}
+            return classification.model_dump()
         except Exception as e:
             self.logger.error(f"Document classification error: {str(e)}")
             return {"document_type": "unknown", "confidence": 0.0, "reason": str(e)}
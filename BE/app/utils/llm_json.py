@@ -0,0 +1,246 @@
+"""Tolerant JSON parsing for LLM completions.
+
+LLMs routinely wrap JSON in markdown fences, add a sentence before or after
+it, leave trailing commas, or get cut off by ``max_tokens``. The helpers here
+repair those defects instead of failing the whole extraction, and
+``JSONItemStream`` lets callers consume a streaming completion and act on each
+array element (an MCQ, a work-experience entry, ...) as soon as it closes.
+"""
+
+import json
+import logging
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Type
+
+logger = logging.getLogger(__name__)
+
+_FENCE_RE = re.compile(r"```[a-zA-Z0-9_-]*")
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences (```json ... ```) anywhere in the text."""
+    if not text:
+        return ""
+    return _FENCE_RE.sub("", text.lstrip("﻿")).strip()
+
+
+def repair_json(text: str) -> str:
+    """Extract the first JSON object/array from text and fix common defects.
+
+    Handles surrounding prose, markdown fences, trailing commas and output
+    truncated mid-document (open strings and containers are closed).
+    """
+    text = strip_code_fences(text)
+    start = -1
+    for i, ch in enumerate(text):
+        if ch in _CLOSERS:
+            start = i
+            break
+    if start < 0:
+        return text
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escape = False
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break
+        else:
+            out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    if stack:
+        _drop_trailing_comma(out)
+        while out and out[-1] in " \t\r\n":
+            out.pop()
+        if out and out[-1] == ":":
+            # Cut off right after a key: give it an explicit null value.
+            out.append(" null")
+        out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    """Remove a ',' (and whitespace after it) from the end of the buffer."""
+    i = len(out) - 1
+    while i >= 0 and out[i] in " \t\r\n":
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i:]
+
+
+def loads_llm_json(text: str) -> Any:
+    """Parse an LLM completion as JSON, repairing it if strict parsing fails.
+
+    Raises:
+        json.JSONDecodeError: if the text cannot be repaired into valid JSON
+    """
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        pass
+    return json.loads(repair_json(text or ""))
+
+
+class JSONItemStream:
+    """Incremental parser that yields array elements as soon as they close.
+
+    ``path`` selects the array by the object keys leading to it: ``()`` is a
+    top-level array (MCQ lists), ``("work_experience",)`` is the
+    ``work_experience`` array of a top-level object. Only object/array
+    elements are emitted; text outside the JSON (fences, prose) is ignored.
+
+    Usage:
+        stream = JSONItemStream(path=("work_experience",))
+        for chunk in completion_chunks:
+            for entry in stream.feed(chunk):
+                ...
+        document = stream.document()
+    """
+
+    def __init__(self, path: Sequence[str] = ()):
+        self.path = tuple(path)
+        self._chunks: List[str] = []
+        # Each frame is [kind, current_key]; kind is "{" or "[".
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []
+        self._last_string: Optional[str] = None
+        self._item: List[str] = []
+        self._item_depth: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of completion text and return newly closed items."""
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        items: List[Any] = []
+
+        for ch in chunk:
+            capturing = self._item_depth is not None
+            if capturing:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string)
+                else:
+                    self._string.append(ch)
+                continue
+
+            if ch == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._string = []
+            elif ch == ":":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][1] = self._last_string
+            elif ch in _CLOSERS:
+                if not capturing and self._stack and self._stack[-1][0] == "[" and self._current_path() == self.path:
+                    self._item_depth = len(self._stack)
+                    self._item = [ch]
+                self._stack.append([ch, None])
+            elif ch in "}]":
+                if capturing:
+                    self._item.pop()
+                    _drop_trailing_comma(self._item)
+                    self._item.append(ch)
+                if self._stack:
+                    self._stack.pop()
+                if self._item_depth is not None and len(self._stack) == self._item_depth:
+                    item = self._parse_item()
+                    if item is not None:
+                        items.append(item)
+                    self._item = []
+                    self._item_depth = None
+
+        return items
+
+    def _current_path(self) -> tuple:
+        return tuple(frame[1] for frame in self._stack if frame[0] == "{")
+
+    def _parse_item(self) -> Optional[Any]:
+        raw = "".join(self._item)
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed streamed JSON item: {e}")
+            return None
+
+    def document(self) -> Any:
+        """Parse everything fed so far as one (repaired) JSON document."""
+        return loads_llm_json("".join(self._chunks))
+
+
+def validate_item(item: Any, model: Type) -> Optional[Any]:
+    """Validate a parsed item against a pydantic model; None if invalid."""
+    try:
+        return model.model_validate(item)
+    except Exception as e:
+        logger.warning(f"Discarding {model.__name__} that failed validation: {e}")
+        return None
+
+
+def iter_json_items(
+    chunks: Iterable[str],
+    path: Sequence[str] = (),
+    model: Optional[Type] = None,
+) -> Iterator[Any]:
+    """Yield items from a synchronous stream of completion chunks."""
+    stream = JSONItemStream(path)
+    for chunk in chunks:
+        for item in stream.feed(chunk):
+            if model is not None:
+                item = validate_item(item, model)
+                if item is None:
+                    continue
+            yield item
+
+
+async def aiter_json_items(
+    chunks: AsyncIterable[str],
+    path: Sequence[str] = (),
+    model: Optional[Type] = None,
+) -> AsyncIterator[Any]:
+    """Yield items from an async stream of completion chunks."""
+    stream = JSONItemStream(path)
+    async for chunk in chunks:
+        for item in stream.feed(chunk):
+            if model is not None:
+                item = validate_item(item, model)
+                if item is None:
+                    continue
+            yield item
@@ -3,12 +3,14 @@ Ollama-based CV and JD extraction (COMPLETELY FREE, local models).
 No API keys needed, runs entirely on your machine.
 """
 
-import httpx
 import json
 import logging
 from typing import Dict, Any, Optional
 import re
 
+from app.core.llm_gateway import get_llm_gateway
+from app.utils.llm_json import loads_llm_json
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,28 +47,20 @@ class OllamaExtractor:
         try:
             prompt = self._get_cv_prompt(cv_text[:3000])  # Limit text length
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "temperature": 0.3,
-                        "num_predict": 1500  # Limit response length
-                    }
-                )
-
-            if response.status_code != 200:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return self._empty_cv_response()
-
-            result = response.json()
-            content = result.get("response", "")
+            response = await get_llm_gateway().complete(
+                "ollama",
+                prompt,
+                base_url=self.base_url,
+                model=self.model,
+                temperature=0.3,
+                max_tokens=1500,  # Limit response length
+                timeout=self.timeout,
+            )
+            content = response.content
 
             # Parse JSON from response
             try:
-                extracted = json.loads(content)
+                extracted = loads_llm_json(content)
                 extracted["extraction_confidence"] = 0.82
                 extracted["provider"] = f"ollama-{self.model}"
                 return extracted
@@ -83,27 +77,19 @@ class OllamaExtractor:
         try:
             prompt = self._get_jd_prompt(jd_text[:3000])
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "temperature": 0.3,
-                        "num_predict": 1500
-                    }
-                )
-
-            if response.status_code != 200:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return self._empty_jd_response()
-
-            result = response.json()
-            content = result.get("response", "")
+            response = await get_llm_gateway().complete(
+                "ollama",
+                prompt,
+                base_url=self.base_url,
+                model=self.model,
+                temperature=0.3,
+                max_tokens=1500,
+                timeout=self.timeout,
+            )
+            content = response.content
 
             try:
-                extracted = json.loads(content)
+                extracted = loads_llm_json(content)
                 extracted["extraction_confidence"] = 0.80
                 extracted["provider"] = f"ollama-{self.model}"
                 return extracted
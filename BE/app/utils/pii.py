@@ -1,11 +1,75 @@
 import re
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
 
 
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-PHONE_RE = re.compile(r"(\+?\d[\d\-().\s]{6,}\d)")
+# Digits joined by short separator runs on one line. Each repetition must end
+# on a digit, so long numeric/whitespace runs cannot backtrack quadratically.
+# Matches shorter than PHONE_MIN_LENGTH (e.g. "1200000") are not phones.
+PHONE_RE = re.compile(r"\+?\d(?:[\-(). \t]{0,3}\d)+")
+PHONE_MIN_LENGTH = 8
 URL_RE = re.compile(r"https?://\S+|www\.\S+")
-COMPANY_RE = re.compile(r"\b([A-Z][A-Za-z0-9&\.-]{1,}\s+(?:Inc|LLC|Ltd|Corporation|Corp|Company|Co\.?))\b")
+_COMPANY = r"[A-Z][A-Za-z0-9&\.-]{1,}\s+(?:Inc|LLC|Ltd|Corporation|Corp|Company|Co\.?)"
+COMPANY_RE = re.compile(rf"\b({_COMPANY})\b")
+
+# Entity group name -> (counts key, replacement)
+_ENTITIES = {
+    "email": ("emails", "[REDACTED_EMAIL]"),
+    "phone": ("phones", "[REDACTED_PHONE]"),
+    "url": ("urls", "[REDACTED_URL]"),
+    "company": ("companies", "[REDACTED_COMPANY]"),
+}
+
+# Labelled lines ("Phone: ...") whose whole value is masked; the replacement
+# keeps the label text captured in the ``<name>_key`` group. A "-" separator
+# must be followed by whitespace so hyphenated words ("phone-support") are
+# not labels.
+_LABELS = {
+    "phone_label": (r"(?i:phone)[^\S\n]*(?::|-(?!\S))", r"[^\S\n]*\S[^\n]*", " [REDACTED]"),
+    "email_label": (r"(?i:email)[^\S\n]*(?::|-(?!\S))", r"[^\S\n]*\S[^\n]*", " [REDACTED]"),
+    "company_label": (r"(?i:current[^\S\n]+company)[^\S\n]*(?::|-(?!\S))", r"[^\S\n]*[^\n]+", " [REDACTED]"),
+    "linkedin_label": (r"(?i:linkedin)[^\S\n]*(?::|-(?!\S))", r"[^\n]*", " [REDACTED_URL]"),
+    "url_label": (r"(?i:github|portfolio|website)", r"[^\S\n]*(?::|-(?!\S))[^\n]*", ": [REDACTED_URL]"),
+}
+
+
+def _entity_group(name: str, pattern: str) -> str:
+    return f"(?P<{name}>{pattern})"
+
+
+def _label_group(name: str, key: str, value: str) -> str:
+    return f"(?P<{name}>(?P<{name}_key>{key}){value})"
+
+
+# Entities only; used to count what a masked label value contained.
+_ENTITY_RE = re.compile("|".join([
+    # Only try emails at the start of a local-part run, not at every character
+    _entity_group("email", rf"(?<![A-Za-z0-9._%+-]){EMAIL_RE.pattern}"),
+    _entity_group("phone", PHONE_RE.pattern),
+    _entity_group("url", URL_RE.pattern),
+    # Without COMPANY_RE's capture group so ``lastgroup`` names the alternative
+    _entity_group("company", rf"\b{_COMPANY}\b"),
+]))
+
+# Entities first, as the old implementation substituted them before masking
+# labels: a label word that starts an entity ("phone-support@acme.com",
+# "Current Company") is redacted as that entity. Otherwise a labelled line
+# is masked as a whole. The lookaheads list every possible first character,
+# so most positions are rejected by one charset test.
+PII_RE = re.compile(
+    r"(?=[A-Za-z0-9._%+-])(?:" + _ENTITY_RE.pattern + r"|(?=[CcEeGgLlPpWw])(?:"
+    + "|".join(_label_group(name, key, value) for name, (key, value, _) in _LABELS.items())
+    + "))"
+)
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"emails": 0, "phones": 0, "urls": 0, "companies": 0}
+
+
+def _is_entity(match: re.Match) -> bool:
+    return match.lastgroup != "phone" or len(match.group().lstrip("+")) >= PHONE_MIN_LENGTH
 
 
 def redact_pii(text: str) -> Tuple[str, dict]:
@@ -13,53 +77,40 @@ def redact_pii(text: str) -> Tuple[str, dict]:
 
     Returns (redacted_text, counts) where counts is a dict with how many items redacted.
     Preserves original indentation, line breaks, and document structure.
+    Single scan: all patterns run as one compiled alternation and counts
+    are collected in the replacement callback.
     """
+    counts = _empty_counts()
     if not text:
-        return text, {"emails": 0, "phones": 0, "urls": 0, "companies": 0}
-
-    emails = EMAIL_RE.findall(text)
-    phones = PHONE_RE.findall(text)
-    urls = URL_RE.findall(text)
-    companies = COMPANY_RE.findall(text)
-
-    redacted = text
-    
-    # Replace emails - preserve line structure
-    if emails:
-        redacted = EMAIL_RE.sub("[REDACTED_EMAIL]", redacted)
-    
-    # Replace phones - preserve line structure
-    if phones:
-        redacted = PHONE_RE.sub("[REDACTED_PHONE]", redacted)
-    
-    # Replace URLs - preserve line structure
-    if urls:
-        redacted = URL_RE.sub("[REDACTED_URL]", redacted)
-    
-    # Replace company explicit mentions - preserve line structure
-    if companies:
-        redacted = COMPANY_RE.sub("[REDACTED_COMPANY]", redacted)
-
-    # Mask labels while preserving indentation
-    # Phone: xxx -> Phone: [REDACTED]
-    redacted = re.sub(r"(?i)(phone\s*[:\-])\s*\S.*?(?=\n|$)", r"\1 [REDACTED]", redacted)
-    
-    # Email: xxx -> Email: [REDACTED]
-    redacted = re.sub(r"(?i)(email\s*[:\-])\s*\S.*?(?=\n|$)", r"\1 [REDACTED]", redacted)
-    
-    # Current company: xxx -> Current Company: [REDACTED]
-    redacted = re.sub(r"(?i)(current\s+company\s*[:\-])\s*.+?(?=\n|$)", r"\1 [REDACTED]", redacted)
-    
-    # LinkedIn: xxx -> LinkedIn: [REDACTED_URL]
-    redacted = re.sub(r"(?i)(linkedin\s*[:\-])\s*.*?(?=\n|$)", r"\1 [REDACTED_URL]", redacted)
-    
-    # GitHub/Portfolio/Website URLs
-    redacted = re.sub(r"(?i)(github|portfolio|website)\s*[:\-]\s*.*?(?=\n|$)", r"\1: [REDACTED_URL]", redacted)
-
-    counts = {
-        "emails": len(emails),
-        "phones": len(phones),
-        "urls": len(urls),
-        "companies": len(companies),
-    }
-    return redacted, counts
+        return text, counts
+
+    def replace(match: re.Match) -> str:
+        name = match.lastgroup
+        entity = _ENTITIES.get(name)
+        if entity is not None:
+            if not _is_entity(match):
+                return match.group()
+            counts[entity[0]] += 1
+            return entity[1]
+
+        key = match.group(f"{name}_key")
+        for inner in _ENTITY_RE.finditer(match.group(name), len(key)):
+            if _is_entity(inner):
+                counts[_ENTITIES[inner.lastgroup][0]] += 1
+        return key + _LABELS[name][2]
+
+    return PII_RE.sub(replace, text), counts
+
+
+def redact_pii_batch(texts: Iterable[str], workers: int = 0, chunksize: int = 16) -> List[Tuple[str, dict]]:
+    """Redact many documents; results keep input order.
+
+    With ``workers`` > 1 documents are spread over a process pool, which
+    pays off for large bulk runs since redaction is CPU bound.
+    """
+    texts = list(texts)
+    if workers <= 1 or len(texts) < 2 * chunksize:
+        return [redact_pii(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(redact_pii, texts, chunksize=chunksize))
@@ -1,60 +1,213 @@
-import pandas as pd
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_core.documents import Document
+"""Build the course FAISS index from the courses masterdata.
+
+Usage (from the BE directory):
+    python -m app.vector_db.build_course_vector_index
+    python -m app.vector_db.build_course_vector_index --full --batch-size 512
+
+Each row's searchable text is hashed and the hashes are stored in
+manifest.json next to the index. On rebuild, vectors for unchanged rows are
+copied from the previous index and only new or edited rows are embedded, in
+large batches. The new index is written to a temporary directory beside the
+target and swapped in, so a failed build never leaves the server without an
+index.
+"""
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.logging import get_logger
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+TEXT_COLUMNS = [
+    "Pathway Display Name",
+    "Skill/Topic Pathways",
+    "Collection Name",
+    "Category",
+    "Description",
+    "Course Level",
+]
+
+# metadata key -> masterdata column
+METADATA_COLUMNS = {
+    "name": "Pathway Display Name",
+    "topic": "Skill/Topic Pathways",
+    "collection": "Collection Name",
+    "category": "Category",
+    "description": "Description",
+    "url": "Pathway URL",
+    "course_level": "Course Level",
+}
+
+
+def load_courses(excel_path: str) -> pd.DataFrame:
+    """Read the masterdata as stripped strings (column-wise, no per-cell Python)."""
+    df = pd.read_excel(excel_path).fillna("")
+    for column in set(TEXT_COLUMNS) | set(METADATA_COLUMNS.values()):
+        if column not in df:
+            df[column] = ""
+    return df.astype(str).apply(lambda column: column.str.strip())
+
+
+def build_documents(df: pd.DataFrame) -> Tuple[List[str], List[Dict[str, str]]]:
+    """Searchable text blobs and metadata dicts, one per row."""
+    texts = ["; ".join(values) for values in zip(*(df[column] for column in TEXT_COLUMNS))]
+    metadatas = [
+        {"type": "resource", **dict(zip(METADATA_COLUMNS, values))}
+        for values in zip(*(df[column] for column in METADATA_COLUMNS.values()))
+    ]
+    return texts, metadatas
+
+
+def row_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_previous_vectors(index_path: str, model_name: str) -> Dict[str, np.ndarray]:
+    """Map row hash -> vector from the current index, if it was built with the same model."""
+    manifest_path = os.path.join(index_path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("model") != model_name:
+            logger.info(f"Embedding model changed ({manifest.get('model')} -> {model_name}); full rebuild")
+            return {}
 
-# Set file paths
-EXCEL_PATH = os.path.join("data", "Courses Masterdata.xlsx")
-VECTOR_INDEX_PATH = os.path.join("data", "course_faiss_index")
-
-# Load Excel
-df = pd.read_excel(EXCEL_PATH)
-df = df.fillna("")
-
-# Strip whitespace from all strings (important)
-df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-documents = []
-
-for _, row in df.iterrows():
-    # Build combined searchable text
-    text_blob = "; ".join([
-        str(row.get("Pathway Display Name", "")),
-        str(row.get("Skill/Topic Pathways", "")),
-        str(row.get("Collection Name", "")),
-        str(row.get("Category", "")),
-        str(row.get("Description", "")),
-        str(row.get("Course Level", "")),
-    ])
-
-    # Build metadata (ensure consistent key names)
-    metadata = {
-        "type": "resource",
-        "name": str(row.get("Pathway Display Name", "")),
-        "topic": str(row.get("Skill/Topic Pathways", "")),
-        "collection": str(row.get("Collection Name", "")),
-        "category": str(row.get("Category", "")),
-        "description": str(row.get("Description", "")),
-        "url": str(row.get("Pathway URL", "")),
-        "course_level": str(row.get("Course Level", "")),  
+        import faiss
+
+        index = faiss.read_index(os.path.join(index_path, "index.faiss"))
+        hashes = manifest.get("rows", [])
+        if index.ntotal != len(hashes):
+            logger.warning("Index and manifest row counts differ; full rebuild")
+            return {}
+        vectors = index.reconstruct_n(0, index.ntotal)
+    except Exception as e:
+        logger.warning(f"Cannot reuse previous index vectors ({e}); full rebuild")
+        return {}
+    return dict(zip(hashes, vectors))
+
+
+def embed_in_batches(embedding_model, texts: List[str], batch_size: int) -> np.ndarray:
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embedding_model.embed_documents(texts[start:start + batch_size]))
+        logger.info(f"Embedded {min(start + batch_size, len(texts))}/{len(texts)} rows")
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def swap_directory(new_path: str, target_path: str) -> None:
+    """Replace target_path with new_path, keeping the old index until the new one is in place."""
+    backup_path = None
+    if os.path.exists(target_path):
+        backup_path = f"{target_path}.old-{int(time.time())}"
+        os.rename(target_path, backup_path)
+    try:
+        os.rename(new_path, target_path)
+    except OSError:
+        if backup_path:
+            os.rename(backup_path, target_path)
+        raise
+    if backup_path:
+        shutil.rmtree(backup_path, ignore_errors=True)
+
+
+def restore_interrupted_swap(target_path: str) -> None:
+    """Put back an index left aside by a build that died mid-swap."""
+    parent, name = os.path.split(os.path.abspath(target_path))
+    if os.path.exists(target_path) or not os.path.isdir(parent):
+        return
+    backups = sorted(entry for entry in os.listdir(parent) if entry.startswith(f"{name}.old-"))
+    if backups:
+        os.rename(os.path.join(parent, backups[-1]), target_path)
+        logger.warning(f"Restored course index from {backups[-1]}")
+
+
+def build_index(
+    excel_path: str,
+    index_path: str,
+    model_name: str,
+    batch_size: int = 256,
+    full: bool = False,
+) -> Dict[str, float]:
+    """Build (incrementally unless full) and atomically install the course index."""
+    from langchain_community.vectorstores import FAISS
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    started = time.perf_counter()
+    restore_interrupted_swap(index_path)
+
+    df = load_courses(excel_path)
+    texts, metadatas = build_documents(df)
+    hashes = [row_hash(text) for text in texts]
+
+    previous = {} if full else load_previous_vectors(index_path, model_name)
+    to_embed = list(dict.fromkeys(h for h in hashes if h not in previous))
+    text_by_hash = dict(zip(hashes, texts))
+
+    embedding_model = HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"batch_size": batch_size})
+    embed_started = time.perf_counter()
+    fresh = embed_in_batches(embedding_model, [text_by_hash[h] for h in to_embed], batch_size) if to_embed else []
+    embed_seconds = time.perf_counter() - embed_started
+    vectors_by_hash = {**previous, **dict(zip(to_embed, fresh))}
+
+    vectorstore = FAISS.from_embeddings(
+        text_embeddings=[(text, vectors_by_hash[h].tolist()) for text, h in zip(texts, hashes)],
+        embedding=embedding_model,
+        metadatas=metadatas,
+    )
+
+    parent = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=f".{os.path.basename(index_path)}.", dir=parent)
+    try:
+        vectorstore.save_local(tmp_path)
+        with open(os.path.join(tmp_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "built_at": time.time(), "rows": hashes}, f)
+        swap_directory(tmp_path, index_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    return {
+        "rows": len(texts),
+        "embedded": len(to_embed),
+        "reused": len(texts) - sum(1 for h in hashes if h not in previous),
+        "embed_seconds": embed_seconds,
+        "total_seconds": time.perf_counter() - started,
     }
 
-    documents.append(Document(page_content=text_blob, metadata=metadata))
 
-# Initialize embedding model
-embedding_model = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the course FAISS index")
+    parser.add_argument("--excel", default=settings.COURSE_MASTERDATA_PATH, help="Courses masterdata .xlsx")
+    parser.add_argument("--index-path", default=settings.COURSE_INDEX_PATH)
+    parser.add_argument("--model", default=settings.COURSE_EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=256, help="Rows per embedding forward pass")
+    parser.add_argument("--full", action="store_true", help="Re-embed every row instead of only changed rows")
+    args = parser.parse_args(argv)
+
+    stats = build_index(args.excel, args.index_path, args.model, batch_size=args.batch_size, full=args.full)
 
-# Create FAISS vector store
-vectorstore = FAISS.from_documents(documents, embedding_model)
+    embed_rate = stats["embedded"] / stats["embed_seconds"] if stats["embed_seconds"] and stats["embedded"] else 0.0
+    print(f"FAISS index rebuilt and saved to {args.index_path}")
+    print(f"Rows: {stats['rows']}  embedded: {stats['embedded']}  reused: {stats['reused']}")
+    print(f"Embedding: {stats['embed_seconds']:.1f}s ({embed_rate:.1f} rows/s)")
+    print(f"Total: {stats['total_seconds']:.1f}s ({stats['rows'] / stats['total_seconds']:.1f} rows/s)")
 
-# Delete old index before saving new one
-if os.path.exists(VECTOR_INDEX_PATH):
-    import shutil
-    shutil.rmtree(VECTOR_INDEX_PATH)
 
-# Save index to disk
-vectorstore.save_local(VECTOR_INDEX_PATH)
-print(f"FAISS index rebuilt and saved to {VECTOR_INDEX_PATH}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Pre-indexed keyword search over the course masterdata.
+
+Built once when the course index loads. Courses are held column-wise as
+NumPy arrays, result dicts are materialized once per row, and an inverted
+index maps each alphanumeric token to the rows containing it, so a keyword
+query touches only candidate rows instead of scanning the whole DataFrame.
+Semantics match the previous pandas fallback: a case-insensitive substring
+match on topic, display name or collection, restricted to courses with a
+non-empty level.
+"""
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SEARCH_COLUMNS = ("Skill/Topic Pathways", "Pathway Display Name", "Collection Name")
+
+# result field -> masterdata column
+RESULT_FIELDS = {
+    "name": "Pathway Display Name",
+    "topic": "Skill/Topic Pathways",
+    "collection": "Collection Name",
+    "category": "Category",
+    "description": "Description",
+    "url": "Pathway URL",
+    "course_level": "Course Level",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class CourseCatalog:
+    """Column store + inverted token index for fallback course search."""
+
+    def __init__(self, courses, cache_size: int = 1024):
+        self.size = len(courses)
+        self.columns: Dict[str, np.ndarray] = {
+            column: self._column(courses, column)
+            for column in set(RESULT_FIELDS.values()) | set(SEARCH_COLUMNS)
+        }
+        # Lowercased searchable text per row, one entry per search column
+        self._search_text: List[Tuple[str, ...]] = list(zip(*(
+            [value.lower() for value in self.columns[column]] for column in SEARCH_COLUMNS
+        ))) if self.size else []
+
+        # Result dicts are built once and shared; callers must not mutate them
+        self.records: List[Dict[str, Any]] = [
+            {**dict(zip(RESULT_FIELDS, values)), "score": None}
+            for values in zip(*(self.columns[column] for column in RESULT_FIELDS.values()))
+        ] if self.size else []
+
+        postings = defaultdict(list)
+        for row, fields in enumerate(self._search_text):
+            for token in set(_TOKEN_RE.findall(" ".join(fields))):
+                postings[token].append(row)
+        self._postings: Dict[str, np.ndarray] = {
+            token: np.asarray(rows, dtype=np.int32) for token, rows in postings.items()
+        }
+
+        levels = self.columns["Course Level"]
+        self._has_level = np.fromiter((bool(level.strip()) for level in levels), dtype=bool, count=self.size)
+        self._level_values = levels
+        self._level_masks: Dict[Optional[Tuple[str, ...]], np.ndarray] = {}
+
+        self._token_rows: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._results: "OrderedDict[Tuple[str, Optional[Tuple[str, ...]]], np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _column(courses, column: str) -> np.ndarray:
+        if column not in courses:
+            return np.full(len(courses), "", dtype=object)
+        return courses[column].fillna("").astype(str).to_numpy(dtype=object)
+
+    def level_mask(self, allowed_levels: Optional[Sequence[str]]) -> np.ndarray:
+        """Rows with a non-empty level, optionally restricted to allowed_levels (cached)."""
+        key = tuple(sorted(allowed_levels)) if allowed_levels is not None else None
+        mask = self._level_masks.get(key)
+        if mask is None:
+            mask = self._has_level
+            if key is not None:
+                mask = mask & np.isin(self._level_values, list(key))
+            self._level_masks[key] = mask
+        return mask
+
+    def _rows_for_token(self, token: str) -> np.ndarray:
+        """Rows containing a token that has `token` as a substring."""
+        with self._lock:
+            rows = self._token_rows.get(token)
+            if rows is not None:
+                self._token_rows.move_to_end(token)
+                return rows
+        matches = [rows for vocab, rows in self._postings.items() if token in vocab]
+        if not matches:
+            rows = np.zeros(0, dtype=np.int32)
+        elif len(matches) == 1:
+            rows = matches[0]
+        else:
+            rows = np.unique(np.concatenate(matches))
+        self._remember(self._token_rows, token, rows)
+        return rows
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self._cache_size:
+                cache.popitem(last=False)
+
+    def _candidates(self, query: str) -> np.ndarray:
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            return np.arange(self.size, dtype=np.int32)
+        # Any row containing the query contains each query token inside one of
+        # its own tokens, so intersecting per-token postings loses nothing
+        rows = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            token_rows = self._rows_for_token(token)
+            rows = token_rows if rows is None else np.intersect1d(rows, token_rows, assume_unique=True)
+            if not len(rows):
+                break
+        return rows
+
+    def search_rows(self, topic: str, allowed_levels: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Row ids (masterdata order) whose search columns contain topic."""
+        query = topic.lower()
+        key = (query, tuple(sorted(allowed_levels)) if allowed_levels is not None else None)
+        with self._lock:
+            rows = self._results.get(key)
+            if rows is not None:
+                self._results.move_to_end(key)
+                return rows
+
+        candidates = self._candidates(query)
+        candidates = candidates[self.level_mask(allowed_levels)[candidates]]
+        search_text = self._search_text
+        rows = np.fromiter(
+            (row for row in candidates if any(query in field for field in search_text[row])),
+            dtype=np.int32,
+        )
+        self._remember(self._results, key, rows)
+        return rows
+
+    def search(self, topic: str, allowed_levels: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Fallback results as shared, read-only result dicts."""
+        records = self.records
+        return [records[row] for row in self.search_rows(topic, allowed_levels)]
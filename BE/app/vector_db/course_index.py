@@ -0,0 +1,299 @@
+"""Course recommendation index: embedding model, FAISS index and course masterdata.
+
+Nothing heavy happens at import time. The index is loaded either in the
+background at startup (COURSE_INDEX_MODE="warm") or on the first request
+("lazy"); "stub" mode skips the model and index entirely for tests. The FAISS
+file is memory-mapped read-only, so uvicorn workers on one host share its
+pages through the OS page cache instead of each holding a private copy.
+"""
+import asyncio
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.logging import get_logger
+from app.vector_db.course_catalog import CourseCatalog
+from app.vector_db.query_embeddings import QueryEmbedder
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+COURSE_COLUMNS = [
+    "Pathway Display Name",
+    "Skill/Topic Pathways",
+    "Collection Name",
+    "Category",
+    "Description",
+    "Pathway URL",
+    "Course Level",
+]
+
+
+class CourseIndexUnavailableError(RuntimeError):
+    """The course index failed to load or is not ready."""
+
+
+class CourseIndex:
+    """Lazily loaded FAISS course index with readiness tracking."""
+
+    def __init__(
+        self,
+        index_path: str,
+        masterdata_path: str,
+        model_name: str,
+        mode: str = "lazy",
+    ):
+        self.index_path = index_path
+        self.masterdata_path = masterdata_path
+        self.model_name = model_name
+        self.mode = mode
+        self.status = "cold"  # cold, loading, ready, failed, stub
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.embedding_model = None
+        self.query_embedder: Optional[QueryEmbedder] = None
+        self.skill_names: List[str] = []  # Skill catalog, pre-embedded after warm-up
+        self.vectorstore = None
+        self.documents: List[Any] = []  # langchain Documents by FAISS position
+        self._doc_levels = None
+        self._selectors: Dict[Optional[Tuple[str, ...]], Tuple[Any, int]] = {}
+        self.courses = None  # pandas DataFrame of the masterdata
+        self.catalog: Optional[CourseCatalog] = None  # keyword fallback over the masterdata
+        self._load_lock = threading.Lock()
+        self._warm_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "stub")
+
+    def health(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"status": self.status, "mode": self.mode}
+        if self.load_seconds is not None:
+            info["load_seconds"] = round(self.load_seconds, 2)
+        if self.error:
+            info["error"] = self.error
+        return info
+
+    def _read_faiss(self):
+        """Read index.faiss memory-mapped when the index type supports it."""
+        import faiss
+
+        path = os.path.join(self.index_path, "index.faiss")
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError as e:
+            logger.warning(f"FAISS mmap not supported for {path} ({e}); loading into memory")
+            return faiss.read_index(path)
+
+    def _load_stub(self) -> None:
+        import pandas as pd
+
+        self.courses = pd.DataFrame(columns=COURSE_COLUMNS)
+        self.catalog = CourseCatalog(self.courses)
+        self.status = "stub"
+
+    def load(self) -> None:
+        """Load model, index and masterdata (blocking; idempotent)."""
+        with self._load_lock:
+            if self.ready:
+                return
+            if self.mode == "stub":
+                self._load_stub()
+                return
+
+            self.status = "loading"
+            started = time.perf_counter()
+            try:
+                import pandas as pd
+                from langchain_community.vectorstores import FAISS
+                from langchain_huggingface import HuggingFaceEmbeddings
+
+                # Offline: only the locally cached (or local path) model, never the hub
+                model_kwargs = {"local_files_only": True} if settings.EMBEDDING_OFFLINE else {}
+                self.embedding_model = HuggingFaceEmbeddings(model_name=self.model_name, model_kwargs=model_kwargs)
+                self.query_embedder = QueryEmbedder(
+                    self.embedding_model.embed_documents,
+                    model_name=self.model_name,
+                    cache_path=settings.COURSE_QUERY_CACHE_PATH or None,
+                    max_items=settings.COURSE_QUERY_CACHE_SIZE,
+                    batch_window_ms=settings.COURSE_QUERY_BATCH_WINDOW_MS,
+                    max_batch=settings.COURSE_QUERY_MAX_BATCH,
+                )
+
+                with open(os.path.join(self.index_path, "index.pkl"), "rb") as f:
+                    docstore, index_to_docstore_id = pickle.load(f)
+                self.vectorstore = FAISS(
+                    embedding_function=self.embedding_model,
+                    index=self._read_faiss(),
+                    docstore=docstore,
+                    index_to_docstore_id=index_to_docstore_id,
+                )
+                self._index_documents()
+
+                self.courses = pd.read_excel(self.masterdata_path).fillna("")
+                self.catalog = CourseCatalog(self.courses)
+            except Exception as e:
+                self.status = "failed"
+                self.error = str(e)
+                logger.error(f"Course index failed to load: {e}")
+                raise CourseIndexUnavailableError(str(e)) from e
+
+            self.load_seconds = time.perf_counter() - started
+            self.status = "ready"
+            self.error = None
+            logger.info(f"Course index ready in {self.load_seconds:.2f}s")
+
+    async def warm_up(self) -> None:
+        """Load in a worker thread; concurrent callers share one load."""
+        if self.ready:
+            return
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(asyncio.to_thread(self.load))
+        try:
+            await asyncio.shield(self._warm_task)
+        except CourseIndexUnavailableError:
+            pass
+
+    def start_background_warm_up(self, preembed_skills: bool = False) -> None:
+        """Kick off loading (and optionally skill pre-embedding) without blocking startup."""
+        if not self.ready and self._warm_task is None:
+            self._warm_task = asyncio.create_task(asyncio.to_thread(self.load))
+            self._warm_task.add_done_callback(lambda task: task.exception())
+            if preembed_skills:
+                asyncio.create_task(self._preembed_after_warm_up())
+
+    async def _preembed_after_warm_up(self) -> None:
+        await self.warm_up()
+        if self.query_embedder is None:
+            return
+        try:
+            await self.preembed_skills()
+        except Exception as e:
+            logger.warning(f"Skill pre-embedding failed: {e}")
+
+    async def preembed_skills(self) -> int:
+        """Embed every Skill name into the query cache so catalog topics never hit the model."""
+        from sqlalchemy import select
+
+        from app.db.models import Skill
+        from app.db.session import async_session_maker
+
+        async with async_session_maker() as session:
+            names = (await session.execute(select(Skill.name))).scalars().all()
+        started = time.perf_counter()
+        count = await self.query_embedder.prime(names)
+        self.skill_names = list(names)
+        logger.info(f"Pre-embedded {count} skills in {time.perf_counter() - started:.2f}s")
+        return count
+
+    async def ensure_ready(self) -> "CourseIndex":
+        """Wait for the index, loading it on first use; raise if it failed."""
+        if not self.ready:
+            await self.warm_up()
+        if not self.ready:
+            raise CourseIndexUnavailableError(self.error or "course index not loaded")
+        return self
+
+    def similarity_search(self, query: str, k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Any, float]]:
+        """Vector search (blocking); empty in stub mode."""
+        if self.vectorstore is None:
+            return []
+        return self.vectorstore.similarity_search_with_score(query, k=k, filter=filter)
+
+    def _index_documents(self) -> None:
+        """Documents by FAISS position plus the per-position level array used for selectors."""
+        import numpy as np
+
+        docstore, positions = self.vectorstore.docstore, self.vectorstore.index_to_docstore_id
+        self.documents = [docstore.search(positions[i]) for i in range(len(positions))]
+        self._doc_levels = np.array(
+            [
+                doc.metadata.get("course_level", "").strip() if doc.metadata.get("type") == "resource" else ""
+                for doc in self.documents
+            ],
+            dtype=object,
+        )
+        self._selectors = {}
+
+    def _selector(self, allowed_levels: Optional[Sequence[str]]):
+        """(faiss ID selector, allowed count) for resources with a non-empty, allowed level (cached)."""
+        import faiss
+        import numpy as np
+
+        key = tuple(sorted(allowed_levels)) if allowed_levels is not None else None
+        cached = self._selectors.get(key)
+        if cached is None:
+            mask = self._doc_levels != ""
+            if key is not None:
+                mask &= np.isin(self._doc_levels, list(key))
+            ids = np.flatnonzero(mask).astype(np.int64)
+            cached = (faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids)), len(ids))
+            self._selectors[key] = cached
+        return cached
+
+    def search_by_vector(
+        self, vector, k: int = 10, allowed_levels: Optional[Sequence[str]] = None
+    ) -> List[Tuple[Any, float]]:
+        """Search only courses whose level is allowed (blocking).
+
+        The level restriction is applied inside FAISS through an ID selector,
+        so the top k come back in one pass instead of being post-filtered.
+        k shrinks to the size of the allowed set.
+        """
+        import faiss
+        import numpy as np
+
+        selector, allowed = self._selector(allowed_levels)
+        k = min(k, allowed)
+        if k == 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        try:
+            distances, positions = self.vectorstore.index.search(query, k, params=faiss.SearchParameters(sel=selector))
+        except (RuntimeError, TypeError) as e:
+            # Index types without selector support: filter inside the langchain scan instead
+            logger.warning(f"FAISS ID selector unsupported ({e}); using metadata filter")
+            levels = set(allowed_levels) if allowed_levels is not None else None
+            return self.vectorstore.similarity_search_with_score_by_vector(
+                query[0].tolist(), k,
+                filter=lambda md: bool(md.get("course_level", "").strip())
+                and (levels is None or md.get("course_level", "").strip() in levels),
+                fetch_k=self.vectorstore.index.ntotal,
+            )
+        return [
+            (self.documents[position], float(distance))
+            for distance, position in zip(distances[0], positions[0])
+            if position >= 0
+        ]
+
+    async def search_topic(
+        self, topic: str, k: int = 10, allowed_levels: Optional[Sequence[str]] = None
+    ) -> List[Tuple[Any, float]]:
+        """Level-filtered vector search with a cached, micro-batched query embedding."""
+        if self.vectorstore is None or self.query_embedder is None:
+            return []
+        vector = await self.query_embedder.embed(topic)
+        return await asyncio.to_thread(self.search_by_vector, vector, k, allowed_levels)
+
+    def close(self) -> None:
+        if self.query_embedder is not None:
+            self.query_embedder.close()
+
+
+_course_index: Optional[CourseIndex] = None
+
+
+def get_course_index() -> CourseIndex:
+    """Get the course index singleton (not loaded until warmed or first used)."""
+    global _course_index
+    if _course_index is None:
+        _course_index = CourseIndex(
+            index_path=settings.COURSE_INDEX_PATH,
+            masterdata_path=settings.COURSE_MASTERDATA_PATH,
+            model_name=settings.COURSE_EMBEDDING_MODEL,
+            mode=settings.COURSE_INDEX_MODE,
+        )
+    return _course_index
@@ -0,0 +1,284 @@
+"""Persisted JD match profiles and vectorized candidate ranking.
+
+A match profile is the part of a JD or job requisition that matching needs:
+canonical skills with their weight, priority and minimum proficiency, plus
+the experience range. It is built once when the JD or requisition is saved
+and stored in jd_match_profiles, so ranking never re-extracts or
+re-classifies the JD.
+
+Ranking scores every candidate against one profile with array operations:
+the union of all candidates' skills is compared with the required skills in
+one similarity matrix, candidate skills are flattened into (row, column,
+level) arrays, and per-requirement best matches are reduced per candidate
+with np.maximum.reduceat before a single weighted sum and argpartition.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.logging import get_logger
+from app.db.models import JDMatchProfile, JobDescription, JobRequisition
+from app.vector_db.skill_matcher import SkillMatcher, get_skill_matcher
+
+logger = get_logger(__name__)
+
+PROFICIENCY_LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3, "expert": 4}
+PROFICIENCY_WEIGHTS = {"beginner": 0.6, "intermediate": 1.0, "advanced": 1.2, "expert": 1.3}
+PRIORITY_WEIGHTS = {"must_have": 1.0, "nice_to_have": 0.5}
+
+SKILL_SCORE_WEIGHT = 0.85
+EXPERIENCE_SCORE_WEIGHT = 0.15
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+_YEARS_RANGE_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(?:\+|(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(?:years?|yrs?)", re.IGNORECASE
+)
+
+
+def proficiency_name(value: Any, default: str = "intermediate") -> str:
+    """Normalize a proficiency given as a name or a 1-5 number."""
+    if isinstance(value, str):
+        key = value.strip().lower()
+        if key in PROFICIENCY_LEVELS:
+            return key
+        value = parse_years(key)
+    if isinstance(value, (int, float)) and value > 0:
+        return ("beginner", "intermediate", "advanced", "expert")[min(int(value), 4) - 1]
+    return default
+
+
+def parse_years(value: Any) -> Optional[float]:
+    """First number in a free-text experience value such as "5 years"."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(str(value))
+    return float(match.group()) if match else None
+
+
+def _requirement(skill: str, spec: Any) -> Dict[str, Any]:
+    """One profile skill from a required_skills value (proficiency, number or dict)."""
+    priority = "must_have"
+    weight = None
+    if isinstance(spec, dict):
+        priority = spec.get("priority", priority)
+        weight = spec.get("weight")
+        spec = spec.get("min_proficiency", spec.get("proficiency", spec.get("level")))
+    level = proficiency_name(spec)
+    if priority not in PRIORITY_WEIGHTS:
+        priority = "must_have"
+    if weight is None:
+        weight = PROFICIENCY_WEIGHTS[level] * PRIORITY_WEIGHTS[priority]
+    return {"skill": skill, "min_proficiency": level, "priority": priority, "weight": float(weight)}
+
+
+def build_profile(
+    required_skills: Dict[str, Any],
+    min_years: Optional[float] = None,
+    max_years: Optional[float] = None,
+    experience_level: Optional[str] = None,
+    matcher: Optional[SkillMatcher] = None,
+) -> Dict[str, Any]:
+    """Profile fields for a {skill: proficiency | {min_proficiency, priority, weight}} mapping (blocking)."""
+    skills = [_requirement(skill, spec) for skill, spec in (required_skills or {}).items() if skill and skill.strip()]
+    canonical = (matcher or SkillMatcher()).canonicalize([s["skill"] for s in skills])
+    for item, (name, _) in zip(skills, canonical):
+        item["canonical"] = name or item["skill"]
+    return {
+        "skills": skills,
+        "min_experience_years": min_years,
+        "max_experience_years": max_years,
+        "experience_level": experience_level,
+    }
+
+
+def experience_range(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """Strongest "N years" / "N-M years" / "N+ years" requirement stated in a JD."""
+    ranges = [
+        (float(low), float(high) if high else None)
+        for low, high in _YEARS_RANGE_RE.findall(text or "")
+        if 0 < float(low) <= 40
+    ]
+    return max(ranges, key=lambda r: r[0]) if ranges else (None, None)
+
+
+def build_jd_profile(text: str, matcher: Optional[SkillMatcher] = None) -> Dict[str, Any]:
+    """Profile fields extracted from a JD's text (blocking)."""
+    from app.api.admin_skill_extraction import extract_skills_from_text_advanced
+
+    extracted = extract_skills_from_text_advanced(text or "")
+    min_years, max_years = experience_range(text)
+    return build_profile(
+        {skill: proficiency for skill, (proficiency, _, _) in extracted.items()},
+        min_years, max_years, matcher=matcher,
+    )
+
+
+async def save_match_profile(
+    db: AsyncSession, source_type: str, source_id: str, fields: Dict[str, Any]
+) -> JDMatchProfile:
+    """Insert or replace the profile for a source and commit."""
+    result = await db.execute(
+        select(JDMatchProfile).where(
+            JDMatchProfile.source_type == source_type, JDMatchProfile.source_id == source_id
+        )
+    )
+    profile = result.scalar_one_or_none()
+    if profile is None:
+        profile = JDMatchProfile(source_type=source_type, source_id=source_id)
+        db.add(profile)
+    for key, value in fields.items():
+        setattr(profile, key, value)
+    await db.commit()
+    await db.refresh(profile)
+    return profile
+
+
+async def refresh_requisition_profile(db: AsyncSession, requisition: JobRequisition) -> JDMatchProfile:
+    """Rebuild a requisition's profile; skills come from its linked JD when it lists none."""
+    matcher = await run_in_threadpool(get_skill_matcher)
+    if not requisition.required_skills and requisition.jd_id:
+        result = await db.execute(select(JobDescription.extracted_text).where(JobDescription.jd_id == requisition.jd_id))
+        fields = await run_in_threadpool(build_jd_profile, result.scalar_one_or_none() or "", matcher)
+        fields["experience_level"] = requisition.experience_level
+        if requisition.min_experience_years is not None or requisition.max_experience_years is not None:
+            fields["min_experience_years"] = requisition.min_experience_years
+            fields["max_experience_years"] = requisition.max_experience_years
+    else:
+        fields = await run_in_threadpool(
+            build_profile,
+            requisition.required_skills,
+            requisition.min_experience_years,
+            requisition.max_experience_years,
+            requisition.experience_level,
+            matcher,
+        )
+    return await save_match_profile(db, "requisition", requisition.requisition_id, fields)
+
+
+async def refresh_jd_profile(db: AsyncSession, jd: JobDescription) -> JDMatchProfile:
+    """Rebuild a JD's profile from its extracted text."""
+    matcher = await run_in_threadpool(get_skill_matcher)
+    fields = await run_in_threadpool(build_jd_profile, jd.extracted_text, matcher)
+    return await save_match_profile(db, "jd", jd.jd_id, fields)
+
+
+async def try_refresh_profile(db: AsyncSession, source) -> Optional[JDMatchProfile]:
+    """Refresh after a save without failing the save; ranking rebuilds a missing profile on demand."""
+    is_requisition = isinstance(source, JobRequisition)
+    label = source.requisition_id if is_requisition else source.jd_id
+    try:
+        if is_requisition:
+            return await refresh_requisition_profile(db, source)
+        return await refresh_jd_profile(db, source)
+    except Exception as e:
+        await db.rollback()
+        await db.refresh(source)  # rollback expired the already-committed source
+        logger.warning(f"Failed to build match profile for {label}: {e}")
+        return None
+
+
+def _score_arrays(
+    profile_skills: Sequence[Dict[str, Any]],
+    min_years: Optional[float],
+    candidates: Sequence[Tuple[Dict[str, Any], Any]],
+    matcher: SkillMatcher,
+) -> Dict[str, np.ndarray]:
+    """Per-candidate score arrays plus the (requirement, candidate) best-match matrix."""
+    count = len(candidates)
+    required = [s.get("canonical") or s["skill"] for s in profile_skills]
+    weights = np.array([s.get("weight", 1.0) for s in profile_skills], dtype=np.float32)
+    req_levels = np.array(
+        [PROFICIENCY_LEVELS[proficiency_name(s.get("min_proficiency"))] for s in profile_skills], dtype=np.float32
+    )
+
+    # Flatten candidate skills into parallel arrays, rows in ascending order
+    column: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    levels: List[int] = []
+    for row, (skills, _) in enumerate(candidates):
+        for name, proficiency in (skills or {}).items():
+            rows.append(row)
+            cols.append(column.setdefault(name, len(column)))
+            levels.append(PROFICIENCY_LEVELS[proficiency_name(proficiency)])
+
+    best = np.zeros((len(required), count), dtype=np.float32)
+    if required and rows:
+        sims = matcher.similarity(required, list(column))
+        sims = np.where(sims >= matcher.threshold, sims, 0.0).astype(np.float32)
+        rows_arr = np.asarray(rows, dtype=np.int64)
+        level_fit = np.minimum(1.0, np.asarray(levels, dtype=np.float32)[None, :] / req_levels[:, None])
+        contrib = sims[:, np.asarray(cols, dtype=np.int64)] * level_fit
+        starts = np.flatnonzero(np.r_[True, rows_arr[1:] != rows_arr[:-1]])
+        best[:, rows_arr[starts]] = np.maximum.reduceat(contrib, starts, axis=1)
+
+    total_weight = float(weights.sum())
+    skill_score = weights @ best / total_weight if total_weight else np.zeros(count, dtype=np.float32)
+
+    years = np.array([parse_years(exp) for _, exp in candidates], dtype=np.float64)  # None -> nan
+    if min_years:
+        experience_score = np.clip(np.nan_to_num(years, nan=0.0) / float(min_years), 0.0, 1.0)
+    else:
+        experience_score = np.ones(count)
+    total = 100.0 * (SKILL_SCORE_WEIGHT * skill_score + EXPERIENCE_SCORE_WEIGHT * experience_score)
+    return {
+        "total": total, "skill_score": skill_score, "experience_score": experience_score,
+        "years": years, "best": best,
+    }
+
+
+def _result(arrays: Dict[str, np.ndarray], profile_skills: Sequence[Dict[str, Any]], i: int) -> Dict[str, Any]:
+    best = arrays["best"][:, i]
+    years = arrays["years"][i]
+    return {
+        "index": int(i),
+        "score": round(float(arrays["total"][i]), 2),
+        "skill_score": round(float(arrays["skill_score"][i]) * 100, 2),
+        "experience_score": round(float(arrays["experience_score"][i]) * 100, 2),
+        "experience_years": None if np.isnan(years) else float(years),
+        "matched_skills": [profile_skills[r]["skill"] for r in np.flatnonzero(best > 0)],
+        "missing_skills": [profile_skills[r]["skill"] for r in np.flatnonzero(best <= 0)],
+    }
+
+
+def score_candidates(
+    profile_skills: Sequence[Dict[str, Any]],
+    min_years: Optional[float],
+    candidates: Sequence[Tuple[Dict[str, Any], Any]],
+    matcher: SkillMatcher,
+) -> List[Dict[str, Any]]:
+    """Scores for every candidate, in input order (blocking).
+
+    candidates are (skills {name: proficiency}, experience_years) pairs; each
+    result holds the candidate's position in that sequence, its scores and
+    the matched / missing profile skills.
+    """
+    if not candidates:
+        return []
+    arrays = _score_arrays(profile_skills, min_years, candidates, matcher)
+    return [_result(arrays, profile_skills, i) for i in range(len(candidates))]
+
+
+def rank_candidates(
+    profile_skills: Sequence[Dict[str, Any]],
+    min_years: Optional[float],
+    candidates: Sequence[Tuple[Dict[str, Any], Any]],
+    matcher: SkillMatcher,
+    top_n: int = 50,
+) -> List[Dict[str, Any]]:
+    """The top_n results of score_candidates, best first (blocking)."""
+    count = len(candidates)
+    if not count or top_n <= 0:
+        return []
+    arrays = _score_arrays(profile_skills, min_years, candidates, matcher)
+    total = arrays["total"]
+    top_n = min(top_n, count)
+    top = np.argpartition(-total, top_n - 1)[:top_n]
+    top = top[np.argsort(-total[top], kind="stable")]
+    return [_result(arrays, profile_skills, i) for i in top]
@@ -0,0 +1,200 @@
+"""Cached, micro-batched query embeddings for course search.
+
+Topics come from a small skill catalog and repeat heavily, so vectors are
+kept in an in-process LRU backed by a SQLite file shared by all workers.
+Cache misses arriving within a short window are embedded together in one
+model forward pass; identical concurrent topics share a single future.
+"""
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+EmbedBatch = Callable[[List[str]], List[List[float]]]
+
+
+class QueryEmbedder:
+    """Embed query strings with LRU + on-disk caching and request batching."""
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatch,
+        model_name: str,
+        cache_path: Optional[str] = None,
+        max_items: int = 4096,
+        batch_window_ms: float = 5.0,
+        max_batch: int = 64,
+    ):
+        self._embed_batch = embed_batch
+        self.model_name = model_name
+        self.max_items = max_items
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "batches": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if cache_path:
+            try:
+                self._db = sqlite3.connect(cache_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    "model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (model, query))"
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Query embedding disk cache disabled ({cache_path}): {e}")
+                self._db = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # The MiniLM tokenizer is uncased, so case and spacing do not change the vector
+        return " ".join(text.lower().split())
+
+    # ---- LRU -------------------------------------------------------------
+
+    def _lru_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lru_lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: np.ndarray) -> None:
+        with self._lru_lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    # ---- Disk ------------------------------------------------------------
+
+    def _disk_get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._db is None or not keys:
+            return {}
+        found: Dict[str, np.ndarray] = {}
+        with self._db_lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT query, vector FROM query_embeddings WHERE model = ? "
+                    f"AND query IN ({','.join('?' * len(chunk))})",
+                    [self.model_name, *chunk],
+                ).fetchall()
+                for query, blob in rows:
+                    found[query] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _disk_put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if self._db is None or not items:
+            return
+        with self._db_lock:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings (model, query, vector) VALUES (?, ?, ?)",
+                    [(self.model_name, key, vector.tobytes()) for key, vector in items.items()],
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist query embeddings: {e}")
+
+    # ---- Embedding ---------------------------------------------------------
+
+    def embed_many(self, texts: Iterable[str]) -> List[np.ndarray]:
+        """Embed texts (blocking), using and filling both cache levels."""
+        keys = [self.normalize(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            vector = self._lru_get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                vectors[key] = vector
+                self.stats["hits"] += 1
+
+        if missing:
+            from_disk = self._disk_get_many(missing)
+            self.stats["disk_hits"] += len(from_disk)
+            for key, vector in from_disk.items():
+                vectors[key] = vector
+                self._lru_put(key, vector)
+
+            to_embed = [key for key in missing if key not in from_disk]
+            if to_embed:
+                self.stats["misses"] += len(to_embed)
+                self.stats["batches"] += 1
+                embedded = np.asarray(self._embed_batch(to_embed), dtype=np.float32)
+                fresh = dict(zip(to_embed, embedded))
+                for key, vector in fresh.items():
+                    vectors[key] = vector
+                    self._lru_put(key, vector)
+                self._disk_put_many(fresh)
+
+        return [vectors[key] for key in keys]
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one query; cache misses are batched with concurrent requests."""
+        key = self.normalize(text)
+        vector = self._lru_get(key)
+        if vector is not None:
+            self.stats["hits"] += 1
+            return vector
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._start_flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._start_flush)
+        # Shield so one cancelled request does not cancel others waiting on the batch
+        return await asyncio.shield(future)
+
+    def _start_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.get_running_loop().create_task(self._flush(batch))
+
+    async def _flush(self, batch: Dict[str, asyncio.Future]) -> None:
+        keys = list(batch)
+        try:
+            vectors = await asyncio.to_thread(self.embed_many, keys)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, vector in zip(keys, vectors):
+            future = batch[key]
+            if not future.done():
+                future.set_result(vector)
+
+    async def prime(self, texts: Iterable[str], chunk_size: int = 256) -> int:
+        """Pre-embed texts (e.g. the skill catalog) in chunks; returns the count."""
+        texts = [text for text in texts if text and text.strip()]
+        for start in range(0, len(texts), chunk_size):
+            await asyncio.to_thread(self.embed_many, texts[start:start + chunk_size])
+        return len(texts)
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,151 @@
+"""Semantic skill matching on the local sentence-transformer model.
+
+Skills are compared by cosine similarity of their embeddings instead of
+exact or substring equality, so "ReactJS" matches "React" and "Postgres"
+matches "PostgreSQL". Vectors come from the course index's cached query
+embedder (the same MiniLM model, with the Skill table pre-embedded at
+startup); the Skill catalog is held as one normalized matrix so every
+skill can also be mapped to its nearest canonical catalog entry. All
+comparisons are single NumPy matrix products, so ranking many candidates
+against one JD (see match_profiles) embeds the union of their skills once.
+
+Without a model (stub mode, or the index failed to load) matching degrades
+to case-insensitive exact equality.
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+EmbedMany = Callable[[List[str]], List[np.ndarray]]
+
+
+@dataclass
+class SkillMatchResult:
+    skill: str  # the required skill (e.g. from the JD)
+    matched: Optional[str]  # best offered skill (e.g. from the CV) at or above the threshold
+    score: float  # similarity in [0, 1]; 1.0 for an exact match
+
+
+def _key(skill: str) -> str:
+    return " ".join(skill.lower().split())
+
+
+class SkillMatcher:
+    """Vectorized skill similarity with an optional canonical Skill catalog."""
+
+    def __init__(self, embed: Optional[EmbedMany] = None, threshold: float = 0.75):
+        self.embed = embed
+        self.threshold = threshold
+        self.catalog: List[str] = []
+        self._catalog_matrix: Optional[np.ndarray] = None
+
+    def _matrix(self, skills: Sequence[str]) -> np.ndarray:
+        """L2-normalized embedding matrix, one row per skill."""
+        if not skills:
+            return np.zeros((0, 0), dtype=np.float32)
+        matrix = np.vstack(self.embed(list(skills))).astype(np.float32, copy=False)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def set_catalog(self, names: Sequence[str]) -> None:
+        """Embed the canonical skill names once (blocking)."""
+        self.catalog = list(dict.fromkeys(name for name in names if name and name.strip()))
+        self._catalog_matrix = self._matrix(self.catalog) if self.embed and self.catalog else None
+        logger.info(f"Skill matcher catalog: {len(self.catalog)} skills")
+
+    def _canonical(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest catalog index and similarity per row (index -1 when below threshold)."""
+        sims = matrix @ self._catalog_matrix.T
+        best = sims.argmax(axis=1)
+        scores = sims[np.arange(len(best)), best]
+        return np.where(scores >= self.threshold, best, -1), scores
+
+    def canonicalize(self, skills: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """Map skills to their nearest canonical catalog skill with its similarity."""
+        if not skills:
+            return []
+        if self.embed is None or self._catalog_matrix is None:
+            lookup = {_key(name): name for name in self.catalog}
+            return [(lookup.get(_key(skill)), 1.0 if _key(skill) in lookup else 0.0) for skill in skills]
+        ids, scores = self._canonical(self._matrix(skills))
+        return [
+            (self.catalog[i] if i >= 0 else None, float(score))
+            for i, score in zip(ids, scores)
+        ]
+
+    def similarity(self, required: Sequence[str], offered: Sequence[str]) -> np.ndarray:
+        """(len(required), len(offered)) similarity matrix in [0, 1].
+
+        Pairs that map to the same canonical catalog skill score at least the
+        weaker of their two canonical similarities; exact names score 1.0.
+        """
+        required_keys = np.array([_key(skill) for skill in required], dtype=object)
+        offered_keys = np.array([_key(skill) for skill in offered], dtype=object)
+        exact = np.equal.outer(required_keys, offered_keys).astype(np.float32).reshape(len(required), len(offered))
+        if self.embed is None or not len(required) or not len(offered):
+            return exact
+
+        matrix = self._matrix(list(required) + list(offered))
+        req, off = matrix[:len(required)], matrix[len(required):]
+        sims = req @ off.T
+        if self._catalog_matrix is not None:
+            ids, scores = self._canonical(matrix)
+            req_ids, off_ids = ids[:len(required)], ids[len(required):]
+            same = (req_ids[:, None] == off_ids[None, :]) & (req_ids[:, None] >= 0)
+            canonical = np.minimum(scores[:len(required), None], scores[None, len(required):])
+            sims = np.maximum(sims, np.where(same, canonical, 0.0))
+        return np.clip(np.maximum(sims, exact), 0.0, 1.0)
+
+    def _best(self, required: Sequence[str], offered: Sequence[str], sims: np.ndarray) -> List[SkillMatchResult]:
+        if not len(offered):
+            return [SkillMatchResult(skill, None, 0.0) for skill in required]
+        best = sims.argmax(axis=1)
+        scores = sims[np.arange(len(required)), best]
+        return [
+            SkillMatchResult(skill, offered[j] if score >= self.threshold else None, round(float(score), 4))
+            for skill, j, score in zip(required, best, scores)
+        ]
+
+    def match(self, required: Sequence[str], offered: Sequence[str]) -> List[SkillMatchResult]:
+        """Best offered skill for each required skill (blocking)."""
+        required, offered = list(required), list(offered)
+        return self._best(required, offered, self.similarity(required, offered))
+
+
+_skill_matcher: Optional[SkillMatcher] = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Get the skill matcher singleton, binding the course index model once it is loaded."""
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = SkillMatcher(threshold=settings.SKILL_MATCH_THRESHOLD)
+
+    from app.vector_db.course_index import get_course_index
+
+    course_index = get_course_index()
+    if _skill_matcher.embed is None and course_index.query_embedder is not None:
+        _skill_matcher.embed = course_index.query_embedder.embed_many
+    if course_index.skill_names and not _skill_matcher.catalog:
+        _skill_matcher.set_catalog(course_index.skill_names)
+    return _skill_matcher
+
+
+async def load_skill_matcher() -> SkillMatcher:
+    """Wait for the embedding model if possible; fall back to exact matching if it is unavailable."""
+    from starlette.concurrency import run_in_threadpool
+
+    from app.vector_db.course_index import CourseIndexUnavailableError, get_course_index
+
+    try:
+        await get_course_index().ensure_ready()
+    except CourseIndexUnavailableError as e:
+        logger.warning(f"Semantic skill matching unavailable, using exact matching: {e}")
+    return await run_in_threadpool(get_skill_matcher)
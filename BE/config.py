@@ -121,6 +121,41 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = ""
     LLM_PROVIDER: str = "groq"  # "groq", "openai", "anthropic", "ollama"
     LLM_API_KEY: str = ""  # API key for the chosen provider
+    OPENAI_API_KEY: str = ""
+    ANTHROPIC_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com"
+    ANTHROPIC_BASE_URL: str = "https://api.anthropic.com"
+    GROQ_BASE_URL: str = "https://api.groq.com/openai"
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "mistral"
+    
+    # LLM Gateway (shared pooled HTTP clients)
+    LLM_HTTP_TIMEOUT_SECONDS: float = 30.0
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_CONCURRENCY: int = 8  # In-flight requests per provider
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_MAX_BACKOFF_SECONDS: float = 8.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # LLM Routing (hedged multi-provider requests)
+    LLM_ROUTING_PROVIDERS: list[str] = []  # e.g. ["groq", "openai"]; empty disables routing
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_DEFAULT_DELAY_MS: float = 4000.0  # Used until enough latency samples exist
+    LLM_HEDGE_MIN_DELAY_MS: float = 250.0
+    LLM_ROUTER_MIN_SAMPLES: int = 20
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5
+    LLM_LOCAL_FALLBACK: str = "regex"  # "ollama", "regex" or "none"
+    
+    # Approximate input-token budget for document text in a single prompt
+    LLM_INPUT_TOKEN_BUDGETS: dict[str, int] = {
+        "openai": 6000,
+        "anthropic": 8000,
+        "groq": 4000,
+        "ollama": 1000,
+    }
     MAX_QUESTIONS_PER_TEST: int = 20
     QUESTION_GENERATION_TIMEOUT: int = 300  # 5 minutes
     
@@ -128,12 +163,60 @@ class Settings(BaseSettings):
     TEST_DURATION_MINUTES: int = 30
     QUESTION_TIMEOUT_SECONDS: int = 30  # Auto-progress after 30 seconds
     SCORE_RELEASE_DELAY_HOURS: int = 24
+    TEST_DEADLINE_GRACE_SECONDS: int = 30  # network slack after the test timer runs out
+    ANSWER_JOURNAL_ENABLED: bool = False  # buffer answer saves in Redis (initializes Redis at startup)
+    ANSWER_JOURNAL_FLUSH_SECONDS: float = 2.0
+    ANSWER_JOURNAL_FLUSH_BATCH: int = 500  # sessions per flush statement
+    
+    # Question payload cache (pre-serialized questions for test start)
+    QUESTION_CACHE_SIZE: int = 512  # question sets kept per process
+    QUESTION_CACHE_MEMORY_TTL_SECONDS: int = 300  # bounds staleness across workers
+    QUESTION_CACHE_REDIS_TTL_SECONDS: int = 86400
+    QUESTION_CACHE_USE_REDIS: bool = False  # share payloads across workers (initializes Redis at startup)
+    QUESTION_SHUFFLE_ENABLED: bool = False  # per-session question order
+    
+    # Item analytics (nightly per-question statistics)
+    ITEM_ANALYTICS_HOUR_UTC: int = 2
+    ITEM_ANALYTICS_MIN_RESPONSES: int = 20  # items with fewer responses are never flagged
+    ITEM_ANALYTICS_MIN_P_VALUE: float = 0.2  # below: too hard (or mis-keyed)
+    ITEM_ANALYTICS_MAX_P_VALUE: float = 0.95  # above: too easy
+    ITEM_ANALYTICS_MIN_POINT_BISERIAL: float = 0.1  # below: does not separate strong from weak candidates
+    
+    # Proctoring event ingestion (batched endpoint)
+    PROCTORING_MAX_BATCH_EVENTS: int = 500  # events per request
+    PROCTORING_BUFFER_MAX_EVENTS: int = 50000  # queued events per process before clients are told to back off
+    PROCTORING_FLUSH_BATCH: int = 1000  # rows per INSERT
+    PROCTORING_FLUSH_SECONDS: float = 1.0
+    PROCTORING_RETRY_AFTER_SECONDS: int = 5
+    PROCTORING_RISK_ENABLED: bool = False  # rolling per-session risk scores (initializes Redis at startup)
+    PROCTORING_RISK_HALF_LIFE_SECONDS: float = 300.0
     
     # MVP-1 Settings
     TOPIC_DEFAULT: str = "agentic_ai"
     DIFFICULTY_LEVELS: list[str] = ["basic", "intermediate", "advanced"]
     AUTO_PROGRESS_ENABLED: bool = True
     
+    # Course Recommendations
+    COURSE_INDEX_PATH: str = "data/course_faiss_index"
+    COURSE_MASTERDATA_PATH: str = "data/Courses Masterdata.xlsx"
+    COURSE_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    COURSE_INDEX_MODE: str = "warm"  # "warm" (background load at startup), "lazy" (first request) or "stub" (tests)
+    COURSE_QUERY_CACHE_PATH: str = "data/course_query_embeddings.sqlite3"  # empty disables the disk cache
+    COURSE_QUERY_CACHE_SIZE: int = 4096  # in-memory LRU entries
+    COURSE_QUERY_BATCH_WINDOW_MS: float = 5.0  # wait this long to batch concurrent cache misses
+    COURSE_QUERY_MAX_BATCH: int = 64
+    COURSE_PREEMBED_SKILLS: bool = True  # embed the Skill table once the index is warm
+    EMBEDDING_OFFLINE: bool = False  # load COURSE_EMBEDDING_MODEL from the local cache/path only
+    SKILL_MATCH_THRESHOLD: float = 0.75  # cosine similarity for two skills to count as a match
+    
+    # CV Rendering
+    CV_DOCX_TEMPLATE_PATH: Optional[str] = None  # Pre-styled .docx; built-in styles when unset
+    CV_TEMPLATE_VERSION: str = "1"  # Bump when the template or renderer output changes
+    CV_RENDER_WORKERS: int = 2  # Process pool size for batch rendering
+    CV_RENDER_BATCH_MAX: int = 200
+    CV_ARTIFACT_PREFIX: str = "cv-artifacts"  # S3 prefix for rendered CV artifacts
+    CV_ARTIFACT_URL_EXPIRY_SECONDS: int = 3600
+    
     # File Upload
     MAX_UPLOAD_SIZE_MB: int = 10
     ALLOWED_EXTENSIONS: list[str] = [".pdf", ".docx", ".txt"]
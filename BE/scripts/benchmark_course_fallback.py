@@ -0,0 +1,101 @@
+"""
+Benchmark the keyword fallback of /recommended-courses/.
+
+Usage:
+    python scripts/benchmark_course_fallback.py                                  # synthetic catalog
+    python scripts/benchmark_course_fallback.py --masterdata "data/Courses Masterdata.xlsx"
+
+Compares the previous pandas scan (three str.contains passes + iterrows) with
+the pre-indexed CourseCatalog, cold (first query) and warm (repeat query),
+and checks both return the same courses.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from app.api.recommended_courses import get_allowed_levels  # noqa: E402
+from app.vector_db.course_catalog import CourseCatalog  # noqa: E402
+
+TOPICS = ["Python", "Java", "Machine Learning", "Docker", "Kubernetes", "React", "SQL", "AWS", "Go", "Data"]
+LEVELS = ["Beginner", "Intermediate", "Advanced", "Beginner/Intermediate", "Intermediate/Advanced", ""]
+
+
+def synthetic_courses(rng: random.Random, rows: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "Pathway Display Name": f"{rng.choice(TOPICS)} {rng.choice(['Essentials', 'Deep Dive', 'Bootcamp'])} {i}",
+            "Skill/Topic Pathways": " / ".join(rng.sample(TOPICS, 2)),
+            "Collection Name": f"Collection {i % 50}",
+            "Category": "Technology",
+            "Description": "Hands-on course with labs and assessments.",
+            "Pathway URL": f"https://learning.example.com/pathways/{i}",
+            "Course Level": rng.choice(LEVELS),
+        }
+        for i in range(rows)
+    ])
+
+
+def legacy_fallback(df_courses: pd.DataFrame, topic: str, level: str):
+    topic_lower = topic.lower()
+    filtered = df_courses[
+        df_courses['Skill/Topic Pathways'].str.lower().str.contains(topic_lower, na=False)
+        | df_courses['Pathway Display Name'].str.lower().str.contains(topic_lower, na=False)
+        | df_courses['Collection Name'].str.lower().str.contains(topic_lower, na=False)
+    ]
+    filtered = filtered[filtered['Course Level'].str.strip() != ""]
+    if level:
+        filtered = filtered[filtered['Course Level'].isin(get_allowed_levels(level))]
+    return [row.get('Pathway Display Name', "") or "" for _, row in filtered.iterrows()]
+
+
+def per_query_us(func, queries, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for topic, level in queries:
+            func(topic, level)
+    return (time.perf_counter() - start) / (len(queries) * repeat) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark course fallback search")
+    parser.add_argument("--masterdata", help="Courses masterdata .xlsx (default: synthetic catalog)")
+    parser.add_argument("--rows", type=int, default=5000, help="Synthetic catalog size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.masterdata:
+        courses = pd.read_excel(args.masterdata).fillna("")
+    else:
+        courses = synthetic_courses(random.Random(args.seed), args.rows)
+
+    start = time.perf_counter()
+    catalog = CourseCatalog(courses)
+    print(f"Catalog: {len(courses)} rows, built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = [(topic, level) for topic in TOPICS for level in ("Beginner", "Intermediate", "Advanced")]
+
+    legacy_us = per_query_us(lambda t, l: legacy_fallback(courses, t, l), queries)
+    cold_us = per_query_us(lambda t, l: catalog.search(t, get_allowed_levels(l)), queries)
+    warm_us = per_query_us(lambda t, l: catalog.search(t, get_allowed_levels(l)), queries, repeat=100)
+
+    print(f"{'legacy pandas scan':<24} {legacy_us:12.1f} us/query")
+    print(f"{'catalog (cold)':<24} {cold_us:12.1f} us/query")
+    print(f"{'catalog (warm)':<24} {warm_us:12.1f} us/query")
+
+    mismatched = sum(
+        1 for topic, level in queries
+        if legacy_fallback(courses, topic, level)
+        != [record["name"] for record in catalog.search(topic, get_allowed_levels(level))]
+    )
+    print(f"Queries with different results: {mismatched}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark CVParser section detection against the previous per-line loop.
+
+Usage:
+    python scripts/benchmark_cv_parser.py                    # synthetic corpus
+    python scripts/benchmark_cv_parser.py --corpus ./cvs     # directory of .txt CVs
+
+Reports documents/second for the legacy detector (re.search built from
+strings per line, section type and pattern) and the compiled single-scan
+detector, plus how many documents end up with different section sets.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.cv_parser import CVParser  # noqa: E402
+from benchmark_pii import load_corpus, synthetic_cv  # noqa: E402
+
+
+def legacy_section_starts(lines: List[str]) -> Dict[str, int]:
+    """The previous detector: last matching line wins per section type."""
+    section_starts = {}
+    for line_idx, line in enumerate(lines):
+        line_lower = line.lower().strip()
+        if not line_lower:
+            continue
+        for section_type, patterns in CVParser.SECTION_PATTERNS.items():
+            for pattern in patterns:
+                if re.search(r'\b' + pattern + r'\b', line_lower):
+                    section_starts[section_type] = line_idx
+                    break
+    return section_starts
+
+
+def synthetic_full_cv(rng: random.Random) -> str:
+    body = synthetic_cv(rng)
+    return "\n".join([
+        body,
+        "",
+        "Education",
+        "B.Tech Computer Science",
+        "National Institute of Technology",
+        "2012",
+        "",
+        "Certifications:",
+        "AWS Certified Solutions Architect",
+        "",
+        "Projects",
+        "Resume parser - built a profile extraction service with strong skills matching",
+        "",
+        "Languages",
+        "English, Hindi",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CV section detection")
+    parser.add_argument("--corpus", help="Directory of .txt CVs (default: synthetic corpus)")
+    parser.add_argument("--docs", type=int, default=1000, help="Synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.corpus:
+        docs = load_corpus(args.corpus)
+    else:
+        rng = random.Random(args.seed)
+        docs = [synthetic_full_cv(rng) for _ in range(args.docs)]
+    if not docs:
+        print("No documents to benchmark")
+        return
+
+    split_docs = [doc.split("\n") for doc in docs]
+    total_lines = sum(len(lines) for lines in split_docs)
+    print(f"Corpus: {len(docs)} documents, {total_lines} lines")
+
+    start = time.perf_counter()
+    legacy = [legacy_section_starts(lines) for lines in split_docs]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    spans = [CVParser.find_section_spans(doc) for doc in docs]
+    compiled_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for doc in docs:
+        cv_parser = CVParser(doc)
+        cv_parser.parse()
+        cv_parser.rebuild_cv({})
+    parse_s = time.perf_counter() - start
+
+    print(f"{'legacy per-line loop':<24} {legacy_s * 1000:9.1f} ms  {len(docs) / legacy_s:10.0f} docs/s")
+    print(f"{'compiled single scan':<24} {compiled_s * 1000:9.1f} ms  {len(docs) / compiled_s:10.0f} docs/s")
+    print(f"{'full parse + rebuild':<24} {parse_s * 1000:9.1f} ms  {len(docs) / parse_s:10.0f} docs/s")
+
+    differing = sum(
+        1 for old, new in zip(legacy, spans)
+        if set(old) != {section_type for section_type, _, _ in new}
+    )
+    print(f"Documents with a different section set: {differing}/{len(docs)}")
+
+
+if __name__ == "__main__":
+    main()
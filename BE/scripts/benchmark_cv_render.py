@@ -0,0 +1,87 @@
+"""
+Benchmark DOCX CV rendering throughput.
+
+Usage:
+    python scripts/benchmark_cv_render.py --docs 200 --workers 4
+
+Reports documents/second for in-process rendering with the cached template
+and for the process-pool batch API streaming into a zip archive.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.cv_formatter import (  # noqa: E402
+    CVFormatter,
+    close_render_pool,
+    iter_docx_zip,
+    render_cv_batch,
+    render_cv_docx,
+)
+
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "React", "AWS", "Redis", "Kafka", "Go"]
+
+
+def synthetic_cv_data(rng: random.Random, index: int) -> dict:
+    return {
+        "name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "phone": "+1 555 010 0000",
+        "location": "Remote",
+        "summary": "Backend engineer focused on APIs, data pipelines and cloud infrastructure. " * 3,
+        "experience": [
+            {
+                "company": f"Company {j}",
+                "role": "Senior Engineer",
+                "dates": f"{2010 + j} - {2012 + j}",
+                "description": "Built and operated services handling millions of requests per day. " * 2,
+            }
+            for j in range(rng.randint(3, 7))
+        ],
+        "education": [{"degree": "B.Tech Computer Science", "institution": "NIT", "year": "2010"}],
+        "skills": rng.sample(SKILLS, 6),
+        "certifications": ["AWS Certified Solutions Architect"],
+        "projects": [{"project": "Resume parser", "description": "Section-aware CV parsing service"}],
+    }
+
+
+def report(label: str, docs: int, elapsed: float) -> None:
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms  {docs / elapsed:8.1f} docs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX CV rendering")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [(f"CV_{i}", synthetic_cv_data(rng, i)) for i in range(args.docs)]
+
+    start = time.perf_counter()
+    CVFormatter.load_template()
+    print(f"Template load: {(time.perf_counter() - start) * 1000:.1f} ms (once per process)")
+
+    start = time.perf_counter()
+    for _, cv_data in items:
+        render_cv_docx(cv_data)
+    report("in-process (cached template)", args.docs, time.perf_counter() - start)
+
+    if args.workers > 1:
+        # Warm the pool so worker start-up is not counted
+        list(render_cv_batch(items[: args.workers], workers=args.workers))
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_docx_zip(render_cv_batch(items, workers=args.workers)))
+        report(f"batch zip ({args.workers} workers)", args.docs, time.perf_counter() - start)
+        print(f"Zip size: {size / 1024:.0f} KiB")
+        close_render_pool()
+
+
+if __name__ == "__main__":
+    main()
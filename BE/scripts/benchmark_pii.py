@@ -0,0 +1,134 @@
+"""
+Benchmark PII redaction against the previous multi-pass implementation.
+
+Usage:
+    python scripts/benchmark_pii.py                      # synthetic corpus
+    python scripts/benchmark_pii.py --corpus ./cvs       # directory of .txt CVs
+    python scripts/benchmark_pii.py --docs 2000 --workers 4
+
+Reports documents/second for the legacy function, the single-pass engine
+and the batch API, plus how many documents produce different output.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.pii import redact_pii, redact_pii_batch  # noqa: E402
+
+
+LEGACY_PHONE_RE = re.compile(r"(\+?\d[\d\-().\s]{6,}\d)")
+LEGACY_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LEGACY_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+LEGACY_COMPANY_RE = re.compile(r"\b([A-Z][A-Za-z0-9&\.-]{1,}\s+(?:Inc|LLC|Ltd|Corporation|Corp|Company|Co\.?))\b")
+
+
+def legacy_redact_pii(text: str) -> Tuple[str, dict]:
+    """The previous implementation: findall + sub per pattern, then label passes."""
+    emails = LEGACY_EMAIL_RE.findall(text)
+    phones = LEGACY_PHONE_RE.findall(text)
+    urls = LEGACY_URL_RE.findall(text)
+    companies = LEGACY_COMPANY_RE.findall(text)
+    redacted = text
+    if emails:
+        redacted = LEGACY_EMAIL_RE.sub("[REDACTED_EMAIL]", redacted)
+    if phones:
+        redacted = LEGACY_PHONE_RE.sub("[REDACTED_PHONE]", redacted)
+    if urls:
+        redacted = LEGACY_URL_RE.sub("[REDACTED_URL]", redacted)
+    if companies:
+        redacted = LEGACY_COMPANY_RE.sub("[REDACTED_COMPANY]", redacted)
+    redacted = re.sub(r"(?i)(phone\s*[:\-])\s*\S.*?(?=\n|$)", r"\1 [REDACTED]", redacted)
+    redacted = re.sub(r"(?i)(email\s*[:\-])\s*\S.*?(?=\n|$)", r"\1 [REDACTED]", redacted)
+    redacted = re.sub(r"(?i)(current\s+company\s*[:\-])\s*.+?(?=\n|$)", r"\1 [REDACTED]", redacted)
+    redacted = re.sub(r"(?i)(linkedin\s*[:\-])\s*.*?(?=\n|$)", r"\1 [REDACTED_URL]", redacted)
+    redacted = re.sub(r"(?i)(github|portfolio|website)\s*[:\-]\s*.*?(?=\n|$)", r"\1: [REDACTED_URL]", redacted)
+    counts = {"emails": len(emails), "phones": len(phones), "urls": len(urls), "companies": len(companies)}
+    return redacted, counts
+
+
+FIRST_NAMES = ["Asha", "Rahul", "Maria", "John", "Wei", "Fatima", "Liam", "Priya"]
+LAST_NAMES = ["Sharma", "Smith", "Garcia", "Chen", "Khan", "Brown", "Iyer", "Okafor"]
+COMPANIES = ["Acme Inc", "Globex Corporation", "Initech LLC", "Umbrella Ltd", "Hooli Corp"]
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "React", "AWS", "Redis"]
+
+
+def synthetic_cv(rng: random.Random) -> str:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"Email: {first.lower()}.{last.lower()}@example.com",
+        f"Phone: +1 ({rng.randint(200, 999)}) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        f"LinkedIn: https://linkedin.com/in/{first.lower()}{last.lower()}",
+        f"GitHub: https://github.com/{first.lower()}",
+        f"Current Company: {rng.choice(COMPANIES)}",
+        "",
+        "PROFESSIONAL SUMMARY",
+        "    Backend engineer focused on APIs, data pipelines and cloud infrastructure. " * 3,
+        "",
+        "EXPERIENCE",
+    ]
+    for _ in range(rng.randint(3, 8)):
+        start = rng.randint(2008, 2020)
+        lines += [
+            f"Senior Engineer - {rng.choice(COMPANIES)}    {start} - {start + rng.randint(1, 4)}",
+            f"  - Built services in {', '.join(rng.sample(SKILLS, 3))} serving 1200000 requests/day",
+            f"  - Contact reference at ref{rng.randint(1, 99)}@example.org or {rng.randint(6000000000, 9999999999)}",
+            "  - Migrated legacy systems; see www.example.com/case-study for details",
+        ]
+    lines += ["", "SKILLS", ", ".join(SKILLS), "", "Portfolio: https://portfolio.example.com"]
+    return "\n".join(lines)
+
+
+def load_corpus(path: str) -> List[str]:
+    docs = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".txt"):
+            with open(os.path.join(path, name), "r", encoding="utf-8", errors="ignore") as f:
+                docs.append(f.read())
+    return docs
+
+
+def timed(label: str, fn, docs: List[str]) -> List[Tuple[str, dict]]:
+    start = time.perf_counter()
+    results = fn(docs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {len(docs) / elapsed:10.0f} docs/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PII redaction")
+    parser.add_argument("--corpus", help="Directory of .txt CVs (default: synthetic corpus)")
+    parser.add_argument("--docs", type=int, default=1000, help="Synthetic corpus size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for the batch API")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.corpus:
+        docs = load_corpus(args.corpus)
+    else:
+        rng = random.Random(args.seed)
+        docs = [synthetic_cv(rng) for _ in range(args.docs)]
+    if not docs:
+        print("No documents to benchmark")
+        return
+
+    print(f"Corpus: {len(docs)} documents, {sum(len(d) for d in docs) / 1024:.0f} KiB")
+    legacy = timed("legacy multi-pass", lambda d: [legacy_redact_pii(t) for t in d], docs)
+    single = timed("single-pass", lambda d: [redact_pii(t) for t in d], docs)
+    timed(f"batch ({args.workers} workers)", lambda d: redact_pii_batch(d, workers=args.workers), docs)
+
+    text_diffs = sum(1 for a, b in zip(legacy, single) if a[0] != b[0])
+    count_diffs = sum(1 for a, b in zip(legacy, single) if a[1] != b[1])
+    print(f"Output differs from legacy: text {text_diffs}/{len(docs)}, counts {count_diffs}/{len(docs)}")
+
+
+if __name__ == "__main__":
+    main()
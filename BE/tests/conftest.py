@@ -0,0 +1,5 @@
+"""Pytest configuration: make the backend importable as it is when run from BE/."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,115 @@
+"""Tests for returning sessions to the dirty set when a flush does not complete."""
+import asyncio
+
+import pytest
+
+from app.core import answer_journal
+from app.db import session as db_session
+
+
+class FakeJournal:
+    def __init__(self, session_ids):
+        self.dirty = set(session_ids)
+
+    async def take_dirty(self, count):
+        taken = sorted(self.dirty)[:count]
+        self.dirty -= set(taken)
+        return taken
+
+    async def answers_many(self, session_ids):
+        return {sid: {1: ("A", 3)} for sid in session_ids}
+
+    async def mark_dirty(self, session_ids):
+        self.dirty.update(session_ids)
+
+
+class HangingSession:
+    entered = None
+
+    async def __aenter__(self):
+        HangingSession.entered.set()
+        await asyncio.sleep(3600)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FailingSession:
+    async def __aenter__(self):
+        raise RuntimeError("database down")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_cancelled_flush_remarks_sessions(monkeypatch):
+    monkeypatch.setattr(db_session, "async_session_maker", HangingSession)
+
+    async def scenario():
+        HangingSession.entered = asyncio.Event()
+        journal = FakeJournal(["s1", "s2"])
+        task = asyncio.create_task(answer_journal.flush_answers(journal, 10))
+        await HangingSession.entered.wait()
+        assert journal.dirty == set()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return journal.dirty
+
+    assert asyncio.run(scenario()) == {"s1", "s2"}
+
+
+def test_failed_flush_remarks_sessions(monkeypatch):
+    monkeypatch.setattr(db_session, "async_session_maker", FailingSession)
+    journal = FakeJournal(["s1"])
+    with pytest.raises(RuntimeError):
+        asyncio.run(answer_journal.flush_answers(journal, 10))
+    assert journal.dirty == {"s1"}
+
+
+class FakePipeline:
+    def __init__(self, redis, transaction):
+        self.redis = redis
+        self.transaction = transaction
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    async def execute(self):
+        self.redis.pipelines.append(self)
+        if self.redis.fail:
+            raise ConnectionError("redis went away")
+        for key, ttl, value in self.commands:
+            self.redis.store[key] = (value, ttl)
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.store = {}
+        self.pipelines = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, transaction)
+
+
+def _open(redis):
+    journal = answer_journal.AnswerJournal(redis)
+    return asyncio.run(journal.open("s1", 7, "qs_1", {1: ["B", "A"]}, 600)), journal
+
+
+def test_open_writes_timer_and_meta_in_one_transaction():
+    redis = FakeRedis()
+    _, journal = _open(redis)
+    [pipe] = redis.pipelines
+    assert pipe.transaction
+    assert [key for key, _, _ in pipe.commands] == [journal._key("s1", "timer"), journal._key("s1", "meta")]
+    assert redis.store[journal._key("s1", "timer")] == ("active", 600)
+
+
+def test_failed_open_leaves_no_meta_behind():
+    redis = FakeRedis(fail=True)
+    with pytest.raises(ConnectionError):
+        _open(redis)
+    assert redis.store == {}
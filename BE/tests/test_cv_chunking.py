@@ -0,0 +1,44 @@
+"""Tests for section-aware CV chunking and result merging."""
+from app.utils import cv_chunking
+from app.utils.cv_chunking import CVChunk, build_cv_chunks, merge_cv_results, split_to_budget
+
+
+def test_separate_stints_at_same_company_are_kept():
+    stint = {"company": "Acme", "role": "Engineer"}
+    merged = merge_cv_results([
+        (CVChunk(kind="experience", text="", index=0), {"work_experience": [{**stint, "duration": "2015-2017"}]}),
+        (CVChunk(kind="experience", text="", index=1), {"work_experience": [
+            {**stint, "duration": "2015-2017"},
+            {**stint, "duration": "2020-2023"},
+        ]}),
+    ])
+    assert [job["duration"] for job in merged["work_experience"]] == ["2015-2017", "2020-2023"]
+
+
+def test_profile_is_split_not_truncated(monkeypatch):
+    monkeypatch.setattr(cv_chunking, "token_budget", lambda provider: 50)
+    contact = "\n\n".join(f"Contact line {i}: someone{i}@example.com" for i in range(12))
+    experience = "\n\n".join(f"Engineer at Company {i}, 2010-2012, built things" for i in range(8))
+    cv_text = f"{contact}\n\nEXPERIENCE\n{experience}\n"
+
+    chunks = build_cv_chunks(cv_text, "groq")
+    profile = [c for c in chunks if c.kind == "profile"]
+    assert len(profile) > 1
+    assert all(cv_chunking.estimate_tokens(c.text) <= 50 for c in profile)
+    profile_text = "\n\n".join(c.text for c in profile)
+    for i in range(12):
+        assert f"someone{i}@example.com" in profile_text
+
+
+def test_split_terminates_on_whitespace_padding():
+    assert split_to_budget("abc" + " " * 100, 10) == ["abc"]
+    pieces = split_to_budget("x" * 30 + "\n" + " " * 80 + "\n" + "y" * 30, 10)
+    assert "".join(pieces) == "x" * 30 + "y" * 30
+
+
+def test_split_keeps_all_text_within_budget():
+    text = "\n".join(f"line {i} " + "word " * (i % 7) for i in range(200))
+    pieces = split_to_budget(text, 20)
+    max_chars = 20 * cv_chunking.CHARS_PER_TOKEN
+    assert all(len(p) <= max_chars for p in pieces)
+    assert " ".join(pieces).split() == text.split()
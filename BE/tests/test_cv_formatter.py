@@ -0,0 +1,25 @@
+"""Tests for the batch DOCX zip export."""
+import io
+import zipfile
+
+from app.utils.cv_formatter import iter_docx_zip, safe_zip_name
+
+
+def test_zip_names_are_reduced_to_safe_basenames():
+    assert safe_zip_name("../../etc/cron.d/evil.docx") == "evil.docx"
+    assert safe_zip_name("C:\\Users\\x\\Jane Doe (1).docx") == "Jane_Doe_1_.docx"
+    assert safe_zip_name("..") == "cv"
+
+
+def test_zip_members_are_unique_and_flat():
+    rendered = [("../a.docx", b"1"), ("a.docx", b"2"), ("/abs/b", b"3")]
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_docx_zip(rendered))))
+    assert archive.namelist() == ["a.docx", "a_1.docx", "b.docx"]
+    assert archive.read("a_1.docx") == b"2"
+
+
+def test_suffixed_names_do_not_collide_with_literal_names():
+    rendered = [("a", b"1"), ("a", b"2"), ("a_1", b"3"), ("A.docx", b"4")]
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_docx_zip(rendered))))
+    assert archive.namelist() == ["a.docx", "a_1.docx", "a_1_1.docx", "A_2.docx"]
+    assert archive.read("a_1_1.docx") == b"3"
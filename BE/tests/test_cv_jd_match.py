@@ -0,0 +1,43 @@
+"""Tests for the single-pass term scanner in scripts/cv_jd_match.py."""
+import importlib.util
+import os
+import random
+
+_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "cv_jd_match.py")
+_spec = importlib.util.spec_from_file_location("cv_jd_match", _PATH)
+cv_jd_match = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cv_jd_match)
+
+
+def _brute_force(terms, text):
+    hits = {}
+    for term in terms:
+        start = text.find(term)
+        while start != -1:
+            hits.setdefault(term, []).append(start)
+            start = text.find(term, start + 1)
+    return hits
+
+
+def test_overlapping_and_nested_terms_are_all_found():
+    automaton = cv_jd_match.TermAutomaton(["go", "golang", "go lang", "lang", "ai", "maintain"])
+    hits = automaton.scan("golang and go lang; maintained ai")
+    assert hits == _brute_force(automaton.terms, "golang and go lang; maintained ai")
+    assert hits["go"] == [0, 11]
+    assert hits["lang"] == [2, 14]
+    assert hits["ai"] == [21, 25, 31]
+
+
+def test_matches_brute_force_on_random_text():
+    terms = cv_jd_match.AUTOMATON.terms
+    rng = random.Random(7)
+    vocabulary = terms + ["x", " ", ".", "senior", "years", "node.js"]
+    for _ in range(50):
+        text = "".join(rng.choice(vocabulary) + rng.choice(["", " "]) for _ in range(40))
+        assert cv_jd_match.AUTOMATON.scan(text) == _brute_force(terms, text)
+
+
+def test_years_are_read_before_the_unit():
+    doc = cv_jd_match.DocumentFeatures("Senior engineer with 7+ years of Python and 2 yrs Go.")
+    assert doc.years == [7.0, 2.0]
+    assert "python" in doc.skills
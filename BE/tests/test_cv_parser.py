@@ -0,0 +1,97 @@
+"""Tests for CV section detection and rebuilding."""
+from app.utils.cv_parser import CVParser
+
+SAMPLE_CV = """Jane Doe
+jane@example.com
+
+Professional Summary
+Backend engineer focused on APIs.
+
+WORK EXPERIENCE
+Acme Corp
+Senior Software Engineer
+2019 - 2023
+Built the billing platform.
+
+Education
+BSc Computer Science
+University of Michigan
+2015
+
+Skills:
+Python, SQL, Docker
+"""
+
+
+def test_title_case_lines_need_a_trailing_section_keyword():
+    assert CVParser.classify_header("Work Experience") == "experience"
+    assert CVParser.classify_header("Professional Summary") == "summary"
+    assert CVParser.classify_header("University of Michigan") is None
+    assert CVParser.classify_header("Bachelor Degree in Physics") is None
+
+
+def test_upper_case_and_colon_headers_match_anywhere():
+    assert CVParser.classify_header("EDUCATION AND TRAINING") == "education"
+    assert CVParser.classify_header("Technical skills:") == "skills"
+    assert CVParser.classify_header("Contact reference available on request") is None
+
+
+def test_institution_stays_in_its_education_entry():
+    parser = CVParser(SAMPLE_CV)
+    sections = parser.parse()
+    assert [name for name, _, _ in parser.section_spans] == ["summary", "experience", "education", "skills"]
+    (entry,) = sections["education"].items
+    assert entry["degree"] == "BSc Computer Science"
+    assert entry["institution"] == "University of Michigan"
+    assert entry["year"] == "2015"
+
+
+MERGED_CV = """Jane Doe
+
+WORK EXPERIENCE
+Acme Corp
+Senior Software Engineer
+2019 - 2023
+Built the billing platform.
+
+Summary
+Backend engineer focused on APIs.
+
+EXPERIENCE
+Globex
+Developer
+2015 - 2019
+
+Projects
+Ledger
+Double-entry accounting service.
+
+Key Achievements
+Cut p95 latency by 40%.
+"""
+
+
+def _section_lines(parser):
+    for _, start, end in parser.section_spans:
+        for line in parser.cv_text[start:end].split("\n"):
+            if line.strip():
+                yield line.strip()
+
+
+def test_rebuild_keeps_every_line_of_merged_sections():
+    parser = CVParser(MERGED_CV)
+    sections = parser.parse()
+    assert len(sections["experience"].spans) == 2
+    assert len(sections["projects"].spans) == 2
+
+    rebuilt = {line.strip() for line in parser.rebuild_cv({}).split("\n")}
+    missing = [line for line in _section_lines(parser) if line not in rebuilt]
+    assert missing == []
+
+
+def test_rebuild_excludes_items_per_span():
+    parser = CVParser(MERGED_CV)
+    parser.parse()
+    rebuilt = parser.rebuild_cv({"experience": {"exclude_items": ["globex"]}, "summary": {"include": False}})
+    assert "Globex" not in rebuilt and "Backend engineer" not in rebuilt
+    assert "EXPERIENCE" in rebuilt.split("\n") and "Acme Corp" in rebuilt
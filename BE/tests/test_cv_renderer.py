@@ -0,0 +1,65 @@
+"""Smoke tests for rendering cv_data to each output format."""
+import io
+import zipfile
+
+import pytest
+
+from app.utils.cv_renderer import RENDER_FORMATS, render_cv
+
+CV_DATA = {
+    "name": "Jane <Doe>",
+    "email": "jane@example.com",
+    "phone": "+1 555 123 4567",
+    "summary": "Backend engineer.",
+    "experience": [{"company": "Acme Inc", "role": "Engineer", "dates": "2019 - 2023", "description": "Built APIs"}],
+    "education": [{"degree": "BSc", "institution": "State University", "year": "2018"}],
+    "skills": ["Python", "SQL"],
+    "certifications": ["AWS SAA"],
+    "projects": [{"project": "Search", "description": "Full-text search"}],
+}
+
+# Typical LLM extraction output with missing values
+SPARSE_CV_DATA = {
+    "name": None,
+    "email": None,
+    "phone": "555-1234",
+    "summary": None,
+    "experience": [{"company": None, "role": "Engineer", "dates": None, "description": None}],
+    "education": [{"degree": None, "institution": None, "year": None}],
+    "skills": ["Python"],
+    "certifications": [],
+    "projects": [{"project": None, "description": None}],
+}
+
+
+def _check(fmt, content):
+    if fmt == "docx":
+        assert "word/document.xml" in zipfile.ZipFile(io.BytesIO(content)).namelist()
+    elif fmt == "pdf":
+        assert content.startswith(b"%PDF")
+    else:
+        assert content.startswith(b"<!DOCTYPE html>")
+
+
+@pytest.mark.parametrize("fmt", list(RENDER_FORMATS))
+def test_renders_each_format(fmt):
+    content = render_cv(CV_DATA, fmt)
+    _check(fmt, content)
+    if fmt == "html":
+        assert b"<h1>Jane &lt;Doe&gt;</h1>" in content
+        assert b"Acme Inc" in content
+
+
+@pytest.mark.parametrize("fmt", list(RENDER_FORMATS))
+def test_renders_null_fields(fmt):
+    content = render_cv(SPARSE_CV_DATA, fmt)
+    _check(fmt, content)
+    if fmt == "html":
+        assert b"<title>CV</title>" in content
+        assert b"<h1>Your Name</h1>" in content
+        assert b"None" not in content
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        render_cv(CV_DATA, "rtf")
@@ -0,0 +1,49 @@
+"""Tests for the review flags raised by the nightly item analytics."""
+import pytest
+
+from app.core.tasks import item_analytics
+from app.core.tasks.item_analytics import item_flags, refresh_item_analytics
+
+RATES = {"A": 0.6, "B": 0.2, "C": 0.1, "D": 0.1}
+
+
+def test_healthy_item_has_no_flags():
+    assert item_flags(100, 0.6, 0.35, RATES, "A") == []
+
+
+def test_too_few_responses_or_no_p_value():
+    assert item_flags(5, 0.01, -0.5, {"A": 0.0, "B": 1.0}, "A") == []
+    assert item_flags(100, None, None, RATES, "A") == []
+
+
+def test_difficulty_and_discrimination_flags():
+    assert item_flags(100, 0.1, 0.3, RATES, "A") == ["too_hard"]
+    assert item_flags(100, 0.98, 0.3, RATES, "A") == ["too_easy"]
+    assert item_flags(100, 0.6, -0.2, RATES, "A") == ["negative_discrimination"]
+    assert item_flags(100, 0.6, 0.05, RATES, "A") == ["low_discrimination"]
+    assert item_flags(100, 0.6, None, RATES, "A") == []
+
+
+def test_distractor_flags():
+    rates = {"A": 0.3, "B": 0.7, "C": 0.0, "D": 0.0}
+    assert item_flags(100, 0.3, 0.2, rates, "A") == ["distractor_beats_key", "unused_distractor"]
+
+
+def test_failed_refresh_is_retried(monkeypatch):
+    class Retry(Exception):
+        pass
+
+    async def fail():
+        raise ConnectionError("database down")
+
+    retried = []
+
+    def retry(exc):
+        retried.append(exc)
+        return Retry()
+
+    monkeypatch.setattr(item_analytics, "_refresh_item_analytics", fail)
+    monkeypatch.setattr(refresh_item_analytics, "retry", retry)
+    with pytest.raises(Retry):
+        refresh_item_analytics()
+    assert isinstance(retried[0], ConnectionError)
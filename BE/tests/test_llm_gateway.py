@@ -0,0 +1,118 @@
+"""Tests for provider client retries, backoff jitter and stream outcomes."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core import llm_gateway
+from app.core.llm_gateway import (
+    FakeLLMProvider,
+    LLMGateway,
+    LLMGatewayError,
+    OpenAICompatibleAdapter,
+    ProviderClient,
+)
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_gateway.settings, "LLM_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(llm_gateway.settings, "LLM_MAX_RETRIES", 2)
+
+
+def test_retries_retryable_status_then_succeeds():
+    async def scenario():
+        gateway = LLMGateway()
+        fake = FakeLLMProvider(responses=['{"ok": true}'], failures=[503, 429])
+        client = gateway.register_fake(fake)
+        response = await gateway.complete("fake", "hi")
+        return response, fake, client
+
+    response, fake, client = asyncio.run(scenario())
+    assert response.content == '{"ok": true}'
+    assert response.attempts == 3
+    assert len(fake.requests) == 3
+    assert list(client.stats.outcomes) == [False, False, True]
+    assert client.breaker.failures == 0
+
+
+def test_client_error_is_not_retried():
+    async def scenario():
+        gateway = LLMGateway()
+        fake = FakeLLMProvider(failures=[400])
+        gateway.register_fake(fake)
+        with pytest.raises(LLMGatewayError) as info:
+            await gateway.complete("fake", "hi")
+        return info.value, fake
+
+    error, fake = asyncio.run(scenario())
+    assert error.status_code == 400
+    assert len(fake.requests) == 1
+
+
+def test_gives_up_after_max_retries():
+    async def scenario():
+        gateway = LLMGateway()
+        fake = FakeLLMProvider(failures=[503, 503, 503, 503])
+        gateway.register_fake(fake)
+        with pytest.raises(LLMGatewayError, match="giving up"):
+            await gateway.complete("fake", "hi")
+        return fake
+
+    assert len(asyncio.run(scenario()).requests) == 3
+
+
+def test_backoff_is_full_jitter_capped(monkeypatch):
+    monkeypatch.setattr(llm_gateway.settings, "LLM_RETRY_BACKOFF_SECONDS", 1.0)
+    monkeypatch.setattr(llm_gateway.settings, "LLM_RETRY_MAX_BACKOFF_SECONDS", 4.0)
+    delays = [ProviderClient._backoff(attempt, None) for attempt in range(6) for _ in range(50)]
+    assert all(0.0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert all(0.0 <= ProviderClient._backoff(0, None) <= 1.0 for _ in range(50))
+
+
+def test_backoff_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(llm_gateway.settings, "LLM_RETRY_MAX_BACKOFF_SECONDS", 8.0)
+    assert ProviderClient._backoff(0, httpx.Response(429, headers={"retry-after": "2.5"})) == 2.5
+    assert ProviderClient._backoff(0, httpx.Response(429, headers={"retry-after": "120"})) == 8.0
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        chunk = {"choices": [{"delta": {"content": "partial"}}]}
+        yield f"data: {json.dumps(chunk)}\n\n".encode()
+        raise httpx.ReadError("connection reset")
+
+
+def test_mid_stream_failure_is_recorded_as_error():
+    adapter = OpenAICompatibleAdapter("http://fake-llm")
+    adapter.name = "broken"
+    client = ProviderClient(
+        adapter, transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=BrokenStream()))
+    )
+
+    async def scenario():
+        deltas = []
+        with pytest.raises(httpx.ReadError):
+            async for delta in client.stream(MESSAGES, api_key="k"):
+                deltas.append(delta)
+        return deltas
+
+    assert asyncio.run(scenario()) == ["partial"]
+    assert list(client.stats.outcomes) == [False]
+    assert client.breaker.failures == 1
+
+
+def test_completed_stream_is_recorded_as_success():
+    async def scenario():
+        gateway = LLMGateway()
+        client = gateway.register_fake(FakeLLMProvider(responses=['{"answer": 42}']))
+        text = "".join([delta async for delta in gateway.stream("fake", "hi")])
+        return text, client
+
+    text, client = asyncio.run(scenario())
+    assert text == '{"answer": 42}'
+    assert list(client.stats.outcomes) == [True]
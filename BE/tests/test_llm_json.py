@@ -0,0 +1,42 @@
+"""Tests for the tolerant streaming JSON parser."""
+import asyncio
+
+from app.models.schemas import MCQQuestion
+from app.utils.llm_json import aiter_json_items, iter_json_items, loads_llm_json
+
+MCQ = '{"question_id": %d, "question_text": "Q%d?", "options": [{"option_id": "A", "text": "a"}], "correct_answer": "A"}'
+
+
+def test_loads_llm_json_repairs_fences_and_trailing_commas():
+    assert loads_llm_json('```json\n{"a": [1, 2,],}\n```') == {"a": [1, 2]}
+
+
+def test_items_close_across_chunk_boundaries():
+    text = "Here you go:\n```json\n[" + MCQ % (1, 1) + ", " + MCQ % (2, 2) + "]\n```"
+    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    questions = list(iter_json_items(chunks, model=MCQQuestion))
+    assert [q.question_id for q in questions] == [1, 2]
+
+
+def test_truncated_tail_and_invalid_items_are_dropped():
+    text = "[" + MCQ % (1, 1) + ', {"question_id": "x"}, ' + (MCQ % (3, 3))[:40]
+    assert [q.question_id for q in iter_json_items([text], model=MCQQuestion)] == [1]
+
+
+def test_nested_path_selects_entries():
+    text = '{"name": "A", "work_experience": [{"company": "X", "tags": ["a"]}, {"company": "Y"}], "projects": [{"n": 1}]}'
+    assert list(iter_json_items([text], path=("work_experience",))) == [
+        {"company": "X", "tags": ["a"]},
+        {"company": "Y"},
+    ]
+
+
+def test_async_stream_yields_items():
+    async def chunks():
+        for part in ('[{"a": 1}', ', {"a": 2}]'):
+            yield part
+
+    async def collect():
+        return [item async for item in aiter_json_items(chunks())]
+
+    assert asyncio.run(collect()) == [{"a": 1}, {"a": 2}]
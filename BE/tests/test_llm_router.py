@@ -0,0 +1,108 @@
+"""Tests for the circuit breaker, provider client and hedged routing."""
+import asyncio
+import time
+
+import httpx
+
+from app.core.llm_gateway import (
+    CircuitBreaker,
+    FakeLLMProvider,
+    LLMGateway,
+    OpenAICompatibleAdapter,
+    ProviderClient,
+)
+from app.core.llm_router import LLMRouter
+
+
+def _half_open(breaker: CircuitBreaker) -> None:
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_seconds - 1
+
+
+def _client(name: str, handler) -> ProviderClient:
+    adapter = OpenAICompatibleAdapter("http://fake-llm")
+    adapter.name = name
+    adapter.default_model = "fake-model"
+    return ProviderClient(adapter, transport=httpx.MockTransport(handler))
+
+
+def _ok(content: str = "{}") -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def test_breaker_opens_then_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    _half_open(breaker)
+    assert breaker.accepting
+    assert breaker.allow()
+    assert not breaker.accepting and not breaker.allow()
+
+    breaker.record_failure()  # failed probe re-opens
+    assert breaker.state == "open"
+    _half_open(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_cancelled_probe_is_released():
+    entered = asyncio.Event()
+
+    async def hang(request):
+        entered.set()
+        await asyncio.sleep(3600)
+
+    async def scenario():
+        client = _client("slow", hang)
+        _half_open(client.breaker)
+        task = asyncio.create_task(client.complete([{"role": "user", "content": "hi"}], api_key="k"))
+        await entered.wait()
+        assert not client.available  # the probe is in flight
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert client.breaker.state == "half_open"
+        assert client.available
+        assert client.breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_hedge_wins_and_cancelled_primary_keeps_breaker_usable():
+    async def slow(request):
+        await asyncio.sleep(3600)
+
+    async def scenario():
+        gateway = LLMGateway()
+        gateway._clients["slow"] = primary = _client("slow", slow)
+        gateway.register_fake(FakeLLMProvider(responses=['{"ok": true}']), name="fast")
+        _half_open(primary.breaker)
+
+        router = LLMRouter(["slow", "fast"], {"slow": "k", "fast": "k"}, gateway=gateway)
+        router.hedge_delay = lambda provider: 0.01
+        response = await router.complete("hi", preferred="slow")
+        await asyncio.sleep(0)  # let the cancelled primary unwind
+
+        assert response.provider == "fast" and response.hedged
+        assert primary.breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_router_fails_over_when_primary_errors():
+    async def scenario():
+        gateway = LLMGateway()
+        gateway._clients["bad"] = _client("bad", lambda request: httpx.Response(400, json={}))
+        gateway.register_fake(FakeLLMProvider(responses=['{"ok": true}']), name="good")
+        router = LLMRouter(["bad", "good"], {"bad": "k", "good": "k"}, gateway=gateway)
+        response = await router.complete("hi", preferred="bad")
+        assert response.provider == "good" and not response.hedged
+
+    asyncio.run(scenario())
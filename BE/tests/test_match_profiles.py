@@ -0,0 +1,47 @@
+"""Tests for vectorized candidate scoring against a JD match profile."""
+import pytest
+
+from app.vector_db.match_profiles import rank_candidates, score_candidates
+from app.vector_db.skill_matcher import SkillMatcher
+
+PROFILE = [
+    {"skill": "Python", "weight": 2.0, "min_proficiency": "advanced"},
+    {"skill": "SQL", "weight": 1.0},
+]
+CANDIDATES = [
+    ({"python": "expert", "SQL": "intermediate"}, "5 years"),  # everything
+    ({}, None),  # nothing, between two candidates with skills
+    ({"Python": "beginner", "Docker": "expert"}, 10),  # under-level Python only
+    ({"sql": 2}, "4"),
+]
+
+
+def test_scores_follow_weights_levels_and_experience():
+    results = score_candidates(PROFILE, 4, CANDIDATES, SkillMatcher())
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    full, empty, beginner, sql_only = results
+
+    assert full["score"] == 100.0
+    assert full["matched_skills"] == ["Python", "SQL"]
+    assert empty["score"] == 0.0 and empty["missing_skills"] == ["Python", "SQL"]
+    assert empty["experience_years"] is None
+    # Beginner (1) against advanced (3): a third of Python's weight of 2 out of 3
+    assert beginner["skill_score"] == pytest.approx(100 * 2 / 3 / 3, abs=0.01)
+    assert beginner["matched_skills"] == ["Python"]
+    assert beginner["score"] == pytest.approx(0.85 * 100 * 2 / 9 + 15, abs=0.01)
+    assert sql_only["skill_score"] == pytest.approx(100 / 3, abs=0.01)
+    assert sql_only["experience_score"] == 100.0
+
+
+def test_rank_returns_top_n_best_first_with_stable_ties():
+    candidates = CANDIDATES + [CANDIDATES[0]]
+    ranked = rank_candidates(PROFILE, 4, candidates, SkillMatcher(), top_n=3)
+    assert [r["index"] for r in ranked] == [0, 4, 3]
+    everyone = rank_candidates(PROFILE, 4, candidates, SkillMatcher(), top_n=10)
+    assert [r["index"] for r in everyone] == [0, 4, 3, 2, 1]
+
+
+def test_no_candidates_or_requirements():
+    assert rank_candidates(PROFILE, None, [], SkillMatcher()) == []
+    (result,) = score_candidates([], None, [({"python": "expert"}, 1)], SkillMatcher())
+    assert result["score"] == 15.0 and result["matched_skills"] == []
@@ -0,0 +1,62 @@
+"""Tests for single-pass PII redaction against the previous multi-pass implementation."""
+import importlib.util
+import os
+import random
+
+from app.utils.pii import redact_pii, redact_pii_batch
+
+_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "benchmark_pii.py")
+_spec = importlib.util.spec_from_file_location("benchmark_pii", _PATH)
+benchmark_pii = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(benchmark_pii)
+
+
+def test_seven_digit_phone_is_redacted():
+    assert redact_pii("Call 555-1234 now") == (
+        "Call [REDACTED_PHONE] now", {"emails": 0, "phones": 1, "urls": 0, "companies": 0}
+    )
+
+
+def test_short_numbers_are_not_phones():
+    text, counts = redact_pii("Served 1200000 requests/day")
+    assert text == "Served 1200000 requests/day"
+    assert counts["phones"] == 0
+
+
+def test_label_word_inside_email_is_not_a_label():
+    assert redact_pii("phone-support@acme.com is our address") == (
+        "[REDACTED_EMAIL] is our address", {"emails": 1, "phones": 0, "urls": 0, "companies": 0}
+    )
+
+
+def test_labelled_lines_are_masked_and_counted():
+    text, counts = redact_pii("Email: jane@example.com\nPhone: +1 (555) 123-4567\nLinkedIn: https://x.io/jane")
+    assert text == "Email: [REDACTED]\nPhone: [REDACTED]\nLinkedIn: [REDACTED_URL]"
+    assert counts == {"emails": 1, "phones": 1, "urls": 1, "companies": 0}
+
+
+def test_matches_legacy_on_edge_cases():
+    cases = [
+        "Call 555-1234 now",
+        "phone-support@acme.com is our address",
+        "telephone: 5551234",
+        "Worked at Globex Corporation, 2015 - 2017",
+        "Current Company: Acme Inc",
+        "GitHub - https://github.com/jane\nPortfolio: www.jane.dev",
+        "",
+    ]
+    for text in cases:
+        assert redact_pii(text) == benchmark_pii.legacy_redact_pii(text), text
+
+
+def test_matches_legacy_on_synthetic_corpus():
+    rng = random.Random(7)
+    docs = [benchmark_pii.synthetic_cv(rng) for _ in range(50)]
+    assert [redact_pii(doc) for doc in docs] == [benchmark_pii.legacy_redact_pii(doc) for doc in docs]
+
+
+def test_batch_keeps_input_order():
+    docs = [f"Reach me at user{i}@example.com" for i in range(40)]
+    results = redact_pii_batch(docs, workers=2, chunksize=8)
+    assert results == [redact_pii(doc) for doc in docs]
+    assert all(counts["emails"] == 1 for _, counts in results)
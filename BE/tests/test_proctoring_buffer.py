@@ -0,0 +1,146 @@
+"""Tests for keeping the good rows of a proctoring batch whose INSERT fails."""
+import asyncio
+
+import pytest
+
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
+from sqlalchemy.sql import Select
+
+from app.core.proctoring_buffer import ProctoringEventBuffer
+from app.db import session as db_session
+
+KNOWN_SESSIONS = {"s1", "s2"}
+
+
+class Savepoint:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        self.mark = len(self.session.pending)
+
+    async def __aexit__(self, exc_type, *exc):
+        if exc_type is not None:
+            del self.session.pending[self.mark:]
+        return False
+
+
+class FakeSession:
+    """Rejects any INSERT holding a row for an unknown session or an oversized event_type."""
+
+    committed = []
+    inserts = 0
+    outage = 0  # executes that fail as if the database were unreachable
+
+    def __init__(self):
+        self.pending = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        if FakeSession.outage:
+            FakeSession.outage -= 1
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+        if isinstance(stmt, Select):
+            return FakeResult(sorted(KNOWN_SESSIONS))
+        FakeSession.inserts += 1
+        params = stmt.compile().params
+        sessions = [v for k, v in params.items() if k.startswith("test_session_id")]
+        event_types = [v for k, v in params.items() if k.startswith("event_type")]
+        if any(s not in KNOWN_SESSIONS for s in sessions):
+            raise IntegrityError("INSERT", params, Exception("foreign key violation"))
+        if any(len(t) > 100 for t in event_types):
+            raise DataError("INSERT", params, Exception("value too long"))
+        self.pending.extend(v for k, v in params.items() if k.startswith("event_id"))
+
+    def begin_nested(self):
+        return Savepoint(self)
+
+    async def commit(self):
+        FakeSession.committed.extend(self.pending)
+        self.pending = []
+
+    async def rollback(self):
+        self.pending = []
+
+
+class FakeResult:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.values
+
+
+def _row(event_id, session_id="s1", event_type="tab_switch"):
+    return {
+        "event_id": event_id,
+        "test_session_id": session_id,
+        "event_type": event_type,
+        "severity": "low",
+    }
+
+
+def _write(monkeypatch, rows):
+    FakeSession.committed = []
+    FakeSession.inserts = 0
+    FakeSession.outage = 0
+    monkeypatch.setattr(db_session, "async_session_maker", FakeSession)
+    return asyncio.run(ProctoringEventBuffer().write(rows))
+
+
+def test_clean_batch_is_one_insert(monkeypatch):
+    written = _write(monkeypatch, [_row("e1"), _row("e2", "s2")])
+    assert written == 2
+    assert sorted(FakeSession.committed) == ["e1", "e2"]
+    assert FakeSession.inserts == 1
+
+
+def test_unknown_sessions_are_filtered(monkeypatch):
+    written = _write(monkeypatch, [_row("e1"), _row("e2", "gone"), _row("e3", "s2")])
+    assert written == 2
+    assert sorted(FakeSession.committed) == ["e1", "e3"]
+    assert FakeSession.inserts == 2
+
+
+def test_bad_row_only_drops_itself(monkeypatch):
+    rows = [_row("e1"), _row("e2", event_type="x" * 101), _row("e3", "gone"), _row("e4", "s2")]
+    written = _write(monkeypatch, rows)
+    assert written == 2
+    assert sorted(FakeSession.committed) == ["e1", "e4"]
+
+
+def test_outage_retries_the_batch_instead_of_dropping_it(monkeypatch):
+    FakeSession.committed = []
+    FakeSession.outage = 2
+    monkeypatch.setattr(db_session, "async_session_maker", FakeSession)
+
+    async def scenario():
+        buffer = ProctoringEventBuffer(batch_size=2, flush_seconds=0.01)
+        buffer.start()
+        assert buffer.submit([_row("e1"), _row("e2"), _row("e3")])
+        await asyncio.sleep(0.005)
+        assert buffer.pending == 1  # the failing batch is held, nothing more is taken
+        for _ in range(200):
+            if len(FakeSession.committed) >= 2:
+                break
+            await asyncio.sleep(0.005)
+        await buffer.stop()
+        return buffer.pending
+
+    assert asyncio.run(scenario()) == 0
+    assert sorted(FakeSession.committed) == ["e1", "e2", "e3"]
+
+
+def test_outage_propagates_from_write(monkeypatch):
+    FakeSession.outage = 1
+    monkeypatch.setattr(db_session, "async_session_maker", FakeSession)
+    with pytest.raises(OperationalError):
+        asyncio.run(ProctoringEventBuffer().write([_row("e1")]))
@@ -0,0 +1,15 @@
+"""Tests for when the question payload cache uses Redis."""
+from app.core import question_cache
+from app.core import redis as redis_module
+from app.core.question_cache import QuestionPayloadCache
+
+
+def test_redis_is_not_used_unless_enabled(monkeypatch):
+    client = object()
+    monkeypatch.setattr(redis_module, "redis_client", client)
+
+    monkeypatch.setattr(question_cache.settings, "QUESTION_CACHE_USE_REDIS", False)
+    assert QuestionPayloadCache._redis() is None
+
+    monkeypatch.setattr(question_cache.settings, "QUESTION_CACHE_USE_REDIS", True)
+    assert QuestionPayloadCache._redis() is client
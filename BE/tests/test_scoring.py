@@ -0,0 +1,78 @@
+"""Tests for NumPy answer keys, cohort scoring and answer key revalidation."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.scoring import AnswerKey, AnswerKeyCache, score_cohort
+
+KEY = AnswerKey.from_rows("qs", [(30, "C"), (10, "A"), (20, "B")])
+
+
+def test_mark_handles_unknown_questions_and_empty_keys():
+    marks = KEY.mark([20, 10, 99, 30], ["B", "D", "A", "C"])
+    assert marks.tolist() == [True, False, False, True]
+    assert KEY.correct_answer(30) == "C" and KEY.correct_answer(99) is None
+    empty = AnswerKey.from_rows("qs", [])
+    assert empty.mark([10], ["A"]).tolist() == [False]
+    assert KEY.mark([], []).tolist() == []
+
+
+def test_score_cohort_counts_and_item_statistics():
+    # Four sessions: 0 gets all right, 1 gets two, 2 gets one, 3 answers nothing
+    session_index = np.array([0, 0, 0, 1, 1, 1, 2, 2])
+    question_ids = np.array([10, 20, 30, 10, 20, 30, 10, 20])
+    selected = ["A", "B", "C", "A", "B", "D", "A", "A"]
+    marks, counts, items = score_cohort(KEY, session_index, question_ids, selected, 4)
+
+    assert marks.tolist() == [True, True, True, True, True, False, True, False]
+    assert counts.tolist() == [3, 2, 1, 0]
+    by_id = {item["question_id"]: item for item in items}
+    assert by_id[10] == {"question_id": 10, "responses": 3, "difficulty": 0.75, "discrimination": 1.0}
+    assert by_id[30]["responses"] == 2 and by_id[30]["difficulty"] == 0.25
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def one(self):
+        return self.rows[0]
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """Serves the version aggregate and the key rows of one question set."""
+
+    def __init__(self, answers):
+        self.answers = dict(answers)
+        self.updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.key_loads = 0
+
+    def correct(self, question_id, answer):
+        self.answers[question_id] = answer
+        self.updated_at += timedelta(seconds=1)
+
+    async def execute(self, stmt):
+        if "count(" in str(stmt):
+            return FakeResult([(len(self.answers), self.updated_at)])
+        self.key_loads += 1
+        return FakeResult(list(self.answers.items()))
+
+
+def test_cached_key_is_reloaded_after_a_correction_elsewhere():
+    cache = AnswerKeyCache(ttl=3600)
+    db = FakeDB({10: "A", 20: "B"})
+
+    async def scenario():
+        first = await cache.get(db, "qs")
+        again = await cache.get(db, "qs")
+        db.correct(20, "C")  # committed by another worker; nothing calls forget()
+        corrected = await cache.get(db, "qs")
+        return first, again, corrected
+
+    first, again, corrected = asyncio.run(scenario())
+    assert again is first and db.key_loads == 2
+    assert corrected.correct_answer(20) == "C"
@@ -0,0 +1,49 @@
+"""Tests for embedding-based skill matching, using fixed toy vectors."""
+import numpy as np
+
+from app.vector_db.skill_matcher import SkillMatcher
+
+VECTORS = {
+    "react": [1.0, 0.0, 0.0],
+    "reactjs": [0.95, 0.31, 0.0],
+    "react.js": [0.88, 0.0, 0.47],
+    "postgres": [0.0, 1.0, 0.0],
+    "postgresql": [0.0, 0.97, 0.24],
+    "sql": [0.0, 0.6, 0.8],
+    "docker": [0.0, 0.0, 1.0],
+}
+
+
+def embed(skills):
+    return [np.asarray(VECTORS[s.lower()], dtype=np.float32) for s in skills]
+
+
+def test_without_a_model_only_exact_names_match():
+    matcher = SkillMatcher(threshold=0.75)
+    results = matcher.match(["React", "Docker"], ["react ", "Postgres"])
+    assert [(r.matched, r.score) for r in results] == [("react ", 1.0), (None, 0.0)]
+
+
+def test_similar_names_match_above_threshold():
+    matcher = SkillMatcher(embed=embed, threshold=0.9)
+    results = matcher.match(["React", "Postgres", "Docker"], ["ReactJS", "PostgreSQL", "SQL"])
+    assert [r.matched for r in results] == ["ReactJS", "PostgreSQL", None]
+    assert all(0.0 <= r.score <= 1.0 for r in results)
+
+
+def test_catalog_pairs_skills_with_the_same_canonical_entry():
+    matcher = SkillMatcher(embed=embed, threshold=0.85)
+    matcher.set_catalog(["React", "PostgreSQL", "Docker"])
+    assert matcher.canonicalize(["ReactJS", "SQL"])[0][0] == "React"
+    assert matcher.canonicalize(["SQL"])[0][0] is None
+
+    sims = matcher.similarity(["ReactJS"], ["React.js"])
+    direct = float(np.dot(VECTORS["reactjs"], VECTORS["react.js"]) /
+                   (np.linalg.norm(VECTORS["reactjs"]) * np.linalg.norm(VECTORS["react.js"])))
+    assert direct < 0.85 <= sims[0, 0]
+
+
+def test_exact_matrix_normalizes_case_and_spacing():
+    sims = SkillMatcher().similarity(["Machine  Learning", "SQL", "Go"], ["sql", "machine learning"])
+    np.testing.assert_array_equal(sims, [[0.0, 1.0], [1.0, 0.0], [0.0, 0.0]])
+    assert SkillMatcher().similarity([], ["sql"]).shape == (0, 1)
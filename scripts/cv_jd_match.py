@@ -1,9 +1,24 @@
-"""Simple CV ↔ JD matching engine for the Assist Ten platform."""
+"""Simple CV ↔ JD matching engine for the Assist Ten platform.
+
+Usage:
+    python scripts/cv_jd_match.py --job jd.txt --cv cv.txt
+    python scripts/cv_jd_match.py --job jd.txt --cvs ./applicants --top-k 50 --workers 8 > shortlist.ndjson
+    python scripts/cv_jd_match.py --job jd.txt --cvs applicants.jsonl --output leaderboard.ndjson
+
+Batch mode prepares the JD once, scores CVs in a process pool and writes a
+ranked NDJSON leaderboard; throughput is reported on stderr.
+"""
 import argparse
+import bisect
+import heapq
 import json
+import multiprocessing
+import os
 import re
+import sys
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 SKILL_ALIASES: Dict[str, List[str]] = {
     "python": ["python"],
@@ -59,119 +74,274 @@ class SkillMatch:
     skill: str
     jd_priority: str
     cv_depth: str
+    cv_skill: Optional[str] = None  # set when matched semantically to a differently named CV skill
+    score: float = 1.0
+
+
+SENIORITY_TERMS = ["principal", "staff", "lead", "senior", "sr.", "mid", "junior", "jr."]
+PROJECT_TERM = "project"
+YEAR_TERMS = ["year", "yrs"]  # "years" and "yrs." start with these
+YEARS_BEFORE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*$")
+WINDOW = 80
 
 
 def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text.strip().lower())
+    return " ".join(text.lower().split())
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex matching the longest term at a position, as a prefix tree of alternatives."""
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
 
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class TermAutomaton:
+    """Finds every occurrence of every term, overlaps included, in one left-to-right scan."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = list(dict.fromkeys(terms))
+        self._pattern = re.compile(_trie_pattern(self.terms))
+        # Terms that start where a longer term starts: its term prefixes
+        self._prefixes = {
+            term: [other for other in self.terms if term.startswith(other)] for term in self.terms
+        }
 
-def find_priority(text: str, alias: str) -> str:
-    index = text.find(alias)
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """term -> sorted start offsets."""
+        hits: Dict[str, List[int]] = {}
+        search, prefixes = self._pattern.search, self._prefixes
+        match = search(text)
+        while match is not None:
+            position = match.start()
+            for term in prefixes[match.group()]:
+                hits.setdefault(term, []).append(position)
+            match = search(text, position + 1)
+        return hits
+
+
+AUTOMATON = TermAutomaton(
+    [alias for aliases in SKILL_ALIASES.values() for alias in aliases]
+    + PRIORITY_TRIGGERS_HIGH + PRIORITY_TRIGGERS_LOW
+    + STRONG_DEPTH_INDICATORS + WEAK_DEPTH_INDICATORS
+    + ROLE_KEYWORDS + DOMAIN_KEYWORDS + SENIORITY_TERMS + [PROJECT_TERM] + YEAR_TERMS
+)
+
+
+class DocumentFeatures:
+    """Everything the scorers read from one CV or JD, computed in a single pass.
+
+    Offsets refer to the normalized text, so skill mentions and the
+    priority/depth windows around them line up regardless of case or spacing.
+    """
+
+    def __init__(self, text: str):
+        self.text = normalize(text or "")
+        self.hits = AUTOMATON.scan(self.text)
+        self.years = self._years()
+        self.skills = extract_skills(self, SKILL_ALIASES)
+
+    def _years(self) -> List[float]:
+        """Numbers directly before "year(s)"/"yrs", read back from the unit hits."""
+        values = []
+        for term in YEAR_TERMS:
+            for offset in self.hits.get(term, []):
+                match = YEARS_BEFORE_RE.search(self.text, max(0, offset - 32), offset)
+                if match:
+                    values.append(float(match.group(1)))
+        return values
+
+    def has(self, term: str) -> bool:
+        return term in self.hits
+
+    def first(self, term: str) -> int:
+        offsets = self.hits.get(term)
+        return offsets[0] if offsets else -1
+
+    def any_within(self, terms: Iterable[str], start: int, end: int) -> bool:
+        """Whether any term occurs entirely inside text[start:end]."""
+        for term in terms:
+            offsets = self.hits.get(term)
+            if offsets:
+                i = bisect.bisect_left(offsets, start)
+                if i < len(offsets) and offsets[i] + len(term) <= end:
+                    return True
+        return False
+
+
+def find_priority(doc: DocumentFeatures, alias: str) -> str:
+    index = doc.first(alias)
     if index == -1:
         return "medium"
-    window_start = max(0, index - 80)
-    window = text[window_start:index]
-    if any(trigger in window for trigger in PRIORITY_TRIGGERS_HIGH):
+    window_start = max(0, index - WINDOW)
+    if doc.any_within(PRIORITY_TRIGGERS_HIGH, window_start, index):
         return "high"
-    if any(trigger in window for trigger in PRIORITY_TRIGGERS_LOW):
+    if doc.any_within(PRIORITY_TRIGGERS_LOW, window_start, index):
         return "low"
     return "medium"
 
 
-def assess_depth(text: str, alias: str) -> str:
-    index = text.find(alias)
+def assess_depth(doc: DocumentFeatures, alias: str) -> str:
+    index = doc.first(alias)
     if index == -1:
         return "weak"
-    window_start = max(0, index - 80)
-    window_end = min(len(text), index + len(alias) + 80)
-    window = text[window_start:window_end]
-    if any(indicator in window for indicator in STRONG_DEPTH_INDICATORS):
+    window_start = max(0, index - WINDOW)
+    window_end = min(len(doc.text), index + len(alias) + WINDOW)
+    if doc.any_within(STRONG_DEPTH_INDICATORS, window_start, window_end):
         return "strong"
-    if any(indicator in window for indicator in WEAK_DEPTH_INDICATORS):
+    if doc.any_within(WEAK_DEPTH_INDICATORS, window_start, window_end):
         return "weak"
     return "moderate"
 
 
-def extract_skills(text: str, aliases: Dict[str, List[str]]) -> Dict[str, Set[str]]:
-    normalized = normalize(text)
-    detected: Dict[str, Set[str]] = {}
+def extract_skills(doc: DocumentFeatures, aliases: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """skill -> aliases found, in alias-table order."""
+    detected: Dict[str, List[str]] = {}
     for skill, words in aliases.items():
-        for word in words:
-            if word in normalized:
-                detected.setdefault(skill, set()).add(word)
+        found = [word for word in words if word in doc.hits]
+        if found:
+            detected[skill] = found
     return detected
 
 
-def extract_experience_years(text: str) -> Optional[float]:
-    normalized = normalize(text)
-    matches = re.findall(r"(\d+(?:\.\d+)?)\s*(?:\+)?\s*(?:years|yrs|yrs\.|year)", normalized)
-    if not matches:
-        return None
-    try:
-        values = [float(match) for match in matches]
-        return max(values)
-    except ValueError:
-        return None
+def extract_experience_years(doc: DocumentFeatures) -> Optional[float]:
+    return max(doc.years) if doc.years else None
 
 
-def detect_role_match(jd_text: str, cv_text: str) -> bool:
-    normalized_jd = normalize(jd_text)
-    normalized_cv = normalize(cv_text)
-    return any(keyword in normalized_jd and keyword in normalized_cv for keyword in ROLE_KEYWORDS)
+def detect_role_match(jd: DocumentFeatures, cv: DocumentFeatures) -> bool:
+    return any(jd.has(keyword) and cv.has(keyword) for keyword in ROLE_KEYWORDS)
 
 
-def infer_seniority(text: str) -> str:
-    normalized = normalize(text)
-    if "principal" in normalized or "staff" in normalized or "lead" in normalized:
+def infer_seniority(doc: DocumentFeatures) -> str:
+    if doc.has("principal") or doc.has("staff") or doc.has("lead"):
         return "Senior"
-    if "senior" in normalized or "sr." in normalized:
+    if doc.has("senior") or doc.has("sr."):
         return "Senior"
-    if "mid" in normalized:
+    if doc.has("mid"):
         return "Mid"
-    if "junior" in normalized or "jr." in normalized:
+    if doc.has("junior") or doc.has("jr."):
         return "Junior"
     return "Mid"
 
 
-def domain_overlap(jd_text: str, cv_text: str) -> bool:
-    normalized_jd = normalize(jd_text)
-    normalized_cv = normalize(cv_text)
-    return any(domain in normalized_jd and domain in normalized_cv for domain in DOMAIN_KEYWORDS)
+def domain_overlap(jd: DocumentFeatures, cv: DocumentFeatures) -> bool:
+    return any(jd.has(domain) and cv.has(domain) for domain in DOMAIN_KEYWORDS)
 
 
-def count_projects(text: str) -> int:
-    normalized = normalize(text)
-    return normalized.count("project")
+def count_projects(doc: DocumentFeatures) -> int:
+    return len(doc.hits.get(PROJECT_TERM, []))
 
 
-def build_skill_matches(
-    jd_text: str, cv_text: str
-) -> Tuple[List[SkillMatch], List[str], List[str], Dict[str, str]]:
-    jd_skills = extract_skills(jd_text, SKILL_ALIASES)
-    cv_skills = extract_skills(cv_text, SKILL_ALIASES)
-    matched: List[SkillMatch] = []
-    missing: List[str] = []
-    extra: List[str] = []
-    skill_priority: Dict[str, str] = {}
+@dataclass
+class JobProfile:
+    """A job description extracted once, for scoring many CVs against it."""
+
+    doc: DocumentFeatures
+    priorities: Dict[str, str]
+    years: float
+    seniority: str
 
-    for skill in jd_skills:
+    @property
+    def skills(self) -> Dict[str, List[str]]:
+        return self.doc.skills
+
+
+def skill_priorities(jd: DocumentFeatures) -> Dict[str, str]:
+    priorities: Dict[str, str] = {}
+    for skill, aliases in jd.skills.items():
         priority = "medium"
-        for alias in jd_skills[skill]:
-            priority = find_priority(jd_text, alias)
+        for alias in aliases:
+            priority = find_priority(jd, alias)
             if priority == "high":
                 break
-        skill_priority[skill] = priority
+        priorities[skill] = priority
+    return priorities
+
+
+def prepare_job(job_description: str) -> JobProfile:
+    jd = DocumentFeatures(job_description)
+    return JobProfile(
+        doc=jd,
+        priorities=skill_priorities(jd),
+        years=extract_experience_years(jd) or 0,
+        seniority=infer_seniority(jd),
+    )
+
+
+def match_job_skills(
+    job: JobProfile, cv: DocumentFeatures, matcher=None
+) -> Tuple[List[SkillMatch], List[str], List[str], Dict[str, str]]:
+    cv_skills = cv.skills
+    matched: List[SkillMatch] = []
+    unmatched: List[str] = []
+    skill_priority = job.priorities
+
+    for skill in job.skills:
+        priority = skill_priority[skill]
         if skill in cv_skills:
-            depth = assess_depth(cv_text, next(iter(cv_skills[skill])))
+            depth = assess_depth(cv, cv_skills[skill][0])
             matched.append(SkillMatch(skill=skill, jd_priority=priority, cv_depth=depth))
-        elif priority == "high":
-            missing.append(skill)
+        else:
+            unmatched.append(skill)
+
+    cv_only = [skill for skill in cv_skills if skill not in job.skills]
+    if matcher is not None and unmatched and cv_only:
+        # Pair the remaining JD skills with semantically close CV skills
+        used = set()
+        for result in matcher.match(unmatched, cv_only):
+            if result.matched is None:
+                continue
+            depth = assess_depth(cv, cv_skills[result.matched][0])
+            matched.append(SkillMatch(
+                skill=result.skill,
+                jd_priority=skill_priority[result.skill],
+                cv_depth=depth,
+                cv_skill=result.matched,
+                score=result.score,
+            ))
+            used.add(result.matched)
+        matched_names = {match.skill for match in matched}
+        unmatched = [skill for skill in unmatched if skill not in matched_names]
+        cv_only = [skill for skill in cv_only if skill not in used]
+
+    missing = [skill for skill in unmatched if skill_priority[skill] == "high"]
+    return matched, missing, cv_only, dict(skill_priority)
+
+
+def build_skill_matches(
+    jd_text: str, cv_text: str, matcher=None
+) -> Tuple[List[SkillMatch], List[str], List[str], Dict[str, str]]:
+    return match_job_skills(prepare_job(jd_text), DocumentFeatures(cv_text), matcher)
+
+
+def load_semantic_matcher(model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    """Semantic skill matcher from the backend, on the local MiniLM model.
+
+    The alias table still finds skill mentions in free text; the matcher
+    pairs JD and CV skills that the aliases name differently.
+    """
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "BE"))
+    from langchain_huggingface import HuggingFaceEmbeddings
 
-    for skill, _aliases in cv_skills.items():
-        if skill not in jd_skills:
-            extra.append(skill)
+    from app.vector_db.query_embeddings import QueryEmbedder
+    from app.vector_db.skill_matcher import SkillMatcher
 
-    return matched, missing, extra, skill_priority
+    embedder = QueryEmbedder(HuggingFaceEmbeddings(model_name=model_name).embed_documents, model_name)
+    matcher = SkillMatcher(embedder.embed_many)
+    matcher.set_catalog(list(SKILL_ALIASES))
+    return matcher
 
 
 def make_strengths(matched_skills: List[SkillMatch]) -> List[str]:
@@ -311,18 +481,21 @@ def confidence_level_from_data(matched_count: int, jd_years: Optional[float], cv
     return "low"
 
 
-def match_cv_to_jd(job_description: str, candidate_cv: str) -> Dict:
-    jd_text = job_description or ""
-    cv_text = candidate_cv or ""
-    matched_skills, missing_skills, extra_skills, priorities = build_skill_matches(jd_text, cv_text)
-    jd_years = extract_experience_years(jd_text) or 0
-    cv_years = extract_experience_years(cv_text) or 0
+def match_cv_to_jd(job_description: str, candidate_cv: str, matcher=None) -> Dict:
+    return score_cv(prepare_job(job_description), candidate_cv, matcher)
+
+
+def score_cv(job: JobProfile, candidate_cv: str, matcher=None) -> Dict:
+    cv = DocumentFeatures(candidate_cv)
+    matched_skills, missing_skills, extra_skills, priorities = match_job_skills(job, cv, matcher)
+    jd_years = job.years
+    cv_years = extract_experience_years(cv) or 0
     experience_gap = classify_experience_gap(jd_years, cv_years)
     score = calculate_match_score(matched_skills, missing_skills, jd_years, cv_years)
     fit = classify_fit(score)
-    role_match = detect_role_match(jd_text, cv_text)
-    domain_matched = domain_overlap(jd_text, cv_text)
-    seniority = infer_seniority(jd_text)
+    role_match = detect_role_match(job.doc, cv)
+    domain_matched = domain_overlap(job.doc, cv)
+    seniority = job.seniority
     strengths = make_strengths(matched_skills)
     weaknesses = make_weaknesses(missing_skills, matched_skills)
     risk_flags = build_risk_flags(missing_skills, matched_skills, experience_gap, domain_matched)
@@ -335,6 +508,8 @@ def match_cv_to_jd(job_description: str, candidate_cv: str) -> Dict:
             "skill": match.skill,
             "jd_priority": match.jd_priority,
             "cv_depth": match.cv_depth,
+            "cv_skill": match.cv_skill or match.skill,
+            "score": match.score,
         }
         for match in matched_skills
     ]
@@ -356,7 +531,7 @@ def match_cv_to_jd(job_description: str, candidate_cv: str) -> Dict:
             "required_experience_years": jd_years,
             "claimed_experience_years": cv_years,
             "experience_gap": experience_gap,
-            "relevant_project_count": count_projects(cv_text),
+            "relevant_project_count": count_projects(cv),
         },
         "strengths": strengths,
         "weaknesses": weaknesses,
@@ -367,19 +542,131 @@ def match_cv_to_jd(job_description: str, candidate_cv: str) -> Dict:
     }
 
 
+# Batch ranking: one JD against a pool of CVs
+
+_worker_job: Optional[JobProfile] = None
+_worker_matcher = None
+
+
+def _init_worker(job: JobProfile, semantic: bool) -> None:
+    global _worker_job, _worker_matcher
+    _worker_job = job
+    _worker_matcher = load_semantic_matcher() if semantic else None
+
+
+def _score_record(record: Tuple[int, str, str]) -> Tuple[int, str, Dict]:
+    index, cv_id, cv_text = record
+    return index, cv_id, score_cv(_worker_job, cv_text, _worker_matcher)
+
+
+def iter_cv_records(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (cv_id, text) from a directory of .txt files or a JSONL file of {"id", "text"} objects."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), "r", encoding="utf-8", errors="ignore") as cv_file:
+                    yield name, cv_file.read()
+        return
+    with open(path, "r", encoding="utf-8") as jsonl_file:
+        for line_number, line in enumerate(jsonl_file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            cv_id = record.get("id") or record.get("candidate_id") or f"line-{line_number}"
+            yield str(cv_id), record.get("text") or record.get("cv") or ""
+
+
+def rank_cvs(
+    job: JobProfile,
+    records: Iterable[Tuple[str, str]],
+    workers: int = 1,
+    top_k: Optional[int] = None,
+    semantic: bool = False,
+    chunksize: int = 32,
+) -> Tuple[List[Tuple[str, Dict]], int]:
+    """Score every CV against a prepared JD; returns (leaderboard, CVs scored).
+
+    With top_k only the best k results are held in memory. Ties keep input order.
+    """
+    indexed = ((index, cv_id, text) for index, (cv_id, text) in enumerate(records))
+    best: List[Tuple[int, int, str, Dict]] = []
+    scored = 0
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(job, semantic))
+        results = pool.imap_unordered(_score_record, indexed, chunksize=chunksize)
+    else:
+        _init_worker(job, semantic)
+        results = map(_score_record, indexed)
+
+    try:
+        for index, cv_id, result in results:
+            scored += 1
+            entry = (result["overall_match_score"], -index, cv_id, result)
+            if not top_k:
+                best.append(entry)
+            elif len(best) < top_k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heappushpop(best, entry)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    best.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return [(cv_id, result) for _, _, cv_id, result in best], scored
+
+
+def write_leaderboard(leaderboard: List[Tuple[str, Dict]], output: TextIO) -> None:
+    """Stream the ranking as NDJSON, one CV per line."""
+    for rank, (cv_id, result) in enumerate(leaderboard, 1):
+        output.write(json.dumps({"rank": rank, "cv_id": cv_id, **result}) + "\n")
+        output.flush()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Match a candidate CV to a job description.")
     parser.add_argument("--job", required=True, help="Path to a text file containing the job description.")
-    parser.add_argument("--cv", required=True, help="Path to a text file containing the candidate CV.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--cv", help="Path to a text file containing the candidate CV.")
+    source.add_argument("--cvs", help="Directory of .txt CVs or a JSONL file of {\"id\", \"text\"} to rank.")
+    parser.add_argument(
+        "--semantic", action="store_true", help="Also pair differently named skills with the local embedding model."
+    )
+    parser.add_argument("--top-k", type=int, help="Only output the k best CVs (batch mode).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (batch mode).")
+    parser.add_argument("--output", help="Write the NDJSON leaderboard here instead of stdout (batch mode).")
     args = parser.parse_args()
 
-    with open(args.job, "r", encoding="utf-8") as jd_file, open(
-        args.cv, "r", encoding="utf-8"
-    ) as cv_file:
+    with open(args.job, "r", encoding="utf-8") as jd_file:
         jd_text = jd_file.read()
+
+    if args.cvs:
+        start = time.perf_counter()
+        job = prepare_job(jd_text)
+        leaderboard, scored = rank_cvs(
+            job, iter_cv_records(args.cvs), workers=args.workers, top_k=args.top_k, semantic=args.semantic
+        )
+        elapsed = time.perf_counter() - start
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output:
+                write_leaderboard(leaderboard, output)
+        else:
+            write_leaderboard(leaderboard, sys.stdout)
+        print(
+            f"Scored {scored} CVs in {elapsed:.2f}s ({scored / elapsed if elapsed else 0:.0f} CVs/s, "
+            f"{args.workers} workers)",
+            file=sys.stderr,
+        )
+        return
+
+    with open(args.cv, "r", encoding="utf-8") as cv_file:
         cv_text = cv_file.read()
 
-    result = match_cv_to_jd(jd_text, cv_text)
+    matcher = load_semantic_matcher() if args.semantic else None
+    result = match_cv_to_jd(jd_text, cv_text, matcher)
     print(json.dumps(result, indent=2))
 
 